@@ -0,0 +1,149 @@
+"""
+Аутентификация по токену с кешированием пользователя.
+
+Данные пользователя по токену хранятся в двух уровнях: в LRU процесса
+с коротким TTL и в общем кеше воркеров. Из кеша пользователь собирается
+через from_db только из полей AUTH_USER_FIELDS, остальные поля (в том
+числе пароль) отложены и загружаются из БД при обращении.
+
+Записи удаляются после фиксации удаления токена (выход из системы)
+и сохранения пользователя (смена пароля, изменение is_active в админке).
+Запись в общем кеше хранится вместе с версией токена, прочитанной до
+загрузки пользователя из БД, а сброс меняет версию. Поэтому запрос,
+прочитавший пользователя до фиксации изменения и записавший его в кеш
+после сброса, не вернет устаревшие данные. Другие воркеры могут
+использовать свою запись из LRU до истечения AUTH_TOKEN_LOCAL_TTL.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from hashlib import sha256
+from typing import Iterable
+
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from api import consts
+from foodgram.consts import SHARED_CACHE_ALIAS
+from foodgram.models import User
+
+
+class LocalTTLCache:
+    """Потокобезопасный LRU ограниченного размера с TTL записей."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str):
+        with self.lock:
+            item = self.items.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self.items[key]
+                return None
+            self.items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value) -> None:
+        with self.lock:
+            self.items[key] = (time.monotonic() + self.ttl, value)
+            self.items.move_to_end(key)
+            if len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self.lock:
+            self.items.pop(key, None)
+
+
+# from_db ожидает значения в порядке полей модели.
+USER_FIELDS = tuple(
+    field.attname
+    for field in User._meta.concrete_fields
+    if field.attname in consts.AUTH_USER_FIELDS
+)
+
+local_cache = LocalTTLCache(
+    consts.AUTH_TOKEN_LOCAL_SIZE, consts.AUTH_TOKEN_LOCAL_TTL
+)
+
+
+def get_token_hash(token_key: str) -> str:
+    # Ключ токена - секрет, в общем кеше хранится только его хеш.
+    return sha256(token_key.encode()).hexdigest()
+
+
+def get_cache_key(token_key: str) -> str:
+    return consts.AUTH_TOKEN_CACHE_KEY.format(get_token_hash(token_key))
+
+
+def get_version_key(token_key: str) -> str:
+    return consts.AUTH_TOKEN_VERSION_KEY.format(get_token_hash(token_key))
+
+
+def invalidate_tokens(token_keys: Iterable[str]) -> None:
+    """Удаляет из кешей пользователей, закешированных по токенам."""
+    token_keys = list(token_keys)
+    cache_keys = [get_cache_key(token_key) for token_key in token_keys]
+    for cache_key in cache_keys:
+        local_cache.delete(cache_key)
+    if cache_keys:
+        shared_cache = caches[SHARED_CACHE_ALIAS]
+        # Записи с прежней версией не используются, даже если запрос,
+        # загрузивший пользователя до изменения, запишет их позже.
+        version = time.time_ns()
+        shared_cache.set_many(
+            {get_version_key(token_key): version for token_key in token_keys},
+            timeout=consts.AUTH_TOKEN_SHARED_TTL,
+        )
+        shared_cache.delete_many(cache_keys)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication, не обращающийся к БД при попадании в кеш."""
+
+    def authenticate_credentials(self, key):
+        cache_key = get_cache_key(key)
+        values = local_cache.get(cache_key)
+        if values is None:
+            shared_cache = caches[SHARED_CACHE_ALIAS]
+            version_key = get_version_key(key)
+            cached = shared_cache.get_many((cache_key, version_key))
+            version = cached.get(version_key)
+            entry = cached.get(cache_key)
+            if entry is not None and entry[0] == version:
+                values = entry[1]
+            else:
+                values = self.load_user_values(key)
+                shared_cache.set(
+                    cache_key,
+                    (version, values),
+                    timeout=consts.AUTH_TOKEN_SHARED_TTL,
+                )
+            local_cache.set(cache_key, values)
+
+        user = User.from_db(DEFAULT_DB_ALIAS, USER_FIELDS, values)
+        return user, Token(key=key, user=user)
+
+    @staticmethod
+    def load_user_values(key: str) -> tuple:
+        values = (
+            User.objects.filter(auth_token__key=key)
+            .values_list(*USER_FIELDS)
+            .first()
+        )
+        if values is None:
+            raise AuthenticationFailed(_('Invalid token.'))
+        if not values[USER_FIELDS.index('is_active')]:
+            raise AuthenticationFailed(_('User inactive or deleted.'))
+        return values
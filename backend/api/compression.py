@@ -0,0 +1,148 @@
+"""
+Сжатие ответов gzip и brotli.
+
+Кодировка выбирается по заголовку Accept-Encoding с учетом q-значений,
+при равных значениях предпочитается brotli. Сжимаются ответы не меньше
+COMPRESSION_MIN_SIZE байт с типом содержимого API (JSON, MessagePack);
+HTML-страницы не сжимаются из-за атаки BREACH.
+
+Сжатые ответы с ETag сохраняются в кеше процесса: повторный ответ
+с тем же ETag, адресом, типом содержимого и кодировкой отдается без
+повторного сжатия.
+
+Файлы документации сжимаются при сборке образа командой
+precompress_docs и отдаются через serve_precompressed.
+"""
+
+import gzip
+import mimetypes
+from hashlib import sha1
+from pathlib import Path
+from typing import Iterable, Optional
+
+import brotli
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.views.static import serve
+
+from api import consts
+
+ENCODERS = {
+    'br': lambda content, level: brotli.compress(content, quality=level),
+    'gzip': lambda content, level: gzip.compress(
+        content, compresslevel=level, mtime=0
+    ),
+}
+# Суффиксы файлов, заранее сжатых командой precompress_docs.
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def select_encoding(
+    accept_encoding: str, available: Iterable[str] = tuple(ENCODERS)
+) -> Optional[str]:
+    """Выбирает кодировку из available по заголовку Accept-Encoding."""
+    weights = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        weight = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                continue
+        weights[coding.strip().lower()] = weight
+    best, best_weight = None, 0
+    for coding in available:
+        weight = weights.get(coding, weights.get('*', 0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def is_compressible(response) -> bool:
+    content_type = response.get('Content-Type', '')
+    return (
+        not response.streaming
+        and not response.has_header('Content-Encoding')
+        and content_type.startswith(consts.COMPRESSIBLE_CONTENT_TYPES)
+        and len(response.content) >= consts.COMPRESSION_MIN_SIZE
+    )
+
+
+def get_cache_key(request, response, encoding: str) -> Optional[str]:
+    etag = response.get('ETag')
+    if etag is None:
+        return None
+    return consts.COMPRESSED_CACHE_KEY.format(
+        sha1(
+            '\n'.join(
+                (
+                    encoding,
+                    etag,
+                    response.get('Content-Type', ''),
+                    request.build_absolute_uri(),
+                )
+            ).encode()
+        ).hexdigest()
+    )
+
+
+def compress_response(request, response):
+    """Сжимает ответ, если клиент принимает одну из кодировок."""
+    if not is_compressible(response):
+        return response
+    patch_vary_headers(response, ('Accept-Encoding',))
+    encoding = select_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    if encoding is None:
+        return response
+
+    cache_key = get_cache_key(request, response, encoding)
+    content = cache.get(cache_key) if cache_key else None
+    if content is None:
+        content = ENCODERS[encoding](
+            response.content, consts.COMPRESSION_LEVELS[encoding]
+        )
+        if cache_key:
+            cache.set(
+                cache_key, content, timeout=consts.COMPRESSED_CACHE_TIMEOUT
+            )
+    if len(content) >= len(response.content):
+        return response
+
+    response.content = content
+    etag = response.get('ETag')
+    if etag and not etag.startswith('W/'):
+        # Сжатый ответ не совпадает с исходным побайтово.
+        response['ETag'] = f'W/{etag}'
+    response['Content-Length'] = str(len(content))
+    response['Content-Encoding'] = encoding
+    return response
+
+
+def serve_precompressed(request, path: str, document_root: Path):
+    """
+    Отдает файл или его заранее сжатый вариант.
+
+    Content-Encoding сжатого варианта выставляет serve по расширению
+    файла, тип содержимого берется по имени исходного файла.
+    """
+    encoding = select_encoding(
+        request.META.get('HTTP_ACCEPT_ENCODING', ''),
+        available=[
+            encoding
+            for encoding, suffix in SUFFIXES.items()
+            if (Path(document_root) / f'{path}{suffix}').is_file()
+        ],
+    )
+    response = serve(
+        request,
+        f'{path}{SUFFIXES[encoding]}' if encoding else path,
+        document_root=document_root,
+    )
+    if encoding:
+        response['Content-Type'] = (
+            mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        )
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
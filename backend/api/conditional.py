@@ -0,0 +1,92 @@
+"""
+Условные GET-запросы (ETag, Last-Modified).
+
+Для справочников (теги, ингредиенты) валидатор - поколение модели
+из foodgram.catalog: отметка времени последнего изменения в общем кеше.
+Проверка If-None-Match для них не обращается к БД.
+
+Для рецепта валидатор - хеш одной строки: updated_at рецепта, данные
+автора, выводимые в ответе, и флаги пользователя (избранное, корзина,
+подписка), а также поколения тегов и ингредиентов. Last-Modified
+рецепту не выставляется: ответ зависит не только от updated_at.
+"""
+
+from functools import wraps
+from hashlib import sha1
+
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date
+from rest_framework import status
+
+from foodgram.catalog import get_generation
+
+VALIDATED_STATUSES = (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED)
+
+
+def generation_etag(model):
+    """Функция ETag для представлений справочника model."""
+
+    def get_etag(view) -> str:
+        return f'W/"{model._meta.model_name}-{get_generation(model)}"'
+
+    return get_etag
+
+
+def generation_last_modified(model):
+    """Функция Last-Modified для представлений справочника model."""
+
+    def get_last_modified(view) -> int:
+        return get_generation(model) // 1_000_000_000
+
+    return get_last_modified
+
+
+def hash_etag(*values) -> str:
+    return f'W/"{sha1(repr(values).encode()).hexdigest()}"'
+
+
+def conditional(
+    etag_func=None, last_modified_func=None, per_user=False, **cache_control
+):
+    """
+    Декоратор метода представления: отвечает 304 по If-None-Match или
+    If-Modified-Since до вызова метода и выставляет Cache-Control.
+
+    Функции валидаторов получают представление и возвращают None, если
+    валидатор посчитать нельзя (например, объекта нет). Для ответов,
+    зависящих от пользователя (per_user), в Vary добавляется
+    Authorization, а ответ авторизованному пользователю помечается
+    private.
+    """
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            etag = etag_func(self) if etag_func else None
+            last_modified = (
+                last_modified_func(self) if last_modified_func else None
+            )
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if response is None:
+                response = method(self, request, *args, **kwargs)
+            if response.status_code in VALIDATED_STATUSES:
+                if etag:
+                    response['ETag'] = etag
+                if last_modified:
+                    response['Last-Modified'] = http_date(last_modified)
+            patch_cache_control(response, **cache_control)
+            if per_user:
+                patch_vary_headers(response, ('Authorization',))
+                if request.user.is_authenticated:
+                    patch_cache_control(response, private=True)
+            return response
+
+        return wrapper
+
+    return decorator
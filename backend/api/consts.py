@@ -1,7 +1,64 @@
 MAX_LENGTH_PASSWORD = 128
 DEFAULT_PAGE_SIZE = 6
+COOKABLE_MAX_RESULTS = 600
+COOKABLE_MAX_INGREDIENTS = 200
 MAX_AMOUNT = 10_000
 MIN_AMOUNT = 1
+BULK_MAX_RECIPES = 100
+
+# Cache
+THROTTLE_CACHE_KEY = 'throttle:{}:{}:{}'
+AUTH_TOKEN_CACHE_KEY = 'auth_token:{}'
+AUTH_TOKEN_VERSION_KEY = 'auth_token_version:{}'
+AUTH_TOKEN_LOCAL_SIZE = 10_000
+AUTH_TOKEN_LOCAL_TTL = 5
+AUTH_TOKEN_SHARED_TTL = 5 * 60
+COMPRESSED_CACHE_KEY = 'compressed:{}'
+COMPRESSED_CACHE_TIMEOUT = 10 * 60
+# Cache-Control (seconds)
+TAGS_MAX_AGE = 60
+INGREDIENTS_MAX_AGE = 10 * 60
+# Compression
+COMPRESSION_MIN_SIZE = 1024
+# Только ответы API: HTML (админка, browsable API) содержит CSRF-токен
+# рядом с данными из запроса и при сжатии уязвим для BREACH.
+COMPRESSIBLE_CONTENT_TYPES = ('application/json', 'application/msgpack')
+# Уровни сжатия ответов и файлов документации, сжимаемых при сборке.
+COMPRESSION_LEVELS = {'br': 4, 'gzip': 6}
+PRECOMPRESSION_LEVELS = {'br': 11, 'gzip': 9}
+# Поля автора в ответе рецепта, входящие в его ETag.
+RECIPE_ETAG_AUTHOR_FIELDS = (
+    'email',
+    'username',
+    'first_name',
+    'last_name',
+    'avatar',
+)
+# Поля пользователя, сохраняемые в кеше аутентификации.
+AUTH_USER_FIELDS = (
+    'id',
+    'email',
+    'username',
+    'first_name',
+    'last_name',
+    'avatar',
+    'is_active',
+    'is_staff',
+    'is_superuser',
+    'pull_feed',
+)
+
+# Throttling
+THROTTLE_PERIODS = {
+    's': 1,
+    'sec': 1,
+    'm': 60,
+    'min': 60,
+    'h': 60 * 60,
+    'hour': 60 * 60,
+    'd': 24 * 60 * 60,
+    'day': 24 * 60 * 60,
+}
 
 # Response messages
 AVATAR_DELETED = 'Аватар успешно удален.'
@@ -28,9 +85,29 @@ RECIPE_INGREDIENTS_DUPLICATED = (
 RECIPE_TAGS_DUPLICATED = 'В рецепте не могут быть указаны повторяющиеся теги.'
 RECIPE_UPDATE_REQUIRED_FIELDS = 'Не указаны обязательные поля'
 INGREDIENT_DO_NOT_EXIST = 'Ингредиент с указанным id не найден.'
+COOKABLE_INGREDIENTS_REQUIRED = (
+    'Укажите id имеющихся ингредиентов в параметре ingredients.'
+)
+COOKABLE_INGREDIENTS_INVALID = (
+    'Параметр ingredients должен содержать не более {} целых id '
+    'через запятую.'
+)
+RECIPE_UNKNOWN_FIELDS = 'Неизвестные поля: {}. Доступные поля: {}.'
+RECIPE_UNKNOWN_EXPAND = 'Раскрыть можно только поля: {}.'
+BULK_TOO_MANY_RECIPES = (
+    'За один запрос можно передать не более {max_length} рецептов.'
+)
+
+# Bulk operation outcomes
+BULK_ADDED = 'added'
+BULK_ALREADY_ADDED = 'already_added'
+BULK_REMOVED = 'removed'
+BULK_NOT_ADDED = 'not_added'
+BULK_NOT_FOUND = 'not_found'
 
 # Patterns
 RECIPES_LIMIT_PARAM_PATTERN = r'[1-9]+\d*'
+INGREDIENT_IDS_PARAM_PATTERN = r'\d+(,\d+)*'
 BASE64_IMAGE_PATTERN = (
     r'^data:image/(png|jpeg|jpg|gif|bmp|webp);base64,([A-Za-z0-9+/=\n\r]+)$'
 )
@@ -46,6 +123,8 @@ LEADING = 25
 MARGIN_AFTER_HEADER = 30
 
 # Fields
+# Вложенные поля рецепта, которые можно добавить параметром expand.
+RECIPE_EXPANDABLE_FIELDS = ('author', 'tags', 'ingredients')
 RECIPE_REQUIRED_UPDATE_FIELD = [
     'ingredients',
     'tags',
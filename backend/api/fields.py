@@ -23,3 +23,32 @@ class Base64ImageField(serializers.ImageField):
             name=f'{self.context.get("request").user.username}.'
             f'{format_img.split("/")[-1]}',
         )
+
+
+class CatalogPrimaryKeyField(serializers.Field):
+    """
+    Поле id записи справочника из foodgram.catalog.
+
+    Проверяет id по справочнику в памяти процесса и возвращает его без
+    загрузки объекта. Ошибки совпадают с PrimaryKeyRelatedField.
+    """
+
+    default_error_messages = (
+        serializers.PrimaryKeyRelatedField.default_error_messages
+    )
+
+    def __init__(self, catalog, **kwargs):
+        self.catalog = catalog
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if self.catalog.get(pk) is None:
+            self.fail('does_not_exist', pk_value=data)
+        return pk
+
+    def to_representation(self, value):
+        return value
@@ -1,21 +1,23 @@
-from django.db.models import Case, IntegerField, Value, When
-from django.db.models.functions import Lower
 from django_filters.rest_framework import FilterSet, filters
-from rest_framework.filters import SearchFilter
 
-from foodgram.models import Recipe, Tag
+from foodgram.catalog import tag_catalog
+from foodgram.models import Recipe
+from foodgram.search import search_recipes
+
+
+def get_tag_choices() -> list:
+    return [(tag.slug, tag.name) for tag in tag_catalog.all()]
 
 
 class RecipeFilterSet(FilterSet):
-    tags = filters.ModelMultipleChoiceFilter(
-        field_name='tags__slug',
-        queryset=Tag.objects.all(),
-        to_field_name='slug',
+    tags = filters.MultipleChoiceFilter(
+        field_name='tags__slug', choices=get_tag_choices
     )
     is_favorited = filters.BooleanFilter(method='filter_is_favorited')
     is_in_shopping_cart = filters.BooleanFilter(
         method='filter_is_in_shopping_cart'
     )
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Recipe
@@ -24,6 +26,7 @@ class RecipeFilterSet(FilterSet):
             'tags',
             'is_favorited',
             'is_in_shopping_cart',
+            'search',
         )
 
     def filter_is_favorited(self, queryset, name, value):
@@ -38,25 +41,5 @@ class RecipeFilterSet(FilterSet):
             return queryset.filter(users_purchase__user=user)
         return queryset
 
-
-class DoubleSearchName(SearchFilter):
-    search_param = 'name'
-
-    def filter_queryset(self, request, queryset, view):
-        name = request.query_params.get(self.search_param)
-        if name:
-            queryset = (
-                queryset.annotate(lower_name=Lower('name'))
-                .filter(lower_name__icontains=name.lower())
-                .annotate(
-                    priority=Case(
-                        When(
-                            lower_name__istartswith=name.lower(), then=Value(0)
-                        ),
-                        default=Value(1),
-                        output_field=IntegerField(),
-                    )
-                )
-                .order_by('priority', 'name')
-            )
-        return queryset
+    def filter_search(self, queryset, name, value):
+        return search_recipes(queryset, value)
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api import consts
+from api.compression import ENCODERS, SUFFIXES
+
+
+class Command(BaseCommand):
+    """Команда для сжатия файлов документации API."""
+
+    help = (
+        'Сохраняет рядом с файлами templates/docs их варианты, сжатые gzip '
+        'и brotli с максимальным уровнем. Запускается при сборке образа.'
+    )
+
+    def handle(self, *args, **options):
+        docs_dir = settings.BASE_DIR / 'templates' / 'docs'
+        for path in sorted(docs_dir.iterdir()):
+            if not path.is_file() or path.suffix in SUFFIXES.values():
+                continue
+            content = path.read_bytes()
+            for encoding, suffix in SUFFIXES.items():
+                compressed = ENCODERS[encoding](
+                    content, consts.PRECOMPRESSION_LEVELS[encoding]
+                )
+                path.with_name(path.name + suffix).write_bytes(compressed)
+                self.stdout.write(
+                    f'{path.name}{suffix}: {len(content)} -> '
+                    f'{len(compressed)} байт'
+                )
@@ -0,0 +1,151 @@
+import json
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+IMPORT_TIME_PATTERN = re.compile(
+    r'^import time:\s+(?P<self>\d+) \|\s+(?P<cumulative>\d+) \| '
+    r'(?P<module>.+)$'
+)
+MICROSECONDS = 1_000_000
+
+
+def parse_import_time(output: str) -> list:
+    """
+    Разбирает вывод интерпретатора, запущенного с флагом -X importtime.
+
+    :param output: Содержимое stderr процесса.
+    :return: Список кортежей (модуль, собственное время, общее время)
+    в секундах.
+    """
+    modules = []
+    for line in output.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match:
+            modules.append(
+                (
+                    match['module'].strip(),
+                    int(match['self']) / MICROSECONDS,
+                    int(match['cumulative']) / MICROSECONDS,
+                )
+            )
+    return modules
+
+
+def group_by_app(modules: list, app_names: list) -> dict:
+    """Суммирует собственное время импорта модулей каждого приложения."""
+    app_names = sorted(app_names, key=len, reverse=True)
+    import_times = defaultdict(float)
+    for module, self_time, _ in modules:
+        for app_name in app_names:
+            if module == app_name or module.startswith(f'{app_name}.'):
+                import_times[app_name] += self_time
+                break
+    return import_times
+
+
+class Command(BaseCommand):
+    """Команда для профилирования холодного старта проекта."""
+
+    help = (
+        'Запускает Django в отдельном процессе и выводит время настройки '
+        'каждого приложения, время импорта модулей (по данным '
+        '-X importtime) и время первого запроса.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default='/api/tags/',
+            help='Адрес первого запроса. По умолчанию /api/tags/.',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=20,
+            help='Количество самых медленных модулей в отчете.',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Вывести результат в формате JSON.',
+        )
+
+    def handle(self, *args, **options):
+        process = subprocess.run(
+            [
+                sys.executable,
+                '-X',
+                'importtime',
+                '-m',
+                'api.startup_probe',
+                options['path'],
+            ],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode:
+            raise CommandError(process.stderr.splitlines()[-1])
+
+        probe = json.loads(process.stdout)
+        modules = parse_import_time(process.stderr)
+        import_times = group_by_app(modules, list(probe['apps']))
+        slowest = sorted(modules, key=lambda module: module[1], reverse=True)
+
+        report = {
+            'total': probe['total'],
+            'setup': probe['setup'],
+            'apps': {
+                name: {'import': import_times[name], **timings}
+                for name, timings in probe['apps'].items()
+            },
+            'modules': [
+                {'module': module, 'self': self_time, 'cumulative': total}
+                for module, self_time, total in slowest[: options['top']]
+            ],
+            'requests': probe['requests'],
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.write_report(report)
+
+    def write_report(self, report):
+        ms = 1000
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(
+                f'Старт процесса: {report["total"] * ms:.1f} ms, '
+                f'django.setup(): {report["setup"] * ms:.1f} ms'
+            )
+        )
+        self.stdout.write(
+            f'{"приложение":<40}{"импорт":>10}{"config":>10}'
+            f'{"models":>10}{"ready":>10}'
+        )
+        for name, timings in report['apps'].items():
+            self.stdout.write(
+                f'{name:<40}'
+                + ''.join(
+                    f'{timings.get(stage, 0) * ms:>10.1f}'
+                    for stage in ('import', 'config', 'models', 'ready')
+                )
+            )
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Медленные импорты:'))
+        for module in report['modules']:
+            self.stdout.write(
+                f'{module["module"]:<60}{module["self"] * ms:>10.1f}'
+                f'{module["cumulative"] * ms:>10.1f}'
+            )
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Первые запросы:'))
+        for number, request in enumerate(report['requests'], start=1):
+            self.stdout.write(
+                f'#{number}: {request["status"]} '
+                f'{request["time"] * ms:.1f} ms'
+            )
@@ -0,0 +1,152 @@
+"""
+Агрегирование метрик запросов в формате Prometheus.
+
+Каждый процесс копит метрики в памяти. Если задан каталог METRICS_DIR,
+процесс периодически сохраняет в него свой снимок, а эндпоинт /metrics
+суммирует снимки всех воркеров gunicorn.
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+FLUSH_INTERVAL = 5
+COUNTERS = (
+    ('requests_total', 'Количество запросов.'),
+    ('request_queries_total', 'Количество SQL-запросов.'),
+    ('request_db_seconds_total', 'Время выполнения SQL-запросов.'),
+    (
+        'request_serializer_seconds_total',
+        'Время работы представления без учета SQL-запросов.',
+    ),
+    ('request_render_seconds_total', 'Время рендеринга ответа.'),
+    ('response_size_bytes_total', 'Размер тела ответа.'),
+)
+METRIC_PREFIX = 'foodgram_'
+
+
+def new_view_stats() -> dict:
+    stats = {name: 0 for name, _ in COUNTERS}
+    stats['duration_buckets'] = [0] * len(DURATION_BUCKETS)
+    stats['duration_sum'] = 0
+    return stats
+
+
+class MetricsRegistry:
+    """Потокобезопасное хранилище агрегированных метрик процесса."""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory) if directory else None
+        self.lock = threading.Lock()
+        self.views = defaultdict(new_view_stats)
+        self.flushed_at = time.monotonic()
+
+    def observe(
+        self,
+        view: str,
+        duration: float,
+        queries: int,
+        db_time: float,
+        serializer_time: float,
+        render_time: float,
+        size: int,
+    ):
+        with self.lock:
+            stats = self.views[view]
+            stats['requests_total'] += 1
+            stats['request_queries_total'] += queries
+            stats['request_db_seconds_total'] += db_time
+            stats['request_serializer_seconds_total'] += serializer_time
+            stats['request_render_seconds_total'] += render_time
+            stats['response_size_bytes_total'] += size
+            stats['duration_sum'] += duration
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    stats['duration_buckets'][index] += 1
+        if self.directory and (
+            time.monotonic() - self.flushed_at > FLUSH_INTERVAL
+        ):
+            self.flush()
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return json.loads(json.dumps(self.views))
+
+    def flush(self):
+        """Сохраняет снимок метрик процесса в каталог METRICS_DIR."""
+        self.flushed_at = time.monotonic()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f'{os.getpid()}.json'
+        temporary_path = path.with_suffix('.tmp')
+        temporary_path.write_text(json.dumps(self.snapshot()))
+        temporary_path.replace(path)
+
+    def collect(self) -> dict:
+        """Возвращает метрики всех процессов, суммированные по view."""
+        views = defaultdict(new_view_stats)
+        snapshots = [self.snapshot()]
+        if self.directory and self.directory.exists():
+            own_snapshot = f'{os.getpid()}.json'
+            for path in self.directory.glob('*.json'):
+                if path.name == own_snapshot:
+                    continue
+                try:
+                    snapshots.append(json.loads(path.read_text()))
+                except (OSError, ValueError):
+                    continue
+
+        for snapshot in snapshots:
+            for view, stats in snapshot.items():
+                total = views[view]
+                for name, value in stats.items():
+                    if name == 'duration_buckets':
+                        total[name] = [
+                            left + right
+                            for left, right in zip(total[name], value)
+                        ]
+                    else:
+                        total[name] += value
+        return views
+
+    def render(self) -> str:
+        """Формирует текст метрик в формате Prometheus."""
+        views = self.collect()
+        lines = []
+        for name, description in COUNTERS:
+            lines.append(f'# HELP {METRIC_PREFIX}{name} {description}')
+            lines.append(f'# TYPE {METRIC_PREFIX}{name} counter')
+            for view, stats in sorted(views.items()):
+                lines.append(
+                    f'{METRIC_PREFIX}{name}{{view="{view}"}} {stats[name]}'
+                )
+
+        name = f'{METRIC_PREFIX}request_duration_seconds'
+        lines.append(f'# HELP {name} Время обработки запроса.')
+        lines.append(f'# TYPE {name} histogram')
+        for view, stats in sorted(views.items()):
+            for bound, count in zip(
+                DURATION_BUCKETS, stats['duration_buckets']
+            ):
+                lines.append(
+                    f'{name}_bucket{{view="{view}",le="{bound}"}} {count}'
+                )
+            lines.append(
+                f'{name}_bucket{{view="{view}",le="+Inf"}} '
+                f'{stats["requests_total"]}'
+            )
+            lines.append(
+                f'{name}_sum{{view="{view}"}} {stats["duration_sum"]}'
+            )
+            lines.append(
+                f'{name}_count{{view="{view}"}} {stats["requests_total"]}'
+            )
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry(settings.METRICS_DIR)
@@ -0,0 +1,158 @@
+import time
+
+from django.db import connection
+
+from api.compression import compress_response
+from api.metrics import registry
+from api.nplusone import QueryPatternDetector
+
+UNRESOLVED_VIEW = 'unresolved'
+
+
+def get_view_name(view_func, method: str) -> str:
+    """
+    Возвращает имя обработчика запроса.
+
+    Для viewset'ов DRF имя включает действие, например RecipeViewSet.list.
+    """
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return getattr(view_func, '__name__', UNRESOLVED_VIEW)
+
+    actions = getattr(view_func, 'actions', None) or {}
+    action = actions.get(method.lower(), method.lower())
+    return f'{view_class.__name__}.{action}'
+
+
+class RequestMetrics:
+    """Замеры одного запроса."""
+
+    def __init__(self):
+        self.view = UNRESOLVED_VIEW
+        self.queries = 0
+        self.db_time = 0
+        self.view_started = None
+        self.view_time = 0
+        self.view_db_time = 0
+        self.render_started = None
+        self.render_time = 0
+
+    def record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - start
+
+    def start_view(self):
+        self.view_started = time.perf_counter()
+        self.view_db_time = self.db_time
+
+    def finish_view(self):
+        if self.view_started is None:
+            return
+        self.render_started = time.perf_counter()
+        self.view_time = self.render_started - self.view_started
+        self.view_db_time = self.db_time - self.view_db_time
+        self.view_started = None
+
+    def finish_render(self, response):
+        if self.render_started is not None:
+            self.render_time = time.perf_counter() - self.render_started
+
+    @property
+    def serializer_time(self) -> float:
+        """Время работы представления за вычетом SQL-запросов."""
+        return max(self.view_time - self.view_db_time, 0)
+
+
+class RequestMetricsMiddleware:
+    """
+    Собирает метрики каждого запроса: количество и время SQL-запросов,
+    время сериализации и рендеринга, размер ответа.
+
+    Метрики отдаются клиенту в заголовке Server-Timing и агрегируются
+    по имени обработчика для эндпоинта /metrics.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        request.metrics = metrics
+        start = time.perf_counter()
+        with connection.execute_wrapper(metrics.record_query):
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+        metrics.finish_view()
+
+        if response.streaming:
+            size = int(response.get('Content-Length', 0))
+        else:
+            size = len(response.content)
+
+        response['Server-Timing'] = ', '.join(
+            (
+                f'db;dur={metrics.db_time * 1000:.2f};'
+                f'desc="{metrics.queries} queries"',
+                f'serializer;dur={metrics.serializer_time * 1000:.2f}',
+                f'render;dur={metrics.render_time * 1000:.2f}',
+                f'total;dur={duration * 1000:.2f}',
+            )
+        )
+        registry.observe(
+            view=metrics.view,
+            duration=duration,
+            queries=metrics.queries,
+            db_time=metrics.db_time,
+            serializer_time=metrics.serializer_time,
+            render_time=metrics.render_time,
+            size=size,
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.metrics.view = get_view_name(view_func, request.method)
+        request.metrics.start_view()
+
+    def process_template_response(self, request, response):
+        request.metrics.finish_view()
+        response.add_post_render_callback(request.metrics.finish_render)
+        return response
+
+
+class QueryPatternMiddleware:
+    """
+    Проверяет каждый запрос на повторяющиеся однотипные SQL-запросы
+    (N+1). Исключения задаются настройкой NPLUSONE_ALLOWLIST или
+    контекстным менеджером allow_repeated_queries.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        detector = QueryPatternDetector()
+        request.query_pattern_detector = detector
+        with connection.execute_wrapper(detector):
+            return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_pattern_detector.view = get_view_name(
+            view_func, request.method
+        )
+
+
+class CompressionMiddleware:
+    """
+    Сжимает ответы gzip или brotli по заголовку Accept-Encoding,
+    см. api/compression.py.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return compress_response(request, self.get_response(request))
@@ -0,0 +1,93 @@
+"""
+Обнаружение N+1 запросов.
+
+В рамках одного запроса считается количество SQL-запросов одной формы
+(с точностью до параметров). Если форма повторяется NPLUSONE_THRESHOLD раз,
+в тестах поднимается NPlusOneError, в остальных окружениях в лог пишется
+предупреждение с именем обработчика и стеком вызова.
+"""
+
+import logging
+import re
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+from fnmatch import fnmatchcase
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+IN_CLAUSE_PATTERN = re.compile(r'IN \((?:%s, )*%s\)')
+NUMBER_PATTERN = re.compile(r'\b\d+\b')
+SITE_PACKAGES = 'site-packages'
+
+allowed = ContextVar('nplusone_allowed', default=False)
+
+
+class NPlusOneError(Exception):
+    """Повторяющиеся однотипные запросы в рамках одного запроса."""
+
+
+@contextmanager
+def allow_repeated_queries():
+    """Отключает проверку на N+1 внутри блока with."""
+    token = allowed.set(True)
+    try:
+        yield
+    finally:
+        allowed.reset(token)
+
+
+def get_query_shape(sql: str) -> str:
+    """Приводит SQL к форме, не зависящей от значений параметров."""
+    sql = IN_CLAUSE_PATTERN.sub('IN (...)', sql)
+    return NUMBER_PATTERN.sub('?', sql)
+
+
+def get_project_stack() -> str:
+    """Возвращает стек вызова, ограниченный кодом проекта."""
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        frame
+        for frame in traceback.extract_stack()[:-3]
+        if frame.filename.startswith(base_dir)
+        and SITE_PACKAGES not in frame.filename
+    ]
+    return ''.join(traceback.format_list(frames))
+
+
+def is_allowlisted(view: str, shape: str) -> bool:
+    return any(
+        fnmatchcase(view, view_pattern) and re.search(sql_pattern, shape)
+        for view_pattern, sql_pattern in settings.NPLUSONE_ALLOWLIST
+    )
+
+
+class QueryPatternDetector:
+    """Обертка выполнения SQL, считающая запросы одной формы."""
+
+    def __init__(self):
+        self.view = None
+        self.counts = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if not allowed.get():
+            shape = get_query_shape(sql)
+            self.counts[shape] = self.counts.get(shape, 0) + 1
+            if self.counts[shape] == settings.NPLUSONE_THRESHOLD:
+                self.report(shape)
+        return execute(sql, params, many, context)
+
+    def report(self, shape: str):
+        view = self.view or 'unresolved'
+        if is_allowlisted(view, shape):
+            return
+
+        message = (
+            f'N+1 в {view}: запрос выполнен '
+            f'{settings.NPLUSONE_THRESHOLD} раз: {shape}'
+        )
+        if settings.NPLUSONE_RAISE:
+            raise NPlusOneError(message)
+        logger.warning('%s\n%s', message, get_project_stack())
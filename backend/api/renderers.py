@@ -0,0 +1,48 @@
+"""
+Дополнительные форматы ответа API.
+
+Формат выбирается заголовком Accept. Ответ в формате по умолчанию
+(JSONRenderer) не меняется для клиентов, не запросивших другой формат:
+- 'application/json; encoder=orjson' - тот же JSON, закодированный orjson;
+- 'application/msgpack' - MessagePack.
+"""
+
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Типы, которые не кодируются orjson и msgpack напрямую (ленивые строки
+# переводов, Decimal, UUID), приводятся так же, как в JSONRenderer.
+encode_default = JSONEncoder().default
+
+
+class ORJSONRenderer(BaseRenderer):
+    """JSON, закодированный orjson."""
+
+    # Параметр encoder отличает рендерер от JSONRenderer: без него
+    # в Accept (в том числе для */*) выбирается JSONRenderer.
+    media_type = 'application/json; encoder=orjson'
+    format = 'orjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return orjson.dumps(
+            data, default=encode_default, option=orjson.OPT_NON_STR_KEYS
+        )
+
+
+class MessagePackRenderer(BaseRenderer):
+    """MessagePack."""
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_default, use_bin_type=True)
@@ -1,13 +1,18 @@
 from re import fullmatch
+from typing import Optional
 
 from django.contrib.auth.password_validation import validate_password
 from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import IntegrityError, transaction
 from rest_framework import serializers, status
 from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
 from rest_framework.validators import UniqueTogetherValidator
 
 from api import consts
-from api.fields import Base64ImageField
+from api.fields import Base64ImageField, CatalogPrimaryKeyField
+from foodgram.catalog import ingredient_catalog, tag_catalog
 from foodgram.models import (
     Favorite,
     Ingredient,
@@ -17,9 +22,72 @@ from foodgram.models import (
     Tag,
     User,
 )
+from users.hashers import check_password
 from users.models import Subscription
 
 
+def get_recipes_limit(request) -> Optional[int]:
+    """Возвращает значение параметра recipes_limit, если оно корректно."""
+    recipes_limit = request.query_params.get('recipes_limit')
+    if recipes_limit and fullmatch(
+        consts.RECIPES_LIMIT_PARAM_PATTERN, recipes_limit
+    ):
+        return int(recipes_limit)
+    return None
+
+
+def get_query_list(request, param: str) -> list:
+    value = request.query_params.get(param, '')
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def get_requested_fields(request) -> Optional[frozenset]:
+    """
+    Возвращает поля рецепта, запрошенные параметрами fields и expand.
+
+    expand добавляет к полям из fields вложенные поля (автор, теги,
+    ингредиенты). Без fields, а также для запросов на запись
+    возвращается None: ответ содержит все поля.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    fields = get_query_list(request, 'fields')
+    if not fields:
+        return None
+    expand = get_query_list(request, 'expand')
+    unknown = set(expand) - set(consts.RECIPE_EXPANDABLE_FIELDS)
+    if unknown:
+        raise ValidationError(
+            {
+                'expand': consts.RECIPE_UNKNOWN_EXPAND.format(
+                    ', '.join(consts.RECIPE_EXPANDABLE_FIELDS)
+                )
+            }
+        )
+    return frozenset(fields + expand)
+
+
+class SparseFieldsMixin:
+    """Оставляет в ответе только поля, запрошенные параметром fields."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = get_requested_fields(self.context.get('request'))
+        if requested is None:
+            return
+        unknown = requested - set(self.fields)
+        if unknown:
+            raise ValidationError(
+                {
+                    'fields': consts.RECIPE_UNKNOWN_FIELDS.format(
+                        ', '.join(sorted(unknown)), ', '.join(self.fields)
+                    )
+                }
+            )
+        for name in set(self.fields) - requested:
+            self.fields.pop(name)
+
+
 class UserReadSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.BooleanField(read_only=True, default=False)
 
@@ -65,22 +133,54 @@ class UserWriteSerializer(serializers.ModelSerializer):
         return instance
 
 
-class SubscriptionSerializer(serializers.ModelSerializer):
+class UniqueRelationSerializerMixin:
+    """
+    Создает связь пользователя с объектом без предварительной проверки.
+
+    Уникальность связи обеспечивает ограничение БД. IntegrityError
+    из-за уже существующей связи преобразуется в ту же ошибку, что выдавал
+    UniqueTogetherValidator, остальные нарушения ограничений (внешних
+    ключей, проверок) не скрываются.
+    """
+
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            # Имя нарушенного ограничения в SQLite недоступно, поэтому
+            # нарушение уникальности проверяется по самой связи.
+            if not self.Meta.model.objects.filter(
+                **{field: validated_data[field] for field in self.Meta.fields}
+            ).exists():
+                raise
+            raise ValidationError(
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        UniqueTogetherValidator.message.format(
+                            field_names=', '.join(self.Meta.fields)
+                        )
+                    ]
+                },
+                code='unique',
+            )
+
+
+class SubscriptionSerializer(
+    UniqueRelationSerializerMixin, serializers.ModelSerializer
+):
 
     class Meta:
         model = Subscription
         fields = ('user', 'following')
-        validators = [
-            UniqueTogetherValidator(
-                queryset=Subscription.objects.all(),
-                fields=('user', 'following'),
-            )
-        ]
+        read_only_fields = fields
 
-    def validate(self, attrs):
-        if attrs['user'] == attrs['following']:
-            raise ValidationError(detail=consts.NOT_FOLLOW_SELF)
-        return attrs
+    def create(self, validated_data):
+        if validated_data['user'] == validated_data['following']:
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [consts.NOT_FOLLOW_SELF]}
+            )
+        return super().create(validated_data)
 
 
 class RecipeSimpleSerializer(serializers.ModelSerializer):
@@ -91,6 +191,15 @@ class RecipeSimpleSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'image', 'cooking_time')
 
 
+class SimilarRecipeSerializer(RecipeSimpleSerializer):
+    """Сериализатор похожих рецептов."""
+
+    score = serializers.FloatField(read_only=True)
+
+    class Meta(RecipeSimpleSerializer.Meta):
+        fields = RecipeSimpleSerializer.Meta.fields + ('score',)
+
+
 class UserWithRecipeSerializer(UserReadSerializer):
     """
     Сериализатор выдачи данных о пользователях вместе со связанными
@@ -104,13 +213,13 @@ class UserWithRecipeSerializer(UserReadSerializer):
         fields = UserReadSerializer.Meta.fields + ('recipes', 'recipes_count')
 
     def get_recipes(self, obj):
-        query_params = self.context.get('request').query_params
-        recipes_limit = query_params.get('recipes_limit')
-        if recipes_limit and fullmatch(
-            consts.RECIPES_LIMIT_PARAM_PATTERN, recipes_limit
-        ):
+        if hasattr(obj, 'limited_recipes'):
+            return RecipeSimpleSerializer(obj.limited_recipes, many=True).data
+
+        recipes_limit = get_recipes_limit(self.context.get('request'))
+        if recipes_limit:
             return RecipeSimpleSerializer(
-                obj.recipes.all()[: int(recipes_limit)], many=True
+                obj.recipes.all()[:recipes_limit], many=True
             ).data
         return RecipeSimpleSerializer(obj.recipes, many=True).data
 
@@ -124,6 +233,13 @@ class AvatarSerializer(serializers.ModelSerializer):
         model = User
         fields = ('avatar',)
 
+    def update(self, instance, validated_data):
+        # instance - пользователь из кеша аутентификации, остальные поля
+        # могут быть устаревшими (например, pull_feed).
+        instance.avatar = validated_data['avatar']
+        instance.save(update_fields=['avatar'])
+        return instance
+
 
 class PasswordSerializer(serializers.Serializer):
     """Сериализатор для обработки манипуляций с паролем пользователя."""
@@ -142,7 +258,8 @@ class PasswordSerializer(serializers.Serializer):
 
     def validate_current_password(self, password):
         user: User = self.context.get('request').user
-        if user.check_password(password):
+        # Без пересчета устаревшего хеша: пароль сейчас будет заменен.
+        if check_password(password, user.password):
             return password
         raise ValidationError(
             detail=consts.CURRENT_PASSWORD_IS_WRONG,
@@ -187,7 +304,9 @@ class RecipeSerializerMixin(serializers.ModelSerializer):
     def get_author(self, obj):
         user = self.context.get('request').user
         serializer_data = UserReadSerializer(obj.author).data
-        if user.is_authenticated:
+        if hasattr(obj, 'author_is_subscribed'):
+            serializer_data.update({'is_subscribed': obj.author_is_subscribed})
+        elif user.is_authenticated:
             is_subscribed = Subscription.objects.filter(
                 user=self.context.get('request').user, following=obj.author
             ).exists()
@@ -217,7 +336,7 @@ class RecipeIngredientsReadSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'measurement_unit', 'amount')
 
 
-class RecipeReadSerializer(RecipeSerializerMixin):
+class RecipeReadSerializer(SparseFieldsMixin, RecipeSerializerMixin):
     """Сериализатор для модели Recipe."""
 
     ingredients = RecipeIngredientsReadSerializer(
@@ -234,6 +353,15 @@ class RecipeReadSerializer(RecipeSerializerMixin):
         ]
 
 
+class CookableRecipeSerializer(RecipeReadSerializer):
+    """Сериализатор рецептов с долей имеющихся ингредиентов."""
+
+    coverage = serializers.FloatField(read_only=True)
+
+    class Meta(RecipeReadSerializer.Meta):
+        fields = RecipeReadSerializer.Meta.fields + ['coverage']
+
+
 class RecipeIngredientWriteSerializer(serializers.Serializer):
     """Сериализатор для записи в БД информацию об ингредиентах."""
 
@@ -246,12 +374,6 @@ class RecipeIngredientWriteSerializer(serializers.Serializer):
         ],
     )
 
-    def validate_id(self, input_id):
-        ingredient = Ingredient.objects.filter(id=input_id)
-        if ingredient.exists():
-            return input_id
-        raise ValidationError(detail=consts.INGREDIENT_DO_NOT_EXIST)
-
 
 class RecipeWriteSerializer(RecipeSerializerMixin):
     """
@@ -261,8 +383,9 @@ class RecipeWriteSerializer(RecipeSerializerMixin):
     ingredients = RecipeIngredientWriteSerializer(
         required=True, many=True, write_only=True
     )
-    tags = serializers.PrimaryKeyRelatedField(
-        required=True, many=True, queryset=Tag.objects.all()
+    tags = serializers.ManyRelatedField(
+        child_relation=CatalogPrimaryKeyField(catalog=tag_catalog),
+        required=True,
     )
     image = Base64ImageField(required=True)
 
@@ -277,6 +400,19 @@ class RecipeWriteSerializer(RecipeSerializerMixin):
         if len(ingredients_id) != len(set(ingredients_id)):
             raise ValidationError(detail=consts.RECIPE_INGREDIENTS_DUPLICATED)
 
+        existing_ids = ingredient_catalog.existing_ids(ingredients_id)
+        if len(existing_ids) != len(ingredients_id):
+            raise ValidationError(
+                detail=[
+                    (
+                        {}
+                        if ingredient_id in existing_ids
+                        else {'id': [consts.INGREDIENT_DO_NOT_EXIST]}
+                    )
+                    for ingredient_id in ingredients_id
+                ]
+            )
+
         return data
 
     def validate_tags(self, data):
@@ -305,6 +441,7 @@ class RecipeWriteSerializer(RecipeSerializerMixin):
             view.get_queryset().get(id=instance.id), context=self.context
         ).data
 
+    @transaction.atomic
     def create(self, validated_data):
         tags = validated_data.pop('tags')
 
@@ -317,6 +454,7 @@ class RecipeWriteSerializer(RecipeSerializerMixin):
         )
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         ingredients_data = validated_data.pop('ingredients')
         instance.tags.set(validated_data.pop('tags'))
@@ -345,29 +483,34 @@ class RecipeWriteSerializer(RecipeSerializerMixin):
         )
 
 
-class FavoriteSerializer(serializers.ModelSerializer):
+class RecipeIdsSerializer(serializers.Serializer):
+    """Сериализатор списка id рецептов для пакетных операций."""
+
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=consts.BULK_MAX_RECIPES,
+        error_messages={'max_length': consts.BULK_TOO_MANY_RECIPES},
+    )
+
+
+class FavoriteSerializer(
+    UniqueRelationSerializerMixin, serializers.ModelSerializer
+):
     """Сериализатор для с избранного."""
 
     class Meta:
         fields = ('user', 'recipe')
+        read_only_fields = fields
         model = Favorite
-        validators = [
-            UniqueTogetherValidator(
-                queryset=Favorite.objects.all(),
-                fields=('user', 'recipe'),
-            )
-        ]
 
 
-class PurchaseSerializer(serializers.ModelSerializer):
+class PurchaseSerializer(
+    UniqueRelationSerializerMixin, serializers.ModelSerializer
+):
     """Сериализатор для списка покупок пользователей."""
 
     class Meta:
         fields = ('user', 'recipe')
+        read_only_fields = fields
         model = Purchase
-        validators = [
-            UniqueTogetherValidator(
-                queryset=Purchase.objects.all(),
-                fields=('user', 'recipe'),
-            )
-        ]
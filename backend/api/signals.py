@@ -0,0 +1,97 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from api.authentication import invalidate_tokens
+from foodgram import feed
+from foodgram.catalog import catalogs
+from foodgram.cookable import cookable_index
+from foodgram.models import Ingredient, Recipe, RecipeIngredient, Tag, User
+from foodgram.signals import bulk_changed
+from jobs.worker import enqueue
+from users.models import Subscription
+
+
+@receiver((post_save, post_delete, bulk_changed), sender=Tag)
+@receiver((post_save, post_delete, bulk_changed), sender=Ingredient)
+def publish_catalog_change(sender, **kwargs):
+    """
+    Сообщает процессам об изменении справочника.
+
+    Публикация откладывается до фиксации транзакции, иначе другой процесс
+    мог бы загрузить справочник без изменения под новым поколением.
+    """
+    transaction.on_commit(catalogs[sender].publish)
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+def publish_recipe_change(instance, **kwargs):
+    """
+    Публикует изменение рецепта для индекса "Что приготовить".
+
+    Публикация откладывается до фиксации транзакции, чтобы другие процессы
+    прочитали рецепт вместе с ингредиентами.
+    """
+    cookable_index.publish_on_commit([instance.pk])
+
+
+@receiver(bulk_changed, sender=Recipe)
+@receiver(bulk_changed, sender=RecipeIngredient)
+def publish_cookable_rebuild(**kwargs):
+    """Требует перестроить индекс после массового изменения рецептов."""
+    transaction.on_commit(cookable_index.publish)
+
+
+@receiver(post_save, sender=Recipe)
+def fan_out_recipe(instance, created, **kwargs):
+    """
+    Ставит в очередь рассылку нового рецепта в ленты подписчиков автора.
+
+    Задача создается в транзакции рецепта: обработчик увидит ее только
+    после фиксации, а при откате она не останется в очереди.
+    """
+    if created:
+        enqueue('feed.fan_out', [instance.pk])
+
+
+@receiver(post_save, sender=Subscription)
+def backfill_feed(instance, created, **kwargs):
+    """Добавляет в ленту последние рецепты автора после подписки."""
+    if created:
+        transaction.on_commit(
+            lambda: feed.backfill(instance.user_id, instance.following_id)
+        )
+
+
+@receiver(post_delete, sender=Subscription)
+def remove_from_feed(instance, **kwargs):
+    """Удаляет из ленты рецепты автора после отписки."""
+    feed.remove(instance.user_id, instance.following_id)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(instance, **kwargs):
+    """
+    Удаляет пользователя из кеша аутентификации при выходе.
+
+    Сброс откладывается до фиксации транзакции, иначе запрос до фиксации
+    снова записал бы в кеш прежние данные.
+    """
+    transaction.on_commit(lambda: invalidate_tokens([instance.key]))
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(instance, created, **kwargs):
+    """
+    Удаляет пользователя из кеша аутентификации после фиксации изменения:
+    смены пароля, блокировки, обновления профиля.
+    """
+    if not created:
+        transaction.on_commit(
+            lambda: invalidate_tokens(
+                Token.objects.filter(user_id=instance.pk).values_list(
+                    'key', flat=True
+                )
+            )
+        )
@@ -0,0 +1,79 @@
+"""
+Замер холодного старта Django.
+
+Модуль запускается командой profile_startup в отдельном процессе
+с флагом -X importtime, поэтому на уровне модуля импортируется только
+стандартная библиотека.
+"""
+import json
+import os
+import sys
+import time
+
+
+def timed(timings: dict, key: str, func):
+    """Оборачивает вызов функции с сохранением времени его выполнения."""
+
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings[key] = time.perf_counter() - start
+
+    return wrapper
+
+
+def probe(path: str) -> dict:
+    """
+    Выполняет django.setup() и первые запросы, замеряя время каждого этапа.
+
+    :param path: Адрес, к которому выполняются первые запросы.
+    :return: Словарь с результатами замеров.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_foodgram.settings')
+    result = {'apps': {}}
+    start = time.perf_counter()
+
+    import django
+    from django.apps.config import AppConfig
+
+    original_create = AppConfig.create.__func__
+
+    def create(cls, entry):
+        create_start = time.perf_counter()
+        app_config = original_create(cls, entry)
+        timings = result['apps'].setdefault(app_config.name, {})
+        timings['config'] = time.perf_counter() - create_start
+        app_config.import_models = timed(
+            timings, 'models', app_config.import_models
+        )
+        app_config.ready = timed(timings, 'ready', app_config.ready)
+        return app_config
+
+    AppConfig.create = classmethod(create)
+    setup_start = time.perf_counter()
+    django.setup()
+    result['setup'] = time.perf_counter() - setup_start
+
+    from django.conf import settings
+    from django.test import Client
+
+    client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+    requests = []
+    for _ in range(2):
+        request_start = time.perf_counter()
+        response = client.get(path)
+        requests.append(
+            {
+                'status': response.status_code,
+                'time': time.perf_counter() - request_start,
+            }
+        )
+    result['requests'] = requests
+    result['total'] = time.perf_counter() - start
+    return result
+
+
+if __name__ == '__main__':
+    sys.stdout.write(json.dumps(probe(sys.argv[1])))
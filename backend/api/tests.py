@@ -0,0 +1,189 @@
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+
+from api.authentication import (
+    CachedTokenAuthentication,
+    invalidate_tokens,
+    local_cache,
+)
+from foodgram.consts import SHARED_CACHE_ALIAS
+from foodgram.models import FeedEntry, Ingredient, Recipe, Tag, User
+from users.models import Subscription
+
+
+class SubscribeQueriesTest(TestCase):
+    """Количество SQL-запросов подписки и отписки."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='reader', email='reader@example.com', password='pass'
+        )
+        cls.author = User.objects.create_user(
+            username='author', email='author@example.com', password='pass'
+        )
+        for number in range(3):
+            Recipe.objects.create(
+                author=cls.author,
+                name=f'Рецепт {number}',
+                image='recipes/test.png',
+                text='Описание',
+                cooking_time=10,
+            )
+        cls.url = reverse('users-subscribe', args=(cls.author.pk,))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_subscribe(self):
+        # Автор с количеством рецептов, рецепты, SAVEPOINT, вставка,
+        # RELEASE SAVEPOINT; после фиксации - проверка pull_feed автора,
+        # его последние рецепты и вставка записей ленты.
+        with self.assertNumQueries(8):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['recipes_count'], 3)
+        self.assertEqual(FeedEntry.objects.filter(user=self.user).count(), 3)
+
+    def test_unsubscribe(self):
+        Subscription.objects.create(user=self.user, following=self.author)
+        # Выборка и удаление подписки, удаление записей ленты.
+        with self.assertNumQueries(3):
+            response = self.client.delete(self.url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(
+            Subscription.objects.filter(
+                user=self.user, following=self.author
+            ).exists()
+        )
+
+
+class RecipeSearchTest(TestCase):
+    """Поиск рецептов по названию и ингредиентам."""
+
+    # PNG 1x1.
+    IMAGE = (
+        'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABAQMAAAAl21bK'
+        'AAAAA1BMVEUAAACnej3aAAAAAXRSTlMAQObYZgAAAApJREFUCNdjYAAAAAIAAeIhvDMA'
+        'AAAASUVORK5CYII='
+    )
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        media = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(media.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=media.name)
+        media_settings.enable()
+        cls.addClassCleanup(media_settings.disable)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='cook', email='cook@example.com', password='pass'
+        )
+        # Справочники перезагружаются после фиксации транзакции.
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.tag = Tag.objects.create(name='Завтрак', slug='breakfast')
+            cls.ingredient = Ingredient.objects.create(
+                name='гречка', measurement_unit='г'
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_search_finds_recipe_created_through_api(self):
+        response = self.client.post(
+            reverse('recipes-list'),
+            {
+                'name': 'Блины на кефире',
+                'text': 'Смешать и пожарить.',
+                'cooking_time': 20,
+                'image': self.IMAGE,
+                'tags': [self.tag.pk],
+                'ingredients': [{'id': self.ingredient.pk, 'amount': 100}],
+            },
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        recipe_id = response.data['id']
+        # Слово из названия и название ингредиента.
+        for text in ('блины', 'гречка'):
+            with self.subTest(search=text):
+                response = self.client.get(
+                    reverse('recipes-list'), {'search': text}
+                )
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(
+                    [recipe['id'] for recipe in response.data['results']],
+                    [recipe_id],
+                )
+
+
+@override_settings(
+    CACHES={
+        **settings.CACHES,
+        SHARED_CACHE_ALIAS: {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+)
+class CachedTokenAuthenticationTest(TestCase):
+    """Сброс кеша аутентификации при изменении пользователя."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='staff', email='staff@example.com', password='pass'
+        )
+        cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        self.authentication = CachedTokenAuthentication()
+        self.authentication.authenticate_credentials(self.token.key)
+
+    def authenticate(self):
+        # Запрос в другом воркере: без записи в LRU процесса.
+        with mock.patch.object(local_cache, 'get', return_value=None):
+            return self.authentication.authenticate_credentials(self.token.key)
+
+    def test_invalidated_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+            # До фиксации другие запросы видят прежнюю строку.
+            self.authenticate()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_stale_load_is_not_reused(self):
+        load_user_values = CachedTokenAuthentication.load_user_values
+
+        def load_before_commit(key):
+            # Запрос прочитал строку до фиксации, а сброс выполнился
+            # до записи результата в кеш.
+            values = load_user_values(key)
+            User.objects.filter(pk=self.user.pk).update(is_active=False)
+            invalidate_tokens([key])
+            return values
+
+        with mock.patch.object(
+            CachedTokenAuthentication,
+            'load_user_values',
+            side_effect=load_before_commit,
+        ):
+            invalidate_tokens([self.token.key])
+            self.authenticate()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
@@ -0,0 +1,116 @@
+"""
+Ограничение частоты запросов по алгоритму token bucket.
+
+Лимиты задаются в settings.THROTTLE_RATES для отдельных действий. Ключ -
+'<basename>.<action>' для viewset или имя класса представления, значение -
+лимиты по пользователю ('user') и по IP-адресу ('ip') в виде
+'<запросы>/<период>' с необязательным запасом: '<запросы>/<период>:<burst>'.
+Для действий без лимитов проверка сводится к поиску в словаре.
+
+Корзины хранятся в кеше THROTTLE_CACHE_ALIAS: локальном для процесса или
+общем для всех воркеров. Чтение и запись корзины в общем кеше не атомарны,
+поэтому при одновременных запросах из разных воркеров лимит может быть
+превышен на несколько запросов.
+"""
+
+import threading
+import time
+from functools import lru_cache
+from math import ceil
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+from api import consts
+
+
+class Rate(NamedTuple):
+    capacity: int
+    refill_per_second: float
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate: str) -> Rate:
+    """Разбирает строку вида '10/min' или '10/min:20'."""
+    rate, _, burst = rate.partition(':')
+    tokens, period = rate.split('/')
+    return Rate(
+        capacity=int(burst or tokens),
+        refill_per_second=int(tokens) / consts.THROTTLE_PERIODS[period],
+    )
+
+
+def get_scope(view) -> str:
+    basename = getattr(view, 'basename', None)
+    if basename is None:
+        return type(view).__name__
+    return f'{basename}.{view.action}'
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Базовый класс ограничения: корзина на пару (действие, ключ)."""
+
+    kind: str = ''
+    lock = threading.Lock()
+
+    def __init__(self):
+        self.wait_time = None
+
+    def get_key(self, request) -> Optional[str]:
+        raise NotImplementedError
+
+    def allow_request(self, request, view) -> bool:
+        scope = get_scope(view)
+        rate = settings.THROTTLE_RATES.get(scope, {}).get(self.kind)
+        if rate is None:
+            return True
+        key = self.get_key(request)
+        if key is None:
+            return True
+
+        rate = parse_rate(rate)
+        cache_key = consts.THROTTLE_CACHE_KEY.format(scope, self.kind, key)
+        cache = caches[settings.THROTTLE_CACHE_ALIAS]
+        now = time.time()
+        with self.lock:
+            tokens, updated_at = cache.get(cache_key, (rate.capacity, now))
+            tokens = min(
+                rate.capacity,
+                tokens + (now - updated_at) * rate.refill_per_second,
+            )
+            if tokens < 1:
+                self.wait_time = (1 - tokens) / rate.refill_per_second
+                return False
+            # Запись живет, пока корзина не наполнится: после этого ее
+            # отсутствие равнозначно полной корзине.
+            cache.set(
+                cache_key,
+                (tokens - 1, now),
+                timeout=ceil(rate.capacity / rate.refill_per_second),
+            )
+        return True
+
+    def wait(self) -> Optional[float]:
+        return self.wait_time
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Ограничение для авторизованного пользователя."""
+
+    kind = 'user'
+
+    def get_key(self, request) -> Optional[str]:
+        if request.user and request.user.is_authenticated:
+            return str(request.user.pk)
+        return None
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """Ограничение для IP-адреса клиента."""
+
+    kind = 'ip'
+
+    def get_key(self, request) -> Optional[str]:
+        return self.get_ident(request)
@@ -1,8 +1,7 @@
 from django.urls import include, path
-from django.views.generic import TemplateView
-from django.views.static import serve
 from rest_framework.routers import DefaultRouter
 
+from api.compression import serve_precompressed
 from api.views import IngredientViewSet, RecipeViewSet, TagViewSet, UserViewSet
 from api_foodgram import settings
 
@@ -15,10 +14,17 @@ router_v1.register(
 )
 
 docs_url = [
-    path('', TemplateView.as_view(template_name='docs/redoc.html')),
+    path(
+        '',
+        serve_precompressed,
+        kwargs={
+            'path': 'docs/redoc.html',
+            'document_root': settings.BASE_DIR / 'templates',
+        },
+    ),
     path(
         'openapi-schema.yml',
-        serve,
+        serve_precompressed,
         kwargs={
             'path': 'docs/openapi-schema.yml',
             'document_root': settings.BASE_DIR / 'templates',
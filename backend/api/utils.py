@@ -1,4 +1,5 @@
 import io
+from functools import lru_cache
 from typing import Union
 
 from reportlab.lib.pagesizes import A4
@@ -9,6 +10,17 @@ from reportlab.pdfgen import canvas
 from api import consts
 
 
+@lru_cache(maxsize=None)
+def register_fonts() -> None:
+    """
+    Регистрирует шрифты для pdf файлов.
+
+    Разбор ttf файлов выполняется один раз за время жизни процесса.
+    """
+    pdfmetrics.registerFont(TTFont('DejaVu-Bold', 'DejaVuSans-Bold.ttf'))
+    pdfmetrics.registerFont(TTFont('DejaVu', 'DejaVuSans.ttf'))
+
+
 def create_pdf(
     data: list, filename: Union[str, io.BytesIO], header: str
 ) -> None:
@@ -19,9 +31,8 @@ def create_pdf(
     :param filename: Имя файла или объект буффера
     :param header: Заголовок файла
     """
+    register_fonts()
     pdf = canvas.Canvas(filename=filename, pagesize=A4)
-    pdfmetrics.registerFont(TTFont('DejaVu-Bold', 'DejaVuSans-Bold.ttf'))
-    pdfmetrics.registerFont(TTFont('DejaVu', 'DejaVuSans.ttf'))
     pdf.setFont('DejaVu-Bold', 16)
     width, height = A4
     y = height - consts.TOP_MARGIN
@@ -1,11 +1,13 @@
 import io
+from re import fullmatch
+from typing import Optional
 
-from django.db.models import Count, Exists, OuterRef, Prefetch, Sum
+from django.db.models import Count, Exists, OuterRef, Prefetch, Subquery, Sum
 from django.http import FileResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status
 from rest_framework.decorators import action
-from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.generics import get_object_or_404
 from rest_framework.mixins import (
     CreateModelMixin,
@@ -14,6 +16,7 @@ from rest_framework.mixins import (
 )
 from rest_framework.permissions import (
     SAFE_METHODS,
+    AllowAny,
     IsAuthenticated,
     IsAuthenticatedOrReadOnly,
 )
@@ -25,37 +28,101 @@ from rest_framework.viewsets import (
 )
 
 from api import consts
-from api.filters import DoubleSearchName, RecipeFilterSet
+from api.conditional import (
+    conditional,
+    generation_etag,
+    generation_last_modified,
+    hash_etag,
+)
+from api.filters import RecipeFilterSet
 from api.paginators import LimitPageNumberPagination
 from api.permissions import IsAuthorOrReadOnly
 from api.serializers import (
     AvatarSerializer,
+    CookableRecipeSerializer,
     FavoriteSerializer,
     IngredientsSerializer,
     PasswordSerializer,
     PurchaseSerializer,
+    RecipeIdsSerializer,
     RecipeReadSerializer,
     RecipeSimpleSerializer,
     RecipeWriteSerializer,
+    SimilarRecipeSerializer,
     SubscriptionSerializer,
     TagSerializer,
     UserReadSerializer,
     UserWithRecipeSerializer,
     UserWriteSerializer,
+    get_recipes_limit,
+    get_requested_fields,
 )
 from api.utils import create_pdf
+from foodgram.catalog import get_generation, ingredient_catalog, tag_catalog
+from foodgram.cookable import cookable_index
+from foodgram.feed import Timeline
 from foodgram.models import (
     Favorite,
     Ingredient,
     Purchase,
     Recipe,
     RecipeIngredient,
+    SimilarRecipe,
     Tag,
     User,
 )
 from users.models import Subscription
 
 
+def get_recipes_prefetch(request) -> Prefetch:
+    """
+    Возвращает prefetch рецептов авторов с учетом параметра recipes_limit.
+
+    Ограничение применяется коррелированным подзапросом, поэтому рецепты
+    всех авторов страницы загружаются одним запросом.
+    """
+    queryset = Recipe.objects.all()
+    recipes_limit = get_recipes_limit(request)
+    if recipes_limit:
+        queryset = queryset.filter(
+            pk__in=Subquery(
+                Recipe.objects.filter(author=OuterRef('author')).values('pk')[
+                    :recipes_limit
+                ]
+            )
+        )
+    return Prefetch('recipes', queryset=queryset, to_attr='limited_recipes')
+
+
+def get_ingredient_ids(request) -> set:
+    """
+    Возвращает id ингредиентов из параметра ingredients.
+
+    Параметр принимается как списком через запятую, так и повторением.
+    """
+    value = ','.join(request.query_params.getlist('ingredients'))
+    if not value:
+        raise ValidationError(
+            {'ingredients': consts.COOKABLE_INGREDIENTS_REQUIRED}
+        )
+    ingredient_ids = (
+        set(map(int, value.split(',')))
+        if fullmatch(consts.INGREDIENT_IDS_PARAM_PATTERN, value)
+        else ()
+    )
+    if not ingredient_ids or (
+        len(ingredient_ids) > consts.COOKABLE_MAX_INGREDIENTS
+    ):
+        raise ValidationError(
+            {
+                'ingredients': consts.COOKABLE_INGREDIENTS_INVALID.format(
+                    consts.COOKABLE_MAX_INGREDIENTS
+                )
+            }
+        )
+    return ingredient_ids
+
+
 class UserViewSet(
     ListModelMixin, RetrieveModelMixin, CreateModelMixin, GenericViewSet
 ):
@@ -115,7 +182,7 @@ class UserViewSet(
         user: User = request.user
         if user.avatar:
             user.avatar = None
-            user.save()
+            user.save(update_fields=['avatar'])
             message = consts.AVATAR_DELETED
         else:
             message = consts.AVATAR_NOT_INSTALLED
@@ -137,7 +204,9 @@ class UserViewSet(
         )
         serializer.is_valid(raise_exception=True)
         user.set_password(serializer.validated_data.get('new_password'))
-        user.save()
+        # Пользователь из кеша аутентификации: сохраняется только пароль,
+        # чтобы не перезаписать остальные поля устаревшими значениями.
+        user.save(update_fields=['password'])
         return Response(
             data={'message': consts.PASSWORD_UPDATED},
             status=status.HTTP_204_NO_CONTENT,
@@ -152,7 +221,7 @@ class UserViewSet(
     def subscriptions(self, request):
         user_subscriptions = (
             self.get_queryset()
-            .prefetch_related()
+            .prefetch_related(get_recipes_prefetch(request))
             .filter(is_subscribed=True)
             .order_by('-subscribers__created_at')
         )
@@ -172,50 +241,119 @@ class UserViewSet(
         ],
     )
     def subscribe(self, request, pk):
-
+        """
+        Подписка на пользователя.
+
+        Автор загружается один раз вместе с количеством рецептов и самими
+        рецептами с учетом recipes_limit и используется для ответа.
+        """
+        following = get_object_or_404(
+            self.get_queryset().prefetch_related(
+                get_recipes_prefetch(request)
+            ),
+            pk=pk,
+        )
         serializer = SubscriptionSerializer(
-            data={
-                'user': request.user.id,
-                'following': get_object_or_404(User, pk=pk).id,
-            },
-            context={'request': self.request},
+            data={}, context={'request': self.request}
         )
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        serializer.save(user=request.user, following=following)
 
-        subscription_object = get_object_or_404(self.get_queryset(), id=pk)
+        following.is_subscribed = True
         return Response(
             UserWithRecipeSerializer(
-                subscription_object, context=serializer.context
+                following, context=serializer.context
             ).data,
             status=status.HTTP_201_CREATED,
         )
 
     @subscribe.mapping.delete
     def delete_subscription(self, request, pk):
-        get_object_or_404(User, id=pk)
-
-        if not (
-            subscription := Subscription.objects.filter(
+        try:
+            subscriptions = Subscription.objects.filter(
                 user=request.user.id, following=pk
             )
-        ).exists():
+        except (TypeError, ValueError):
+            raise NotFound()
+        deleted, _ = subscriptions.delete()
+        if deleted:
             return Response(
-                {'message': consts.NO_SUBSCRIPTION},
-                status=status.HTTP_400_BAD_REQUEST,
+                status=status.HTTP_204_NO_CONTENT,
             )
-        subscription.delete()
+        get_object_or_404(User, id=pk)
         return Response(
-            status=status.HTTP_204_NO_CONTENT,
+            {'message': consts.NO_SUBSCRIPTION},
+            status=status.HTTP_400_BAD_REQUEST,
         )
 
 
+def get_recipe_etag(view) -> Optional[str]:
+    """
+    Возвращает ETag рецепта по одной строке без prefetch-запросов.
+
+    Для авторизованного пользователя в ETag входят флаги избранного,
+    корзины и подписки, которые в get_queryset добавляются аннотациями.
+    Выбор полей параметром fields входит в адрес ответа и в ETag
+    не учитывается.
+    """
+    fields = [
+        'updated_at',
+        *(f'author__{field}' for field in consts.RECIPE_ETAG_AUTHOR_FIELDS),
+    ]
+    try:
+        queryset = view.get_queryset()
+        # Флаги, не вошедшие в ответ (параметр fields), не аннотируются.
+        fields += queryset.query.annotations
+        values = (
+            queryset.prefetch_related(None)
+            .filter(pk=view.kwargs['pk'])
+            .values_list(*fields)
+            .first()
+        )
+    except (TypeError, ValueError):
+        return None
+    if values is None:
+        return None
+    return hash_etag(values, get_generation(Tag), get_generation(Ingredient))
+
+
+def get_catalog_record(catalog, pk) -> tuple:
+    record = catalog.get(int(pk)) if pk.isdecimal() else None
+    if record is None:
+        raise NotFound()
+    return record
+
+
+# Справочники меняются только через админку и загрузку данных, поэтому
+# ответы кешируются публично и проверяются по поколению модели.
+tag_conditional = conditional(
+    generation_etag(Tag),
+    generation_last_modified(Tag),
+    public=True,
+    max_age=consts.TAGS_MAX_AGE,
+)
+ingredient_conditional = conditional(
+    generation_etag(Ingredient),
+    generation_last_modified(Ingredient),
+    public=True,
+    max_age=consts.INGREDIENTS_MAX_AGE,
+)
+
+
 class TagViewSet(ReadOnlyModelViewSet):
     """Обработчик запросов к модели Tag."""
 
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
 
+    @tag_conditional
+    def list(self, request, *args, **kwargs):
+        return Response([tag._asdict() for tag in tag_catalog.all()])
+
+    @tag_conditional
+    def retrieve(self, request, pk, *args, **kwargs):
+        return Response(get_catalog_record(tag_catalog, pk)._asdict())
+
 
 class RecipeViewSet(ModelViewSet):
     """Обработчик запросов к модели Recipe."""
@@ -234,29 +372,69 @@ class RecipeViewSet(ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    @conditional(get_recipe_etag, per_user=True, no_cache=True)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     def get_queryset(self):
-        queryset = Recipe.objects.prefetch_related(
-            Prefetch(
-                lookup='recipe_ingredients',
-                queryset=RecipeIngredient.objects.select_related('ingredient'),
-                to_attr='ingredient_amounts',
-            ),
-            'tags',
-        ).select_related('author')
-        if self.request.user.is_authenticated:
-            return queryset.annotate(
-                is_favorited=Exists(
-                    Favorite.objects.filter(
-                        user=self.request.user, recipe=OuterRef('pk')
+        """
+        Рецепты с данными для RecipeReadSerializer.
+
+        Если параметр fields ограничивает поля ответа, не загружаются
+        ингредиенты, теги, автор, флаги и текст рецепта, которых нет
+        в ответе.
+        """
+        requested = get_requested_fields(self.request)
+
+        def is_requested(field: str) -> bool:
+            return requested is None or field in requested
+
+        queryset = Recipe.objects.all()
+        if is_requested('ingredients'):
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    lookup='recipe_ingredients',
+                    queryset=RecipeIngredient.objects.select_related(
+                        'ingredient'
                     ),
-                ),
-                is_in_shopping_cart=Exists(
-                    Purchase.objects.filter(
-                        user=self.request.user, recipe=OuterRef('pk')
-                    )
-                ),
+                    to_attr='ingredient_amounts',
+                )
             )
-        return queryset
+        if is_requested('tags'):
+            queryset = queryset.prefetch_related('tags')
+        if is_requested('author'):
+            queryset = queryset.select_related('author')
+        if not is_requested('text'):
+            queryset = queryset.defer('text')
+        if not self.request.user.is_authenticated:
+            return queryset
+
+        annotations = {
+            'is_favorited': Exists(
+                Favorite.objects.filter(
+                    user=self.request.user, recipe=OuterRef('pk')
+                ),
+            ),
+            'is_in_shopping_cart': Exists(
+                Purchase.objects.filter(
+                    user=self.request.user, recipe=OuterRef('pk')
+                )
+            ),
+            'author_is_subscribed': Exists(
+                Subscription.objects.filter(
+                    user=self.request.user, following=OuterRef('author')
+                )
+            ),
+        }
+        return queryset.annotate(
+            **{
+                name: annotation
+                for name, annotation in annotations.items()
+                if is_requested(
+                    'author' if name == 'author_is_subscribed' else name
+                )
+            }
+        )
 
     @action(
         methods=['get'],
@@ -268,15 +446,99 @@ class RecipeViewSet(ModelViewSet):
         recipe = get_object_or_404(Recipe, id=pk)
         return Response(data={'short-link': recipe.get_short_url})
 
+    @action(
+        methods=['get'],
+        detail=False,
+        url_name='cookable',
+        permission_classes=[AllowAny],
+    )
+    def cookable(self, request):
+        """
+        Рецепты, которые можно приготовить из имеющихся ингредиентов.
+
+        Рецепты ранжируются индексом в памяти по доле ингредиентов рецепта,
+        которые есть у пользователя, из БД загружается только страница.
+        """
+        ranked = cookable_index.search(
+            get_ingredient_ids(request), limit=consts.COOKABLE_MAX_RESULTS
+        )
+        page = self.paginate_queryset(ranked)
+        recipes = self.get_queryset().in_bulk(
+            [recipe_id for recipe_id, _ in page]
+        )
+        results = []
+        for recipe_id, coverage in page:
+            recipe = recipes.get(recipe_id)
+            if recipe is not None:
+                recipe.coverage = coverage
+                results.append(recipe)
+        serializer = CookableRecipeSerializer(
+            results, many=True, context=self.get_serializer_context()
+        )
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        methods=['get'],
+        detail=False,
+        url_name='feed',
+        permission_classes=[IsAuthenticated],
+    )
+    def feed(self, request):
+        """
+        Лента рецептов авторов, на которых подписан пользователь.
+
+        Лента заранее сформирована при публикации рецептов, поэтому
+        страница - срез по индексу ленты.
+        """
+        page = self.paginate_queryset(Timeline(request.user.id))
+        recipes = self.get_queryset().in_bulk(page)
+        serializer = self.get_serializer(
+            [recipes[recipe_id] for recipe_id in page if recipe_id in recipes],
+            many=True,
+        )
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        methods=['get'],
+        detail=True,
+        url_name='similar',
+        permission_classes=[AllowAny],
+    )
+    def similar(self, request, pk):
+        """
+        Похожие рецепты.
+
+        Списки заранее рассчитываются командой compute_similar_recipes,
+        поэтому ответ - одно чтение по индексу.
+        """
+        try:
+            recipe_id = int(pk)
+        except (TypeError, ValueError):
+            raise NotFound()
+        similar_recipes = SimilarRecipe.objects.filter(
+            recipe_id=recipe_id
+        ).select_related('similar')[: get_recipes_limit(request)]
+        if (
+            not similar_recipes
+            and not Recipe.objects.filter(pk=recipe_id).exists()
+        ):
+            raise NotFound()
+        recipes = []
+        for similar_recipe in similar_recipes:
+            similar_recipe.similar.score = similar_recipe.score
+            recipes.append(similar_recipe.similar)
+        return Response(
+            SimilarRecipeSerializer(
+                recipes, many=True, context={'request': request}
+            ).data
+        )
+
     @staticmethod
     def create_related_instance(serializer_class, pk, request):
         instance = get_object_or_404(Recipe, id=pk)
-        serializer = serializer_class(
-            data={'user': request.user.pk, 'recipe': instance.id},
-            context={'request': request},
-        )
+        serializer = serializer_class(data={}, context={'request': request})
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        serializer.save(user=request.user, recipe=instance)
         return Response(
             RecipeSimpleSerializer(instance).data,
             status=status.HTTP_201_CREATED,
@@ -289,21 +551,23 @@ class RecipeViewSet(ModelViewSet):
         request,
         exist_error_message=consts.RELATED_INSTANCE_NOT_EXIST,
     ):
-        if not Recipe.objects.filter(pk=pk).exists():
+        try:
+            related_instances = related_model.objects.filter(
+                user=request.user.id, recipe=pk
+            )
+        except (TypeError, ValueError):
             raise NotFound()
-
-        deleted, _ = related_model.objects.filter(
-            user=request.user.id, recipe=pk
-        ).delete()
-
-        if not deleted:
+        deleted, _ = related_instances.delete()
+        if deleted:
             return Response(
-                {'message': exist_error_message},
-                status=status.HTTP_400_BAD_REQUEST,
+                status=status.HTTP_204_NO_CONTENT,
             )
 
+        if not Recipe.objects.filter(pk=pk).exists():
+            raise NotFound()
         return Response(
-            status=status.HTTP_204_NO_CONTENT,
+            {'message': exist_error_message},
+            status=status.HTTP_400_BAD_REQUEST,
         )
 
     @action(
@@ -352,6 +616,118 @@ class RecipeViewSet(ModelViewSet):
             exist_error_message=consts.RECIPE_NOT_IN_SHOPPING_CART,
         )
 
+    @staticmethod
+    def get_bulk_recipes(related_model, request) -> tuple:
+        """
+        Проверяет список id рецептов из тела запроса.
+
+        Одним запросом определяет существующие рецепты и то, связаны ли они
+        уже с пользователем.
+
+        :return: id рецептов без повторов и словарь признаков связи
+        существующих рецептов.
+        """
+        serializer = RecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        recipe_ids = list(dict.fromkeys(serializer.validated_data['recipes']))
+        related = dict(
+            Recipe.objects.filter(id__in=recipe_ids)
+            .annotate(
+                is_related=Exists(
+                    related_model.objects.filter(
+                        user=request.user, recipe=OuterRef('pk')
+                    )
+                )
+            )
+            .values_list('id', 'is_related')
+        )
+        return recipe_ids, related
+
+    @staticmethod
+    def get_bulk_response(recipe_ids, related, related_status, other_status):
+        """Возвращает результат пакетной операции для каждого id."""
+        return Response(
+            [
+                {
+                    'id': recipe_id,
+                    'status': (
+                        (
+                            related_status
+                            if related[recipe_id]
+                            else other_status
+                        )
+                        if recipe_id in related
+                        else consts.BULK_NOT_FOUND
+                    ),
+                }
+                for recipe_id in recipe_ids
+            ]
+        )
+
+    @classmethod
+    def bulk_create_related(cls, related_model, request):
+        recipe_ids, related = cls.get_bulk_recipes(related_model, request)
+        related_model.objects.bulk_create(
+            [
+                related_model(user=request.user, recipe_id=recipe_id)
+                for recipe_id, is_related in related.items()
+                if not is_related
+            ],
+            ignore_conflicts=True,
+        )
+        return cls.get_bulk_response(
+            recipe_ids, related, consts.BULK_ALREADY_ADDED, consts.BULK_ADDED
+        )
+
+    @classmethod
+    def bulk_delete_related(cls, related_model, request):
+        recipe_ids, related = cls.get_bulk_recipes(related_model, request)
+        related_model.objects.filter(
+            user=request.user,
+            recipe_id__in=[
+                recipe_id
+                for recipe_id, is_related in related.items()
+                if is_related
+            ],
+        ).delete()
+        return cls.get_bulk_response(
+            recipe_ids, related, consts.BULK_REMOVED, consts.BULK_NOT_ADDED
+        )
+
+    @action(
+        methods=['post'],
+        detail=False,
+        url_path='favorite',
+        url_name='favorite_bulk',
+        permission_classes=[
+            IsAuthenticated,
+        ],
+    )
+    def favorite_bulk(self, request):
+        """Пакетное добавление рецептов в избранное."""
+        return self.bulk_create_related(Favorite, request)
+
+    @favorite_bulk.mapping.delete
+    def delete_favorite_bulk(self, request):
+        return self.bulk_delete_related(Favorite, request)
+
+    @action(
+        methods=['post'],
+        detail=False,
+        url_path='shopping_cart',
+        url_name='purchase_bulk',
+        permission_classes=[
+            IsAuthenticated,
+        ],
+    )
+    def shopping_cart_bulk(self, request):
+        """Пакетное добавление рецептов в список покупок."""
+        return self.bulk_create_related(Purchase, request)
+
+    @shopping_cart_bulk.mapping.delete
+    def delete_shopping_cart_bulk(self, request):
+        return self.bulk_delete_related(Purchase, request)
+
     @action(
         methods=['get'],
         detail=False,
@@ -399,5 +775,23 @@ class IngredientViewSet(ReadOnlyModelViewSet):
 
     queryset = Ingredient.objects.all()
     serializer_class = IngredientsSerializer
-    filter_backends = (DoubleSearchName,)
-    search_fields = ('name',)
+
+    @ingredient_conditional
+    def list(self, request, *args, **kwargs):
+        """
+        Ингредиенты из справочника в памяти.
+
+        С параметром name возвращаются ингредиенты, название которых
+        содержит name: сначала начинающиеся с него.
+        """
+        name = request.query_params.get('name')
+        ingredients = (
+            ingredient_catalog.search(name)
+            if name
+            else ingredient_catalog.all()
+        )
+        return Response([ingredient._asdict() for ingredient in ingredients])
+
+    @ingredient_conditional
+    def retrieve(self, request, pk, *args, **kwargs):
+        return Response(get_catalog_record(ingredient_catalog, pk)._asdict())
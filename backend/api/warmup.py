@@ -0,0 +1,39 @@
+import logging
+
+from django.db import DatabaseError, connections
+from django.urls import get_resolver
+
+from api.utils import register_fonts
+from foodgram.catalog import catalogs
+from foodgram.cookable import cookable_index
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up() -> None:
+    """
+    Прогревает кеши процесса.
+
+    Вызывается в мастер-процессе gunicorn до форка воркеров, поэтому всё
+    загруженное здесь разделяется воркерами через copy-on-write.
+    Соединения с БД закрываются, чтобы воркеры не унаследовали сокеты.
+    """
+    register_fonts()
+    get_resolver().reverse_dict
+    for model, catalog in catalogs.items():
+        try:
+            catalog.load()
+        except DatabaseError as error:
+            logger.warning(
+                'Не удалось загрузить справочник %s: %s',
+                model._meta.verbose_name_plural,
+                error,
+            )
+    try:
+        cookable_index.build()
+    except DatabaseError as error:
+        logger.warning(
+            'Не удалось построить индекс "Что приготовить": %s', error
+        )
+    finally:
+        connections.close_all()
@@ -1,3 +1,4 @@
+import sys
 from pathlib import Path
 
 from config import config
@@ -36,13 +37,17 @@ INSTALLED_APPS = [
     'django_filters',
     'rest_framework.authtoken',
     'djoser',
-    'debug_toolbar',
     'foodgram.apps.FoodgramConfig',
     'api.apps.ApiConfig',
     'users.apps.UsersConfig',
+    'benchmarks.apps.BenchmarksConfig',
+    'jobs.apps.JobsConfig',
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',
+    'api.middleware.QueryPatternMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -50,9 +55,12 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+if DEBUG:
+    INSTALLED_APPS += ['debug_toolbar']
+    MIDDLEWARE += ['debug_toolbar.middleware.DebugToolbarMiddleware']
+
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
@@ -101,6 +109,25 @@ else:
     }
 
 
+# Основной хешер выбирается переменной PASSWORD_HASHER, остальные нужны
+# для проверки старых хешей: при входе они пересчитываются основным.
+PASSWORD_HASHER_CLASSES = {
+    'scrypt': 'users.hashers.ScryptPasswordHasher',
+    'argon2': 'users.hashers.Argon2PasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+PASSWORD_HASHERS = [
+    PASSWORD_HASHER_CLASSES[config.django_settings.password_hasher],
+    *(
+        hasher
+        for name, hasher in PASSWORD_HASHER_CLASSES.items()
+        if name != config.django_settings.password_hasher
+    ),
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+PASSWORD_HASHING_THREADS = config.django_settings.password_hashing_threads
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -149,11 +176,84 @@ AUTH_USER_MODEL = 'users.CustomUser'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media/'
 
+METRICS_DIR = config.django_settings.metrics_dir or None
+
+# Кеш 'default' локален для процесса, 'shared' доступен всем воркерам
+# gunicorn и используется для синхронизации их внутренних индексов.
+# 'journal' хранит журнал изменений индекса "Что приготовить" отдельно,
+# чтобы его записи не вытеснялись токенами и другими данными.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': config.django_settings.shared_cache_backend,
+        'LOCATION': config.django_settings.shared_cache_location,
+    },
+    'journal': {
+        'BACKEND': config.django_settings.journal_cache_backend,
+        'LOCATION': config.django_settings.journal_cache_location,
+        'KEY_PREFIX': 'journal',
+    },
+}
+# Встроенные кеши Django удаляют случайные записи сверх MAX_ENTRIES
+# (по умолчанию 300). В журнале не больше COOKABLE_MAX_GENERATION_GAP
+# записей, поэтому предел с запасом исключает вытеснение. В общем кеше
+# хранится по записи на каждый активный токен (AUTH_TOKEN_SHARED_TTL),
+# предел рассчитан на десятки тысяч активных пользователей; при большем
+# числе лучше использовать Redis или Memcached.
+CULLING_CACHE_BACKENDS = (
+    'django.core.cache.backends.filebased.FileBasedCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.db.DatabaseCache',
+)
+CACHE_MAX_ENTRIES = {'shared': 50_000, 'journal': 10_000}
+for alias, max_entries in CACHE_MAX_ENTRIES.items():
+    if CACHES[alias]['BACKEND'] in CULLING_CACHE_BACKENDS:
+        CACHES[alias]['OPTIONS'] = {'MAX_ENTRIES': max_entries}
+
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+
+# Обнаружение N+1: запрос одного вида, повторенный NPLUSONE_THRESHOLD раз
+# за запрос к API, вызывает исключение в тестах и логируется в остальных
+# случаях. Исключения - пары (шаблон имени представления, регулярное
+# выражение SQL), например ('UserViewSet.*', 'users_').
+NPLUSONE_THRESHOLD = 5
+NPLUSONE_RAISE = TESTING
+NPLUSONE_ALLOWLIST = []
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.AllowAny'],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
+    ],
+    # ORJSONRenderer стоит первым, но выбирается только по Accept
+    # с параметром encoder=orjson, см. api/renderers.py.
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.JSONRenderer',
+        'api.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttles.UserTokenBucketThrottle',
+        'api.throttles.IPTokenBucketThrottle',
+    ],
+    # IP клиента берется из X-Forwarded-For, который выставляет nginx.
+    'NUM_PROXIES': 1,
+}
+
+# Лимиты запросов для дорогих действий, см. api/throttles.py.
+THROTTLE_CACHE_ALIAS = config.django_settings.throttle_cache
+THROTTLE_RATES = {
+    'recipes.create': {'user': '30/hour:10', 'ip': '100/hour:20'},
+    'recipes.update': {'user': '60/hour:10', 'ip': '200/hour:20'},
+    'recipes.partial_update': {'user': '60/hour:10', 'ip': '200/hour:20'},
+    'recipes.download_shopping_cart': {'user': '10/min', 'ip': '30/min'},
+    'users.create': {'ip': '20/hour:5'},
+    'users.set_password': {'user': '5/hour', 'ip': '20/hour'},
+    'users.update_avatar': {'user': '30/hour:5', 'ip': '100/hour:20'},
+    'TokenCreateView': {'ip': '20/min'},
 }
 
 LOGIN_FIELD = 'email'
@@ -3,12 +3,13 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
-from api_foodgram.views import redirect_to_recipe
+from api_foodgram.views import metrics, redirect_to_recipe
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
     path('s/<str:link_id>/', redirect_to_recipe),
+    path('metrics', metrics),
 ]
 
 if settings.DEBUG:
@@ -1,8 +1,18 @@
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, redirect
 
+from api.metrics import registry
 from foodgram.models import Recipe
 
 
 def redirect_to_recipe(request, link_id):
     recipe = get_object_or_404(Recipe, short_link_id=link_id)
     return redirect(to=f'/recipes/{recipe.id}/')
+
+
+def metrics(request):
+    """Отдает метрики запросов в формате Prometheus."""
+    return HttpResponse(
+        registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -0,0 +1,89 @@
+# Масштабы набора данных
+SCALES = {
+    'small': {
+        'users': 50,
+        'recipes': 300,
+        'favorites_per_user': 10,
+        'purchases_per_user': 5,
+        'subscriptions_per_user': 5,
+    },
+    'medium': {
+        'users': 1_000,
+        'recipes': 10_000,
+        'favorites_per_user': 30,
+        'purchases_per_user': 10,
+        'subscriptions_per_user': 20,
+    },
+    'large': {
+        'users': 10_000,
+        'recipes': 100_000,
+        'favorites_per_user': 50,
+        'purchases_per_user': 15,
+        'subscriptions_per_user': 50,
+    },
+}
+DEFAULT_SCALE = 'small'
+MIN_RECIPE_INGREDIENTS = 3
+MAX_RECIPE_INGREDIENTS = 12
+MAX_RECIPE_TAGS = 3
+BATCH_SIZE = 5_000
+
+USER_PASSWORD = 'benchmark-password'
+USERNAME_TEMPLATE = 'bench_{}_{}'
+EMAIL_TEMPLATE = 'bench_{}_{}@example.com'
+RECIPE_IMAGE = 'recipes/ivan777.jpeg'
+SHORT_LINK_ID_LENGTH = 6
+# Пути относительно корня проекта и каталога backend.
+INGREDIENTS_FILE = 'data/ingredients.csv'
+FIXTURE_FILE = 'fixtures/ingredients_tags.json'
+
+# PNG 1x1 для загрузки изображений рецептов и аватаров
+IMAGE_BASE64 = (
+    'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABAQMAAAAl21bKAAAA'
+    'A1BMVEX/AAAZ4gk3AAAACklEQVQI12NgAAAAAgAB4iG8MwAAAABJRU5ErkJggg=='
+)
+BULK_RECIPES = 7
+
+# Прогон
+DEFAULT_REQUESTS = 1_000
+DEFAULT_WARMUP = 50
+DEFAULT_SEED = 42
+DEFAULT_MIX = 'mixed'
+PERCENTILES = (50, 95, 99)
+SERVER_TIMING_QUERIES_PATTERN = r'desc="(\d+) queries"'
+REGRESSION_THRESHOLD = 0.1
+# Наибольшее число SQL-запросов на запрос с учетом проверки токена
+# и обновления лент. В SQLite учитываются и запросы BEGIN.
+QUERY_BUDGETS = {
+    'users-subscribe': 9,
+    'users-unsubscribe': 5,
+    'recipes-favorite-add': 4,
+    'recipes-favorite-remove': 3,
+    'recipes-cart-add': 4,
+    'recipes-cart-remove': 3,
+}
+
+# Бенчмарк индекса "Что приготовить"
+COOKABLE_RECIPES = 1_000_000
+COOKABLE_INGREDIENTS = 2_200
+COOKABLE_QUERIES = 200
+COOKABLE_CHANGES = 5_000
+COOKABLE_QUERY_INGREDIENTS = (5, 20)
+# Степень распределения популярности ингредиентов: соль и вода встречаются
+# в большинстве рецептов, экзотические ингредиенты - в единицах.
+COOKABLE_INGREDIENT_SKEW = 3
+COOKABLE_RESULTS_LIMIT = 600
+
+# Бенчмарк ограничения частоты запросов
+THROTTLE_CHECKS = 10_000
+THROTTLE_WARMUP = 100
+THROTTLE_UNLIMITED_RATE = '1000000/s'
+THROTTLE_BUDGET_US = 100
+
+# Бенчмарк хеширования паролей
+HASHING_PASSWORDS = 20
+
+# Бенчмарк рендереров
+RENDER_RECIPES = 50
+RENDER_REPEATS = 200
+RENDER_TEXT_SENTENCES = 20
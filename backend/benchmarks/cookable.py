@@ -0,0 +1,115 @@
+"""
+Бенчмарк индекса "Что приготовить" на синтетическом наборе рецептов.
+
+Индекс строится напрямую из массивов пар (рецепт, ингредиент), без БД,
+поэтому масштаб в миллион рецептов не требует наполнения базы.
+"""
+
+import time
+
+import numpy as np
+
+from benchmarks import consts
+from benchmarks.runner import percentile
+from foodgram.cookable import IndexState
+
+
+def generate_pairs(
+    rng: np.random.Generator, recipes: int, ingredients: int
+) -> tuple:
+    """Генерирует уникальные пары (рецепт, ингредиент)."""
+    sizes = rng.integers(
+        consts.MIN_RECIPE_INGREDIENTS,
+        consts.MAX_RECIPE_INGREDIENTS + 1,
+        recipes,
+    )
+    recipe_ids = np.repeat(np.arange(1, recipes + 1), sizes)
+    ingredient_ids = 1 + (
+        ingredients
+        * rng.random(len(recipe_ids)) ** consts.COOKABLE_INGREDIENT_SKEW
+    ).astype(np.int64)
+    keys = np.unique(recipe_ids * (ingredients + 1) + ingredient_ids)
+    return keys // (ingredients + 1), keys % (ingredients + 1)
+
+
+def measure_searches(state: IndexState, queries: list, limit: int) -> tuple:
+    timings = []
+    found = 0
+    for query in queries:
+        started = time.perf_counter()
+        found += len(state.search(query, limit))
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings, found
+
+
+def summarize(timings: list) -> dict:
+    return {
+        f'p{percent}': round(percentile(timings, percent), 3)
+        for percent in consts.PERCENTILES
+    }
+
+
+def run(
+    recipes: int = consts.COOKABLE_RECIPES,
+    ingredients: int = consts.COOKABLE_INGREDIENTS,
+    queries: int = consts.COOKABLE_QUERIES,
+    changes: int = consts.COOKABLE_CHANGES,
+    seed: int = consts.DEFAULT_SEED,
+) -> dict:
+    """
+    Измеряет построение индекса, поиск и поиск после инкрементальных
+    изменений.
+
+    :return: Результаты в миллисекундах и мегабайтах.
+    """
+    rng = np.random.default_rng(seed)
+    recipe_ids, ingredient_ids = generate_pairs(rng, recipes, ingredients)
+
+    started = time.perf_counter()
+    state = IndexState.from_pairs(recipe_ids, ingredient_ids, generation=0)
+    build_ms = (time.perf_counter() - started) * 1000
+    memory_mb = (
+        sum(array.nbytes for array in state.postings.values())
+        + state.sizes.nbytes
+    ) / 2**20
+
+    low, high = consts.COOKABLE_QUERY_INGREDIENTS
+    query_sets = [
+        rng.choice(
+            np.arange(1, ingredients + 1),
+            size=rng.integers(low, high + 1),
+            replace=False,
+        ).tolist()
+        for _ in range(queries)
+    ]
+    search_timings, found = measure_searches(
+        state, query_sets, consts.COOKABLE_RESULTS_LIMIT
+    )
+
+    changed = rng.integers(1, recipes + changes + 1, changes)
+    started = time.perf_counter()
+    state = state.apply(
+        {
+            int(recipe_id): frozenset(
+                rng.integers(1, ingredients + 1, 8).tolist()
+            )
+            for recipe_id in changed
+        },
+        generation=1,
+    )
+    apply_ms = (time.perf_counter() - started) * 1000
+    overlay_timings, _ = measure_searches(
+        state, query_sets, consts.COOKABLE_RESULTS_LIMIT
+    )
+
+    return {
+        'recipes': recipes,
+        'pairs': len(recipe_ids),
+        'build_ms': round(build_ms, 1),
+        'memory_mb': round(memory_mb, 1),
+        'search_ms': summarize(search_timings),
+        'average_results': found // max(queries, 1),
+        'apply_changes': changes,
+        'apply_ms': round(apply_ms, 1),
+        'search_with_overlay_ms': summarize(overlay_timings),
+    }
@@ -0,0 +1,264 @@
+"""Генерация синтетического набора данных для бенчмарков."""
+
+import csv
+import json
+from dataclasses import dataclass, field
+from random import Random
+from uuid import uuid4
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from rest_framework.authtoken.models import Token
+
+from benchmarks import consts
+from foodgram.feed import rebuild_feeds
+from foodgram.models import (
+    Favorite,
+    Ingredient,
+    Purchase,
+    Recipe,
+    RecipeIngredient,
+    Tag,
+    User,
+)
+from users.models import Subscription
+
+
+@dataclass
+class Dataset:
+    """Идентификаторы объектов, с которыми работают сценарии."""
+
+    tokens: dict = field(default_factory=dict)
+    user_ids: list = field(default_factory=list)
+    recipe_ids: list = field(default_factory=list)
+    recipes_by_author: dict = field(default_factory=dict)
+    tag_ids: list = field(default_factory=list)
+    tag_slugs: list = field(default_factory=list)
+    ingredient_ids: list = field(default_factory=list)
+    ingredient_names: list = field(default_factory=list)
+
+    @classmethod
+    def load(cls, prefix: str = 'bench_') -> 'Dataset':
+        """Собирает набор данных из объектов, уже находящихся в БД."""
+        dataset = cls()
+        for user_id, key in Token.objects.filter(
+            user__username__startswith=prefix
+        ).values_list('user_id', 'key'):
+            dataset.tokens[user_id] = key
+        dataset.user_ids = list(dataset.tokens)
+        for recipe_id, author_id in Recipe.objects.filter(
+            author_id__in=dataset.user_ids
+        ).values_list('id', 'author_id'):
+            dataset.recipe_ids.append(recipe_id)
+            dataset.recipes_by_author.setdefault(author_id, []).append(
+                recipe_id
+            )
+        for tag_id, slug in Tag.objects.values_list('id', 'slug'):
+            dataset.tag_ids.append(tag_id)
+            dataset.tag_slugs.append(slug)
+        for ingredient_id, name in Ingredient.objects.values_list(
+            'id', 'name'
+        ):
+            dataset.ingredient_ids.append(ingredient_id)
+            dataset.ingredient_names.append(name)
+        return dataset
+
+
+def skewed_weights(count: int, rng: Random, alpha: float = 1.2) -> list:
+    """Возвращает веса с распределением Парето для выборки популярности."""
+    return [rng.paretovariate(alpha) for _ in range(count)]
+
+
+def sample_unique(
+    population: list, weights: list, count: int, rng: Random
+) -> set:
+    """Выбирает до count уникальных элементов с учетом весов."""
+    if not population or not count:
+        return set()
+    return set(rng.choices(population, weights=weights, k=count))
+
+
+def load_reference_data():
+    """Загружает теги и ингредиенты, если таблицы пусты."""
+    if not Tag.objects.exists() or not Ingredient.objects.exists():
+        with open(
+            settings.BASE_DIR / consts.FIXTURE_FILE, encoding='utf-8'
+        ) as file:
+            fixture = json.load(file)
+
+    if not Tag.objects.exists():
+        Tag.objects.bulk_create(
+            Tag(pk=item['pk'], **item['fields'])
+            for item in fixture
+            if item['model'] == 'foodgram.tag'
+        )
+
+    if not Ingredient.objects.exists():
+        ingredients_file = settings.BASE_DIR.parent / consts.INGREDIENTS_FILE
+        if ingredients_file.exists():
+            with open(ingredients_file, encoding='utf-8') as file:
+                ingredients = [
+                    Ingredient(name=name, measurement_unit=unit)
+                    for name, unit in csv.reader(file)
+                ]
+        else:
+            ingredients = [
+                Ingredient(pk=item['pk'], **item['fields'])
+                for item in fixture
+                if item['model'] == 'foodgram.ingredient'
+            ]
+        Ingredient.objects.bulk_create(
+            ingredients, batch_size=consts.BATCH_SIZE
+        )
+
+
+def generate_short_link_ids(count: int) -> list:
+    existing = set(Recipe.objects.values_list('short_link_id', flat=True))
+    identifiers = []
+    while len(identifiers) < count:
+        identifier = uuid4().hex[: consts.SHORT_LINK_ID_LENGTH]
+        if identifier not in existing:
+            existing.add(identifier)
+            identifiers.append(identifier)
+    return identifiers
+
+
+def seed(scale: dict, rng: Random) -> Dataset:
+    """
+    Наполняет БД пользователями, рецептами, избранным, покупками и
+    подписками заданного масштаба.
+
+    Авторы, рецепты и ингредиенты выбираются с распределением Парето, чтобы
+    нагрузка была похожа на реальную: у немногих авторов много рецептов и
+    подписчиков, немногие рецепты собирают большую часть избранного.
+
+    :param scale: Масштаб из consts.SCALES.
+    :param rng: Генератор случайных чисел.
+    :return: Набор созданных объектов.
+    """
+    load_reference_data()
+    run_id = uuid4().hex[:8]
+    password = make_password(consts.USER_PASSWORD)
+
+    User.objects.bulk_create(
+        (
+            User(
+                username=consts.USERNAME_TEMPLATE.format(run_id, index),
+                email=consts.EMAIL_TEMPLATE.format(run_id, index),
+                first_name='Бенчмарк',
+                last_name=str(index),
+                password=password,
+            )
+            for index in range(scale['users'])
+        ),
+        batch_size=consts.BATCH_SIZE,
+    )
+    prefix = consts.USERNAME_TEMPLATE.format(run_id, '')
+    user_ids = list(
+        User.objects.filter(username__startswith=prefix).values_list(
+            'id', flat=True
+        )
+    )
+    Token.objects.bulk_create(
+        (Token(key=Token.generate_key(), user_id=pk) for pk in user_ids),
+        batch_size=consts.BATCH_SIZE,
+    )
+
+    authors = rng.choices(
+        user_ids,
+        weights=skewed_weights(len(user_ids), rng),
+        k=scale['recipes'],
+    )
+    Recipe.objects.bulk_create(
+        (
+            Recipe(
+                name=f'Рецепт {index}',
+                text=f'Описание рецепта {index}. ' * rng.randint(1, 20),
+                cooking_time=rng.randint(1, 180),
+                author_id=author_id,
+                image=consts.RECIPE_IMAGE,
+                short_link_id=short_link_id,
+            )
+            for index, (author_id, short_link_id) in enumerate(
+                zip(authors, generate_short_link_ids(len(authors)))
+            )
+        ),
+        batch_size=consts.BATCH_SIZE,
+    )
+
+    dataset = Dataset.load(prefix)
+    ingredient_weights = skewed_weights(len(dataset.ingredient_ids), rng)
+    RecipeIngredient.objects.bulk_create(
+        (
+            RecipeIngredient(
+                recipe_id=recipe_id,
+                ingredient_id=ingredient_id,
+                amount=rng.randint(1, 1000),
+            )
+            for recipe_id in dataset.recipe_ids
+            for ingredient_id in sample_unique(
+                dataset.ingredient_ids,
+                ingredient_weights,
+                rng.randint(
+                    consts.MIN_RECIPE_INGREDIENTS,
+                    consts.MAX_RECIPE_INGREDIENTS,
+                ),
+                rng,
+            )
+        ),
+        batch_size=consts.BATCH_SIZE,
+    )
+    Recipe.tags.through.objects.bulk_create(
+        (
+            Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+            for recipe_id in dataset.recipe_ids
+            for tag_id in rng.sample(
+                dataset.tag_ids,
+                rng.randint(
+                    1, min(consts.MAX_RECIPE_TAGS, len(dataset.tag_ids))
+                ),
+            )
+        ),
+        batch_size=consts.BATCH_SIZE,
+    )
+
+    recipe_weights = skewed_weights(len(dataset.recipe_ids), rng)
+    for model, per_user in (
+        (Favorite, scale['favorites_per_user']),
+        (Purchase, scale['purchases_per_user']),
+    ):
+        model.objects.bulk_create(
+            (
+                model(user_id=user_id, recipe_id=recipe_id)
+                for user_id in dataset.user_ids
+                for recipe_id in sample_unique(
+                    dataset.recipe_ids,
+                    recipe_weights,
+                    rng.randint(0, per_user * 2),
+                    rng,
+                )
+            ),
+            batch_size=consts.BATCH_SIZE,
+        )
+
+    author_ids = list(dataset.recipes_by_author)
+    author_weights = [
+        len(dataset.recipes_by_author[author_id]) for author_id in author_ids
+    ]
+    Subscription.objects.bulk_create(
+        (
+            Subscription(user_id=user_id, following_id=author_id)
+            for user_id in dataset.user_ids
+            for author_id in sample_unique(
+                author_ids,
+                author_weights,
+                rng.randint(0, scale['subscriptions_per_user'] * 2),
+                rng,
+            )
+            if author_id != user_id
+        ),
+        batch_size=consts.BATCH_SIZE,
+    )
+    # Рецепты и подписки созданы в обход сигналов, ленты заполняются явно.
+    rebuild_feeds(dataset.user_ids)
+    return dataset
@@ -0,0 +1,66 @@
+"""
+Бенчмарк хешеров паролей.
+
+Для каждого хешера измеряется процессорное время одного хеша, откуда
+получается число регистраций в секунду на ядро (регистрация - это один
+хеш пароля), и пропускная способность пула хеширования с заданным числом
+потоков.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from benchmarks import consts
+
+
+def measure_hasher(hasher, passwords: int, threads: int) -> dict:
+    started_cpu = time.process_time()
+    started = time.perf_counter()
+    for number in range(passwords):
+        hasher.encode(f'{consts.USER_PASSWORD}{number}', hasher.salt())
+    cpu_seconds = (time.process_time() - started_cpu) / passwords
+    wall_seconds = (time.perf_counter() - started) / passwords
+
+    # Хеши считаются вне GIL, поэтому пул масштабируется по ядрам.
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        started = time.perf_counter()
+        list(
+            executor.map(
+                lambda number: hasher.encode(
+                    f'{consts.USER_PASSWORD}{number}', hasher.salt()
+                ),
+                range(passwords * threads),
+            )
+        )
+        pool_seconds = time.perf_counter() - started
+
+    return {
+        'hash_ms': round(wall_seconds * 1000, 2),
+        'signups_per_second_per_core': round(1 / cpu_seconds, 1),
+        'pool_threads': threads,
+        'pool_hashes_per_second': round(passwords * threads / pool_seconds, 1),
+    }
+
+
+def run(
+    names: list,
+    passwords: int = consts.HASHING_PASSWORDS,
+    threads: int = 1,
+) -> dict:
+    """
+    Измеряет скорость хешеров из settings.PASSWORD_HASHER_CLASSES.
+
+    :return: Результаты по хешерам; для недоступных хешеров (например,
+    argon2 без пакета argon2-cffi) - описание ошибки.
+    """
+    results = {}
+    for name in names:
+        hasher = import_string(settings.PASSWORD_HASHER_CLASSES[name])()
+        try:
+            results[name] = measure_hasher(hasher, passwords, threads)
+        except ValueError as error:
+            results[name] = {'error': str(error)}
+    return results
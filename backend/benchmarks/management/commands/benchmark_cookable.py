@@ -0,0 +1,49 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+
+from benchmarks import consts
+from benchmarks.cookable import run
+
+
+class Command(BaseCommand):
+    """Команда для бенчмарка индекса "Что приготовить"."""
+
+    help = (
+        'Строит индекс "Что приготовить" на синтетическом наборе рецептов '
+        '(по умолчанию 1 000 000) и измеряет время построения, память, '
+        'p50/p95/p99 поиска и поиска после инкрементальных изменений.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recipes', type=int, default=consts.COOKABLE_RECIPES
+        )
+        parser.add_argument(
+            '--ingredients', type=int, default=consts.COOKABLE_INGREDIENTS
+        )
+        parser.add_argument(
+            '--queries', type=int, default=consts.COOKABLE_QUERIES
+        )
+        parser.add_argument(
+            '--changes', type=int, default=consts.COOKABLE_CHANGES
+        )
+        parser.add_argument('--seed', type=int, default=consts.DEFAULT_SEED)
+        parser.add_argument(
+            '--output', help='Путь к JSON-файлу для сохранения результатов.'
+        )
+
+    def handle(self, *args, **options):
+        results = run(
+            recipes=options['recipes'],
+            ingredients=options['ingredients'],
+            queries=options['queries'],
+            changes=options['changes'],
+            seed=options['seed'],
+        )
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output)
+        sys.stdout.write(output + '\n')
@@ -0,0 +1,50 @@
+import json
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from benchmarks import consts
+from benchmarks.hashing import run
+
+
+class Command(BaseCommand):
+    """Команда для бенчмарка хешеров паролей."""
+
+    help = (
+        'Измеряет время хеширования пароля, число регистраций в секунду '
+        'на ядро и пропускную способность пула хеширования для хешеров '
+        'scrypt, argon2 и pbkdf2.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hashers',
+            nargs='+',
+            choices=settings.PASSWORD_HASHER_CLASSES,
+            default=list(settings.PASSWORD_HASHER_CLASSES),
+        )
+        parser.add_argument(
+            '--passwords', type=int, default=consts.HASHING_PASSWORDS
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=settings.PASSWORD_HASHING_THREADS,
+            help='Число потоков пула хеширования.',
+        )
+        parser.add_argument(
+            '--output', help='Путь к JSON-файлу для сохранения результатов.'
+        )
+
+    def handle(self, *args, **options):
+        results = run(
+            options['hashers'],
+            passwords=options['passwords'],
+            threads=options['threads'],
+        )
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output)
+        sys.stdout.write(output + '\n')
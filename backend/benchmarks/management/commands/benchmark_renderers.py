@@ -0,0 +1,41 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+
+from benchmarks import consts
+from benchmarks.renderers import run
+
+
+class Command(BaseCommand):
+    """Команда для бенчмарка рендереров API."""
+
+    help = (
+        'Сравнивает время рендеринга и размер ответа JSONRenderer, '
+        'ORJSONRenderer и MessagePackRenderer для страницы рецептов '
+        'и полного списка ингредиентов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recipes', type=int, default=consts.RENDER_RECIPES
+        )
+        parser.add_argument(
+            '--renders', type=int, default=consts.RENDER_REPEATS
+        )
+        parser.add_argument('--seed', type=int, default=consts.DEFAULT_SEED)
+        parser.add_argument(
+            '--output', help='Путь к JSON-файлу для сохранения результатов.'
+        )
+
+    def handle(self, *args, **options):
+        results = run(
+            recipes=options['recipes'],
+            renders=options['renders'],
+            seed=options['seed'],
+        )
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output)
+        sys.stdout.write(output + '\n')
@@ -0,0 +1,43 @@
+import json
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import consts
+from benchmarks.throttles import run
+
+
+class Command(BaseCommand):
+    """Команда для бенчмарка ограничения частоты запросов."""
+
+    help = (
+        'Измеряет время проверки ограничений частоты запросов для действия '
+        'без лимита и для действия с неисчерпанным лимитом (среднее, '
+        'p50/p95/p99 в микросекундах). Завершается с ошибкой, если медиана '
+        'для действия без лимита превышает бюджет в 100 мкс.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--checks', type=int, default=consts.THROTTLE_CHECKS
+        )
+        parser.add_argument(
+            '--cache',
+            choices=settings.CACHES,
+            default=settings.THROTTLE_CACHE_ALIAS,
+            help='Кеш для хранения корзин.',
+        )
+        parser.add_argument(
+            '--output', help='Путь к JSON-файлу для сохранения результатов.'
+        )
+
+    def handle(self, *args, **options):
+        results = run(checks=options['checks'], cache_alias=options['cache'])
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output)
+        sys.stdout.write(output + '\n')
+        if not results['within_budget']:
+            raise CommandError('Проверка ограничений превышает бюджет.')
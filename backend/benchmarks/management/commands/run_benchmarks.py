@@ -0,0 +1,205 @@
+import json
+import platform
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from random import Random
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    override_settings,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from benchmarks import consts
+from benchmarks.dataset import Dataset, seed
+from benchmarks.runner import (
+    DjangoTestClient,
+    HTTPClient,
+    Session,
+    check_budgets,
+    compare,
+)
+from benchmarks.scenarios import MIXES
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except OSError:
+        return ''
+
+
+class Command(BaseCommand):
+    """Команда для нагрузочного тестирования API."""
+
+    help = (
+        'Наполняет БД синтетическими данными и прогоняет сценарии нагрузки '
+        'по всем эндпоинтам API. Результаты (p50/p95/p99, количество '
+        'SQL-запросов, RSS) сохраняются в JSON для сравнения прогонов. '
+        'По умолчанию используется тестовая БД и тестовый клиент Django, '
+        'с --server запросы отправляются на запущенный сервер. '
+        'Превышение бюджета SQL-запросов эндпоинта завершает команду '
+        'с ошибкой.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', choices=consts.SCALES, default=consts.DEFAULT_SCALE
+        )
+        parser.add_argument('--mix', choices=MIXES, default=consts.DEFAULT_MIX)
+        parser.add_argument(
+            '--requests', type=int, default=consts.DEFAULT_REQUESTS
+        )
+        parser.add_argument(
+            '--warmup', type=int, default=consts.DEFAULT_WARMUP
+        )
+        parser.add_argument('--seed', type=int, default=consts.DEFAULT_SEED)
+        parser.add_argument(
+            '--server',
+            help='Адрес запущенного сервера, например http://127.0.0.1:7000.',
+        )
+        parser.add_argument(
+            '--populate',
+            action='store_true',
+            help='В режиме --server наполнить данными рабочую БД.',
+        )
+        parser.add_argument(
+            '--output',
+            default='benchmark-results.json',
+            help='Файл для сохранения результатов.',
+        )
+        parser.add_argument(
+            '--compare', help='Файл с результатами предыдущего прогона.'
+        )
+        parser.add_argument(
+            '--fail-on-regression',
+            action='store_true',
+            help='Завершиться с ошибкой при регрессии.',
+        )
+
+    def handle(self, *args, **options):
+        if options['server']:
+            report = self.run_against_server(options)
+        else:
+            report = self.run_in_process(options)
+
+        report['meta'] = {
+            'scale': options['scale'],
+            'mix': options['mix'],
+            'requests': options['requests'],
+            'seed': options['seed'],
+            'mode': 'server' if options['server'] else 'in-process',
+            'database': settings.DATABASES['default']['ENGINE'],
+            'commit': get_commit(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+        }
+        Path(options['output']).write_text(
+            json.dumps(report, indent=2, ensure_ascii=False)
+        )
+        self.write_report(report)
+        exceeded = check_budgets(report)
+        for name, budget, queries in exceeded:
+            self.stdout.write(
+                self.style.ERROR(
+                    f'{name}: {queries} SQL-запросов при бюджете {budget}'
+                )
+            )
+
+        if options['compare']:
+            previous = json.loads(Path(options['compare']).read_text())
+            regressions = self.write_comparison(compare(report, previous))
+            if regressions and options['fail_on_regression']:
+                raise CommandError(
+                    f'Обнаружены регрессии: {", ".join(regressions)}'
+                )
+        if exceeded:
+            raise CommandError(
+                'Превышен бюджет SQL-запросов: '
+                f'{", ".join(name for name, _, _ in exceeded)}'
+            )
+
+    def run_in_process(self, options) -> dict:
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with (
+                tempfile.TemporaryDirectory() as media_root,
+                # Все запросы тестового клиента идут с одного IP-адреса,
+                # лимиты исказили бы результаты.
+                override_settings(MEDIA_ROOT=media_root, THROTTLE_RATES={}),
+            ):
+                dataset = seed(
+                    consts.SCALES[options['scale']], Random(options['seed'])
+                )
+                return self.run_session(DjangoTestClient(), dataset, options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+    def run_against_server(self, options) -> dict:
+        if options['populate']:
+            dataset = seed(
+                consts.SCALES[options['scale']], Random(options['seed'])
+            )
+        else:
+            dataset = Dataset.load()
+        if not dataset.user_ids:
+            raise CommandError(
+                'В БД нет данных для бенчмарка, используйте --populate.'
+            )
+        return self.run_session(
+            HTTPClient(options['server']), dataset, options
+        )
+
+    def run_session(self, client, dataset, options) -> dict:
+        session = Session(client, dataset, options['seed'])
+        session.run(options['mix'], options['requests'], options['warmup'])
+        return session.report()
+
+    def write_report(self, report):
+        self.stdout.write(
+            f'{"эндпоинт":<28}{"n":>6}{"p50":>9}{"p95":>9}{"p99":>9}'
+            f'{"SQL":>7}  статусы'
+        )
+        for name, stats in report['endpoints'].items():
+            queries = stats['queries_mean']
+            self.stdout.write(
+                f'{name:<28}{stats["count"]:>6}'
+                f'{stats["p50_ms"]:>9.2f}{stats["p95_ms"]:>9.2f}'
+                f'{stats["p99_ms"]:>9.2f}'
+                f'{queries if queries is None else round(queries, 1):>7}  '
+                f'{stats["statuses"]}'
+            )
+        rss = report['rss_bytes']
+        megabyte = 1024 * 1024
+        self.stdout.write(
+            f'RSS: старт {rss["start"] / megabyte:.1f} MB, '
+            f'пик {rss["peak"] / megabyte:.1f} MB, '
+            f'конец {rss["end"] / megabyte:.1f} MB'
+        )
+
+    def write_comparison(self, rows) -> list:
+        regressions = []
+        for name, metric, old, new, change, regression in rows:
+            line = f'{name:<28}{metric:<14}{old:>10.2f}{new:>10.2f}'
+            line += f'{change:>+10.1%}'
+            if regression:
+                regressions.append(f'{name} {metric}')
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        return regressions
@@ -0,0 +1,131 @@
+"""
+Бенчмарк рендереров API.
+
+Для страницы из 50 рецептов и полного списка ингредиентов измеряется
+время рендеринга и размер ответа для JSONRenderer, ORJSONRenderer
+и MessagePackRenderer. Данные собираются в том виде, в котором их
+возвращают сериализаторы, поэтому результат не зависит от БД.
+"""
+
+import csv
+import time
+from random import Random
+
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from api.renderers import MessagePackRenderer, ORJSONRenderer
+from benchmarks import consts
+from benchmarks.runner import summarize
+
+RENDERERS = (JSONRenderer, ORJSONRenderer, MessagePackRenderer)
+
+
+def load_ingredients() -> list:
+    with open(
+        settings.BASE_DIR.parent / consts.INGREDIENTS_FILE, encoding='utf-8'
+    ) as file:
+        return ReturnList(
+            (
+                {'id': number, 'name': name, 'measurement_unit': unit}
+                for number, (name, unit) in enumerate(csv.reader(file), 1)
+            ),
+            serializer=None,
+        )
+
+
+def make_recipe(number: int, ingredients: list, rng: Random) -> dict:
+    return ReturnDict(
+        {
+            'id': number,
+            'tags': [
+                {'id': tag_id, 'name': f'Тег {tag_id}', 'slug': f'tag{tag_id}'}
+                for tag_id in rng.sample(range(1, 7), consts.MAX_RECIPE_TAGS)
+            ],
+            'author': {
+                'email': consts.EMAIL_TEMPLATE.format('render', number),
+                'id': number,
+                'username': consts.USERNAME_TEMPLATE.format('render', number),
+                'first_name': 'Имя',
+                'last_name': 'Фамилия',
+                'is_subscribed': rng.random() < 0.5,
+                'avatar': None,
+            },
+            'ingredients': [
+                {**ingredient, 'amount': rng.randint(1, 500)}
+                for ingredient in rng.sample(
+                    ingredients,
+                    rng.randint(
+                        consts.MIN_RECIPE_INGREDIENTS,
+                        consts.MAX_RECIPE_INGREDIENTS,
+                    ),
+                )
+            ],
+            'name': f'Рецепт {number}',
+            'image': f'http://localhost/media/{consts.RECIPE_IMAGE}',
+            'text': 'Описание рецепта. ' * consts.RENDER_TEXT_SENTENCES,
+            'cooking_time': rng.randint(5, 180),
+            'is_favorited': rng.random() < 0.2,
+            'is_in_shopping_cart': rng.random() < 0.1,
+        },
+        serializer=None,
+    )
+
+
+def make_recipe_page(ingredients: list, recipes: int, rng: Random) -> dict:
+    return ReturnDict(
+        {
+            'count': recipes * 10,
+            'next': 'http://localhost/api/recipes/?limit=50&page=2',
+            'previous': None,
+            'results': ReturnList(
+                (
+                    make_recipe(number, ingredients, rng)
+                    for number in range(1, recipes + 1)
+                ),
+                serializer=None,
+            ),
+        },
+        serializer=None,
+    )
+
+
+def measure(renderer, data, renders: int) -> dict:
+    content = renderer.render(data)
+    timings = []
+    for _ in range(renders):
+        started = time.perf_counter()
+        renderer.render(data)
+        timings.append((time.perf_counter() - started) * 1000)
+    return {'bytes': len(content), 'render_ms': summarize(timings)}
+
+
+def run(
+    recipes: int = consts.RENDER_RECIPES,
+    renders: int = consts.RENDER_REPEATS,
+    seed: int = consts.DEFAULT_SEED,
+) -> dict:
+    """
+    Измеряет рендереры на странице рецептов и списке ингредиентов.
+
+    :return: Размер ответа и время рендеринга (мс) по рендерерам, а также
+    признак побайтового совпадения ответов orjson и JSONRenderer.
+    """
+    ingredients = load_ingredients()
+    payloads = {
+        f'recipes_page_{recipes}': make_recipe_page(
+            ingredients, recipes, Random(seed)
+        ),
+        'ingredients': ingredients,
+    }
+    results = {}
+    for name, data in payloads.items():
+        results[name] = {
+            renderer_class.__name__: measure(renderer_class(), data, renders)
+            for renderer_class in RENDERERS
+        }
+        results[name]['orjson_identical'] = ORJSONRenderer().render(
+            data
+        ) == JSONRenderer().render(data)
+    return results
@@ -0,0 +1,274 @@
+"""Выполнение сценариев нагрузки и подсчет статистики."""
+
+import http.client
+import json
+import os
+import re
+import resource
+import time
+from collections import defaultdict
+from random import Random
+from typing import Optional
+from urllib.parse import urlsplit
+
+from django.test import Client
+
+from benchmarks import consts
+from benchmarks.scenarios import MIXES, SCENARIOS
+
+QUERIES_PATTERN = re.compile(consts.SERVER_TIMING_QUERIES_PATTERN)
+JSON_CONTENT_TYPE = 'application/json'
+
+
+def get_rss() -> int:
+    """Возвращает текущий RSS процесса в байтах."""
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(values: list, percent: float) -> float:
+    """Считает перцентиль методом ближайшего ранга."""
+    if not values:
+        return 0
+    values = sorted(values)
+    rank = max(int(round(percent / 100 * len(values) + 0.5)) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+def summarize(timings: list) -> dict:
+    """Среднее и перцентили PERCENTILES для замеров времени."""
+    return {
+        'mean': round(sum(timings) / len(timings), 2),
+        **{
+            f'p{percent}': round(percentile(timings, percent), 2)
+            for percent in consts.PERCENTILES
+        },
+    }
+
+
+class DjangoTestClient:
+    """Выполняет запросы через тестовый клиент Django в текущем процессе."""
+
+    def __init__(self):
+        self.client = Client(HTTP_HOST='localhost')
+
+    def request(self, method, path, data=None, token=None):
+        extra = {}
+        if token:
+            extra['HTTP_AUTHORIZATION'] = f'Token {token}'
+        if data is not None:
+            extra['data'] = json.dumps(data)
+            extra['content_type'] = JSON_CONTENT_TYPE
+        response = getattr(self.client, method)(path, **extra)
+        content = (
+            b''.join(response.streaming_content)
+            if response.streaming
+            else response.content
+        )
+        return (
+            response.status_code,
+            {name.lower(): value for name, value in response.items()},
+            content,
+        )
+
+
+class HTTPClient:
+    """Выполняет запросы к запущенному серверу по HTTP."""
+
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        self.connection = http.client.HTTPConnection(
+            parts.hostname, parts.port or 80
+        )
+
+    def request(self, method, path, data=None, token=None):
+        headers = {}
+        body = None
+        if token:
+            headers['Authorization'] = f'Token {token}'
+        if data is not None:
+            body = json.dumps(data)
+            headers['Content-Type'] = JSON_CONTENT_TYPE
+        self.connection.request(method.upper(), path, body, headers)
+        response = self.connection.getresponse()
+        content = response.read()
+        return (
+            response.status,
+            {name.lower(): value for name, value in response.getheaders()},
+            content,
+        )
+
+
+class Session:
+    """
+    Прогон сценариев: выбирает объекты из набора данных и записывает
+    время, количество SQL-запросов и статус каждого запроса.
+    """
+
+    def __init__(self, client, dataset, seed: int):
+        self.client = client
+        self.dataset = dataset
+        self.rng = Random(seed)
+        self.recording = True
+        self.results = defaultdict(list)
+        self.rss = {'start': get_rss(), 'peak': get_rss()}
+        self.emails = {}
+        self.authors = list(dataset.recipes_by_author)
+
+    def request(
+        self,
+        name: str,
+        method: str,
+        path: str,
+        data: Optional[dict] = None,
+        auth: bool = False,
+        user_id: Optional[int] = None,
+        token: Optional[str] = None,
+    ) -> Optional[dict]:
+        if auth and user_id is None:
+            user_id = self.user_id()
+        if user_id is not None:
+            token = self.dataset.tokens[user_id]
+
+        start = time.perf_counter()
+        status, headers, content = self.client.request(
+            method, path, data, token
+        )
+        elapsed = time.perf_counter() - start
+
+        if self.recording:
+            match = QUERIES_PATTERN.search(headers.get('server-timing', ''))
+            self.results[name].append(
+                (elapsed, int(match[1]) if match else None, status)
+            )
+        if content and headers.get('content-type', '').startswith(
+            JSON_CONTENT_TYPE
+        ):
+            return json.loads(content)
+        return None
+
+    def run(self, mix: str, requests: int, warmup: int):
+        weights = MIXES[mix]
+        names = list(weights)
+        self.recording = False
+        for _ in range(warmup):
+            SCENARIOS[self.rng.choices(names, list(weights.values()))[0]](self)
+        self.recording = True
+        while sum(map(len, self.results.values())) < requests:
+            SCENARIOS[self.rng.choices(names, list(weights.values()))[0]](self)
+            self.rss['peak'] = max(self.rss['peak'], get_rss())
+        self.rss['end'] = get_rss()
+
+    def report(self) -> dict:
+        endpoints = {}
+        for name, results in sorted(self.results.items()):
+            timings = [elapsed * 1000 for elapsed, _, _ in results]
+            queries = [count for _, count, _ in results if count is not None]
+            statuses = defaultdict(int)
+            for _, _, status in results:
+                statuses[str(status)] += 1
+            endpoints[name] = {
+                'count': len(results),
+                'mean_ms': sum(timings) / len(timings),
+                **{
+                    f'p{percent}_ms': percentile(timings, percent)
+                    for percent in consts.PERCENTILES
+                },
+                'queries_mean': (
+                    sum(queries) / len(queries) if queries else None
+                ),
+                'queries_max': max(queries) if queries else None,
+                'statuses': dict(statuses),
+            }
+        return {'endpoints': endpoints, 'rss_bytes': self.rss}
+
+    def page(self) -> int:
+        pages = max(len(self.dataset.recipe_ids) // 6, 1)
+        return min(int(self.rng.paretovariate(1.5)), pages)
+
+    def user_id(self) -> int:
+        return self.rng.choice(self.dataset.user_ids)
+
+    def user_email(self, user_id: int) -> str:
+        if not self.emails:
+            from foodgram.models import User
+
+            self.emails = dict(
+                User.objects.filter(id__in=self.dataset.user_ids).values_list(
+                    'id', 'email'
+                )
+            )
+        return self.emails[user_id]
+
+    def set_token(self, user_id: int, token: str):
+        self.dataset.tokens[user_id] = token
+
+    def author_id(self) -> int:
+        return self.rng.choice(self.authors)
+
+    def recipe_id(self) -> int:
+        return self.rng.choice(self.dataset.recipe_ids)
+
+    def recipe_ids(self, count: int) -> list:
+        return self.rng.sample(self.dataset.recipe_ids, count)
+
+    def tag_id(self) -> int:
+        return self.rng.choice(self.dataset.tag_ids)
+
+    def tag_slug(self) -> str:
+        return self.rng.choice(self.dataset.tag_slugs)
+
+    def ingredient_ids(self, count: int) -> list:
+        return self.rng.sample(self.dataset.ingredient_ids, count)
+
+    def ingredient_prefix(self) -> str:
+        return self.rng.choice(self.dataset.ingredient_names)[:3]
+
+
+def compare(current: dict, previous: dict) -> list:
+    """
+    Сравнивает результаты двух прогонов.
+
+    :return: Список строк (эндпоинт, метрика, было, стало, изменение),
+    изменение больше REGRESSION_THRESHOLD считается регрессией.
+    """
+    rows = []
+    for name, stats in current['endpoints'].items():
+        old_stats = previous['endpoints'].get(name)
+        if not old_stats:
+            continue
+        for metric in ('p95_ms', 'queries_mean'):
+            old, new = old_stats.get(metric), stats.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            rows.append(
+                (
+                    name,
+                    metric,
+                    old,
+                    new,
+                    change,
+                    change > consts.REGRESSION_THRESHOLD,
+                )
+            )
+    return rows
+
+
+def check_budgets(report: dict) -> list:
+    """
+    Проверяет количество SQL-запросов эндпоинтов по QUERY_BUDGETS.
+
+    :return: Список строк (эндпоинт, бюджет, максимум запросов) для
+    эндпоинтов, превысивших бюджет.
+    """
+    return [
+        (name, budget, stats['queries_max'])
+        for name, budget in consts.QUERY_BUDGETS.items()
+        if (stats := report['endpoints'].get(name))
+        and stats['queries_max'] is not None
+        and stats['queries_max'] > budget
+    ]
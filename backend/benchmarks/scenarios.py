@@ -0,0 +1,351 @@
+"""
+Сценарии нагрузки.
+
+Каждый сценарий выполняет один или несколько запросов к API через
+session.request(), изменяющие сценарии возвращают данные в исходное
+состояние, поэтому прогон можно повторять на одном наборе данных.
+"""
+
+from urllib.parse import quote
+from uuid import uuid4
+
+from benchmarks import consts
+
+
+def users_list(session):
+    session.request('users-list', 'get', f'/api/users/?page={session.page()}')
+
+
+def users_detail(session):
+    session.request(
+        'users-detail', 'get', f'/api/users/{session.user_id()}/', auth=True
+    )
+
+
+def users_me(session):
+    session.request('users-me', 'get', '/api/users/me/', auth=True)
+
+
+def users_create(session):
+    identifier = uuid4().hex[:12]
+    session.request(
+        'users-create',
+        'post',
+        '/api/users/',
+        data={
+            'email': f'{identifier}@example.com',
+            'username': identifier,
+            'first_name': 'Бенчмарк',
+            'last_name': 'Новый',
+            'password': consts.USER_PASSWORD,
+        },
+    )
+
+
+def users_avatar(session):
+    user_id = session.user_id()
+    session.request(
+        'users-avatar-update',
+        'put',
+        '/api/users/me/avatar/',
+        data={'avatar': consts.IMAGE_BASE64},
+        user_id=user_id,
+    )
+    session.request(
+        'users-avatar-delete',
+        'delete',
+        '/api/users/me/avatar/',
+        user_id=user_id,
+    )
+
+
+def users_set_password(session):
+    user_id = session.user_id()
+    for current, new in (
+        (consts.USER_PASSWORD, f'{consts.USER_PASSWORD}-new'),
+        (f'{consts.USER_PASSWORD}-new', consts.USER_PASSWORD),
+    ):
+        session.request(
+            'users-set-password',
+            'post',
+            '/api/users/set_password/',
+            data={'current_password': current, 'new_password': new},
+            user_id=user_id,
+        )
+
+
+def users_subscriptions(session):
+    session.request(
+        'users-subscriptions',
+        'get',
+        '/api/users/subscriptions/?recipes_limit=3',
+        auth=True,
+    )
+
+
+def users_subscribe(session):
+    user_id = session.user_id()
+    author_id = session.author_id()
+    path = f'/api/users/{author_id}/subscribe/'
+    session.request('users-subscribe', 'post', path, user_id=user_id)
+    session.request('users-unsubscribe', 'delete', path, user_id=user_id)
+
+
+def tags_list(session):
+    session.request('tags-list', 'get', '/api/tags/')
+
+
+def tags_detail(session):
+    session.request('tags-detail', 'get', f'/api/tags/{session.tag_id()}/')
+
+
+def recipes_list(session):
+    session.request(
+        'recipes-list', 'get', f'/api/recipes/?page={session.page()}'
+    )
+
+
+def recipes_list_auth(session):
+    session.request(
+        'recipes-list-auth',
+        'get',
+        f'/api/recipes/?page={session.page()}',
+        auth=True,
+    )
+
+
+def recipes_list_filtered(session):
+    session.request(
+        'recipes-list-filtered',
+        'get',
+        f'/api/recipes/?tags={session.tag_slug()}'
+        f'&author={session.author_id()}&is_favorited=1',
+        auth=True,
+    )
+
+
+def recipes_feed(session):
+    session.request(
+        'recipes-feed',
+        'get',
+        '/api/recipes/feed/',
+        auth=True,
+    )
+
+
+def recipes_search(session):
+    ingredient = session.rng.choice(session.dataset.ingredient_names)
+    session.request(
+        'recipes-search',
+        'get',
+        f'/api/recipes/?search={quote(ingredient)}',
+    )
+
+
+def recipes_detail(session):
+    session.request(
+        'recipes-detail',
+        'get',
+        f'/api/recipes/{session.recipe_id()}/',
+        auth=True,
+    )
+
+
+def recipes_get_link(session):
+    session.request(
+        'recipes-get-link',
+        'get',
+        f'/api/recipes/{session.recipe_id()}/get-link/',
+    )
+
+
+def recipes_write(session):
+    user_id = session.user_id()
+    data = {
+        'ingredients': [
+            {'id': ingredient_id, 'amount': 10}
+            for ingredient_id in session.ingredient_ids(5)
+        ],
+        'tags': [session.tag_id()],
+        'image': consts.IMAGE_BASE64,
+        'name': 'Рецепт бенчмарка',
+        'text': 'Описание рецепта бенчмарка.',
+        'cooking_time': 10,
+    }
+    response = session.request(
+        'recipes-create', 'post', '/api/recipes/', data=data, user_id=user_id
+    )
+    if response is None or 'id' not in response:
+        return
+    path = f'/api/recipes/{response["id"]}/'
+    data['name'] = 'Обновленный рецепт бенчмарка'
+    session.request(
+        'recipes-update', 'patch', path, data=data, user_id=user_id
+    )
+    session.request('recipes-delete', 'delete', path, user_id=user_id)
+
+
+def recipes_favorite(session):
+    user_id = session.user_id()
+    path = f'/api/recipes/{session.recipe_id()}/favorite/'
+    session.request('recipes-favorite-add', 'post', path, user_id=user_id)
+    session.request('recipes-favorite-remove', 'delete', path, user_id=user_id)
+
+
+def recipes_shopping_cart(session):
+    user_id = session.user_id()
+    path = f'/api/recipes/{session.recipe_id()}/shopping_cart/'
+    session.request('recipes-cart-add', 'post', path, user_id=user_id)
+    session.request('recipes-cart-remove', 'delete', path, user_id=user_id)
+
+
+def recipes_shopping_cart_bulk(session):
+    user_id = session.user_id()
+    path = '/api/recipes/shopping_cart/'
+    response = session.request(
+        'recipes-cart-bulk-add',
+        'post',
+        path,
+        data={'recipes': session.recipe_ids(consts.BULK_RECIPES)},
+        user_id=user_id,
+    )
+    if not isinstance(response, list):
+        return
+    # Удаляются только добавленные рецепты, чтобы не менять исходные данные.
+    added = [item['id'] for item in response if item['status'] == 'added']
+    if added:
+        session.request(
+            'recipes-cart-bulk-remove',
+            'delete',
+            path,
+            data={'recipes': added},
+            user_id=user_id,
+        )
+
+
+def recipes_download_shopping_cart(session):
+    session.request(
+        'recipes-download-cart',
+        'get',
+        '/api/recipes/download_shopping_cart/',
+        auth=True,
+    )
+
+
+def ingredients_list(session):
+    session.request('ingredients-list', 'get', '/api/ingredients/')
+
+
+def ingredients_search(session):
+    session.request(
+        'ingredients-search',
+        'get',
+        f'/api/ingredients/?name={quote(session.ingredient_prefix())}',
+    )
+
+
+def ingredients_detail(session):
+    session.request(
+        'ingredients-detail',
+        'get',
+        f'/api/ingredients/{session.ingredient_ids(1)[0]}/',
+    )
+
+
+def auth_token(session):
+    user_id = session.user_id()
+    login_data = {
+        'email': session.user_email(user_id),
+        'password': consts.USER_PASSWORD,
+    }
+    session.request(
+        'auth-logout', 'post', '/api/auth/token/logout/', user_id=user_id
+    )
+    response = session.request(
+        'auth-login', 'post', '/api/auth/token/login/', data=login_data
+    )
+    if response and 'auth_token' in response:
+        session.set_token(user_id, response['auth_token'])
+
+
+def docs(session):
+    session.request('docs', 'get', '/api/docs/')
+    session.request('docs-schema', 'get', '/api/docs/openapi-schema.yml')
+
+
+SCENARIOS = {
+    function.__name__: function
+    for function in (
+        users_list,
+        users_detail,
+        users_me,
+        users_create,
+        users_avatar,
+        users_set_password,
+        users_subscriptions,
+        users_subscribe,
+        tags_list,
+        tags_detail,
+        recipes_list,
+        recipes_list_auth,
+        recipes_list_filtered,
+        recipes_search,
+        recipes_feed,
+        recipes_detail,
+        recipes_get_link,
+        recipes_write,
+        recipes_favorite,
+        recipes_shopping_cart,
+        recipes_shopping_cart_bulk,
+        recipes_download_shopping_cart,
+        ingredients_list,
+        ingredients_search,
+        ingredients_detail,
+        auth_token,
+        docs,
+    )
+}
+
+# Профили нагрузки: имя сценария -> вес.
+MIXES = {
+    'all': {name: 1 for name in SCENARIOS},
+    'read': {
+        'recipes_list': 30,
+        'recipes_list_auth': 20,
+        'recipes_list_filtered': 10,
+        'recipes_search': 5,
+        'recipes_feed': 10,
+        'recipes_detail': 15,
+        'tags_list': 10,
+        'ingredients_search': 10,
+        'users_subscriptions': 5,
+    },
+    'write': {
+        'recipes_write': 10,
+        'recipes_favorite': 30,
+        'recipes_shopping_cart': 30,
+        'recipes_shopping_cart_bulk': 5,
+        'users_subscribe': 20,
+        'users_avatar': 5,
+        'users_create': 3,
+        'users_set_password': 2,
+    },
+    'mixed': {
+        'recipes_list': 25,
+        'recipes_list_auth': 20,
+        'recipes_list_filtered': 5,
+        'recipes_search': 3,
+        'recipes_feed': 8,
+        'recipes_detail': 15,
+        'tags_list': 8,
+        'ingredients_search': 8,
+        'users_subscriptions': 4,
+        'users_me': 4,
+        'recipes_favorite': 4,
+        'recipes_shopping_cart': 3,
+        'recipes_download_shopping_cart': 1,
+        'users_subscribe': 1,
+        'recipes_write': 1,
+        'auth_token': 1,
+    },
+}
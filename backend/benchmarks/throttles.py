@@ -0,0 +1,75 @@
+"""
+Бенчмарк накладных расходов ограничения частоты запросов.
+
+Измеряется время проверки всех классов DEFAULT_THROTTLE_CLASSES для
+одного запроса: к действию без лимитов и к действию с лимитом, который
+не исчерпывается. Запросы не проходят через представление, поэтому
+результат не зависит от БД.
+"""
+
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.test import override_settings
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.test import APIRequestFactory
+
+from api.views import RecipeViewSet, TagViewSet
+from benchmarks import consts
+from benchmarks.runner import summarize
+
+
+def make_view(viewset, basename: str, action: str):
+    view = viewset()
+    view.basename = basename
+    view.action = action
+    return view
+
+
+def measure(request, view, checks: int) -> list:
+    timings = []
+    for _ in range(checks):
+        started = time.perf_counter()
+        for throttle in view.get_throttles():
+            throttle.allow_request(request, view)
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    return timings
+
+
+def run(checks: int = consts.THROTTLE_CHECKS, cache_alias: str = 'default'):
+    """
+    Измеряет проверку ограничений.
+
+    :return: Время проверки в микросекундах.
+    """
+    request = Request(APIRequestFactory().get('/api/', REMOTE_ADDR='10.0.0.1'))
+    request.user = AnonymousUser()
+    unlimited = make_view(TagViewSet, 'tags', 'list')
+    limited = make_view(RecipeViewSet, 'recipes', 'list')
+    # Лимит, который не исчерпывается за время прогона.
+    rates = {'recipes.list': {'ip': consts.THROTTLE_UNLIMITED_RATE}}
+    with override_settings(
+        THROTTLE_RATES=rates, THROTTLE_CACHE_ALIAS=cache_alias
+    ):
+        measure(request, limited, consts.THROTTLE_WARMUP)
+        unlimited_timings = measure(request, unlimited, checks)
+        limited_timings = measure(request, limited, checks)
+
+    results = {
+        'throttle_classes': [
+            throttle.__name__
+            for throttle in api_settings.DEFAULT_THROTTLE_CLASSES
+        ],
+        'cache': cache_alias,
+        'checks': checks,
+        'without_limit_us': summarize(unlimited_timings),
+        'with_limit_us': summarize(limited_timings),
+        'budget_us': consts.THROTTLE_BUDGET_US,
+    }
+    # Бюджет относится к запросам, на которые лимиты не настроены:
+    # стоимость проверки с лимитом определяется выбранным кешем.
+    results['within_budget'] = (
+        results['without_limit_us']['p50'] < consts.THROTTLE_BUDGET_US
+    )
+    return results
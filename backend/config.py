@@ -1,3 +1,5 @@
+import os
+import tempfile
 from dataclasses import dataclass
 
 from environs import Env
@@ -10,6 +12,14 @@ class DjangoSettings:
     secret_key: str
     debug: bool
     db_prod: bool
+    metrics_dir: str
+    shared_cache_backend: str
+    shared_cache_location: str
+    journal_cache_backend: str
+    journal_cache_location: str
+    throttle_cache: str
+    password_hasher: str
+    password_hashing_threads: int
 
 
 @dataclass
@@ -48,6 +58,26 @@ def load_env() -> Config:
             secret_key=env.str('SECRET_KEY', 'SECRET_KEY'),
             db_prod=env.bool('DB_PROD'),
             debug=env.bool('DEBUG'),
+            metrics_dir=env.str('METRICS_DIR', ''),
+            shared_cache_backend=env.str(
+                'SHARED_CACHE_BACKEND',
+                'django.core.cache.backends.filebased.FileBasedCache',
+            ),
+            shared_cache_location=env.str(
+                'SHARED_CACHE_LOCATION',
+                os.path.join(tempfile.gettempdir(), 'foodgram_cache'),
+            ),
+            journal_cache_backend=env.str(
+                'JOURNAL_CACHE_BACKEND',
+                'django.core.cache.backends.filebased.FileBasedCache',
+            ),
+            journal_cache_location=env.str(
+                'JOURNAL_CACHE_LOCATION',
+                os.path.join(tempfile.gettempdir(), 'foodgram_journal'),
+            ),
+            throttle_cache=env.str('THROTTLE_CACHE', 'default'),
+            password_hasher=env.str('PASSWORD_HASHER', 'argon2'),
+            password_hashing_threads=env.int('PASSWORD_HASHING_THREADS', 2),
         ),
         PostgreSettings(
             db_user=env.str('POSTGRES_USER', 'postgres'),
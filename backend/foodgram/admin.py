@@ -1,30 +1,19 @@
 from django.contrib import admin
-from django.db.models import Count, F, Value
-from django.db.models.functions import Concat
+from django.contrib.auth import get_user_model
+from django.db.models import Q
 
 from foodgram import consts
+from foodgram.admin_utils import (
+    LargeTableAdminMixin,
+    changelist_link,
+    count_subquery,
+)
+from foodgram.catalog import tag_catalog
 from foodgram.models import Favorite, Ingredient, Purchase, Recipe, Tag
+from foodgram.search import search_recipes
+from jobs.actions import BackgroundDeleteMixin, enqueue_action
 
-
-class IngredientRecipeInlineMixin(admin.TabularInline):
-    model = Recipe.ingredients.through
-    extra = 0
-
-
-class NoAddMixin:
-    """Убирает доступ к добалению объекта в админке."""
-
-    def has_add_permission(self, request, obj=None):
-        return False
-
-
-class RecipeIngredientsInline(NoAddMixin, IngredientRecipeInlineMixin):
-
-    fields = ('recipe',)
-    readonly_fields = ('recipe',)
-    verbose_name = 'рецепт'
-    verbose_name_plural = 'Рецепты'
-    can_delete = False
+User = get_user_model()
 
 
 @admin.register(Ingredient)
@@ -32,14 +21,17 @@ class IngredientAdmin(admin.ModelAdmin):
     """Модель Ingredient в админке."""
 
     list_display = ('name', 'measurement_unit', 'count_using')
-    readonly_fields = ('count_using',)
+    readonly_fields = ('count_using', 'recipes_link')
     search_fields = ('name',)
-    inlines = (RecipeIngredientsInline,)
 
     def get_queryset(self, request):
-        return Ingredient.objects.annotate(
-            ingredients_in_recipe_count=Count(
-                'recipe_ingredients', distinct=True
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                ingredients_in_recipe_count=count_subquery(
+                    Recipe.ingredients.through, 'ingredient'
+                )
             )
         )
 
@@ -50,20 +42,11 @@ class IngredientAdmin(admin.ModelAdmin):
     def count_using(self, obj):
         return obj.ingredients_in_recipe_count
 
-
-class RecipeTagInline(NoAddMixin, admin.TabularInline):
-
-    model = Recipe.tags.through
-    extra = True
-    readonly_fields = ('recipe', 'get_author')
-    can_delete = False
-
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related('recipe__author')
-
-    @admin.display(description='Автор рецепта')
-    def get_author(self, obj):
-        return obj.recipe.author
+    @admin.display(description='Рецепты')
+    def recipes_link(self, obj):
+        return changelist_link(
+            Recipe, 'Рецепты с ингредиентом', ingredients__id__exact=obj.pk
+        )
 
 
 @admin.register(Tag)
@@ -71,22 +54,31 @@ class TagAdmin(admin.ModelAdmin):
     """Модель тегов в админке"""
 
     list_display = ('name', 'slug', 'count_recipes')
-    inlines = (RecipeTagInline,)
-    readonly_fields = ('count_recipes',)
+    readonly_fields = ('count_recipes', 'recipes_link')
 
     def get_queryset(self, request):
         return (
             super()
             .get_queryset(request)
-            .annotate(recipe_count=Count('recipes'))
+            .annotate(recipe_count=count_subquery(Recipe.tags.through, 'tag'))
         )
 
     @admin.display(description='количество рецептов', ordering='recipe_count')
     def count_recipes(self, obj):
         return obj.recipe_count
 
+    @admin.display(description='Рецепты')
+    def recipes_link(self, obj):
+        return changelist_link(
+            Recipe, 'Рецепты с тегом', tags__id__exact=obj.pk
+        )
+
+
+class IngredientRecipeInline(admin.TabularInline):
 
-class IngredientRecipeInline(IngredientRecipeInlineMixin):
+    model = Recipe.ingredients.through
+    extra = 0
+    autocomplete_fields = ('ingredient',)
 
     def get_queryset(self, request):
         queryset = super().get_queryset(request).select_related('ingredient')
@@ -94,7 +86,9 @@ class IngredientRecipeInline(IngredientRecipeInlineMixin):
 
 
 @admin.register(Recipe)
-class RecipeAdmin(admin.ModelAdmin):
+class RecipeAdmin(
+    BackgroundDeleteMixin, LargeTableAdminMixin, admin.ModelAdmin
+):
     """Модель рецептов в админке."""
 
     inlines = (IngredientRecipeInline,)
@@ -106,25 +100,74 @@ class RecipeAdmin(admin.ModelAdmin):
         'count_favorite',
         'count_in_purchase',
     )
-    search_fields = ('name', 'author_fullname')
+    search_fields = ('name', 'author__username__exact', 'author__email__exact')
     filter_horizontal = ('tags',)
     list_filter = ('tags',)
+    list_select_related = ('author',)
+    raw_id_fields = ('author',)
+    delete_task = 'recipes.delete'
 
     def get_queryset(self, request):
-        queryset = super().get_queryset(request).select_related('author')
-        return queryset.annotate(
-            favorite_count=Count('users_favorite', distinct=True),
-            purchase_count=Count('users_purchase', distinct=True),
-            author_fullname=Concat(
-                F('author__first_name'),
-                Value(' '),
-                F('author__last_name'),
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                favorite_count=count_subquery(Favorite, 'recipe'),
+                purchase_count=count_subquery(Purchase, 'recipe'),
+            )
+        )
+
+    def get_actions(self, request):
+        # Смена тегов многих рецептов выполняется фоновой задачей:
+        # синхронно запрос не укладывается в таймаут.
+        actions = super().get_actions(request)
+        if not self.has_change_permission(request):
+            return actions
+        for tag in tag_catalog.all():
+            for task_name, description in (
+                ('recipes.add_tag', 'Добавить тег «{}»'),
+                ('recipes.remove_tag', 'Убрать тег «{}»'),
+            ):
+                name = f'{task_name}_{tag.id}'
+                actions[name] = (
+                    self.make_tag_action(task_name, tag.id),
+                    name,
+                    description.format(tag.name),
+                )
+        return actions
+
+    @staticmethod
+    def make_tag_action(task_name: str, tag_id: int):
+        def action(modeladmin, request, queryset):
+            enqueue_action(
+                modeladmin, request, queryset, task_name, tag=tag_id
+            )
+
+        return action
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Ищет рецепты полнотекстовым поиском по названию и составу, а также
+        по точному username или email автора (уникальные индексы).
+        """
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        found = search_recipes(Recipe.objects.all(), search_term)
+        authors = User.objects.filter(
+            Q(username=search_term) | Q(email=search_term)
+        )
+        return (
+            queryset.filter(
+                Q(id__in=found.order_by().values('id'))
+                | Q(author__in=authors.values('id'))
             ),
+            False,
         )
 
     @admin.display(description='Полное имя автора')
     def author_name(self, obj):
-        return obj.author_fullname
+        return obj.author.get_full_name()
 
     @admin.display(description='сокращенное описание')
     def short_text(self, obj):
@@ -145,16 +188,15 @@ class RecipeAdmin(admin.ModelAdmin):
         return obj.purchase_count
 
 
-class FavoritePurchaseMixin(admin.ModelAdmin):
+class FavoritePurchaseMixin(LargeTableAdminMixin, admin.ModelAdmin):
 
     list_display = (
         'recipe',
         'user',
     )
-    search_fields = ('user__username', 'recipe__name')
-
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related('user', 'recipe')
+    search_fields = ('user__username__exact', 'user__email__exact')
+    list_select_related = ('user', 'recipe')
+    raw_id_fields = ('user', 'recipe')
 
 
 @admin.register(Favorite)
@@ -0,0 +1,108 @@
+"""
+Инструменты админки для больших таблиц.
+
+- EstimatedCountPaginator: число строк таблицы без фильтров берется
+  из статистики PostgreSQL (pg_class.reltuples) вместо COUNT(*).
+- count_subquery: счетчик связанных строк коррелированным подзапросом по
+  индексированному внешнему ключу; в отличие от Count через JOIN
+  считается только для строк выводимой страницы.
+- changelist_link: ссылка на список объектов с фильтром, которая
+  заменяет инлайны со всеми связанными объектами.
+"""
+
+from typing import Optional, Type
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import (
+    Count,
+    IntegerField,
+    Model,
+    OuterRef,
+    QuerySet,
+    Subquery,
+)
+from django.db.models.functions import Coalesce
+from django.urls import reverse
+from django.utils.functional import cached_property
+from django.utils.html import format_html
+from django.utils.http import urlencode
+
+from foodgram import consts
+
+POSTGRESQL_ESTIMATE = (
+    'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass'
+)
+
+
+def estimate_count(queryset: QuerySet) -> Optional[int]:
+    """
+    Возвращает оценку числа строк таблицы queryset.
+
+    Оценка есть только в PostgreSQL после ANALYZE (в том числе
+    автоматического), иначе возвращается None.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(POSTGRESQL_ESTIMATE, (queryset.model._meta.db_table,))
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор, который для больших таблиц без фильтров и поиска
+    использует оценку числа строк.
+
+    Оценка применяется, начиная с ADMIN_ESTIMATED_COUNT_MIN строк:
+    для небольших таблиц точный подсчет дешев.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            estimate = estimate_count(queryset)
+            if (
+                estimate is not None
+                and estimate >= consts.ADMIN_ESTIMATED_COUNT_MIN
+            ):
+                return estimate
+        return super().count
+
+
+class LargeTableAdminMixin:
+    """Список без точного COUNT(*) по всей таблице."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+def count_subquery(model: Type[Model], field: str) -> Coalesce:
+    """
+    Подзапрос, считающий строки model, у которых field ссылается на
+    внешний объект.
+    """
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(count=Count('*'))
+            .values('count'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def changelist_link(model: Type[Model], text, **filters) -> str:
+    """Ссылка на список объектов model в админке с фильтрами filters."""
+    url = reverse(
+        f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist'
+    )
+    return format_html('<a href="{}?{}">{}</a>', url, urlencode(filters), text)
@@ -0,0 +1,185 @@
+"""
+Справочники тегов и ингредиентов в памяти процесса.
+
+Справочник загружается целиком (несколько тегов, около 2 200
+ингредиентов) и хранится в виде кортежей, проиндексированных по id
+и названию. Чтения справочника не обращаются к БД.
+
+Процессы синхронизируются через поколение модели: отметку времени
+последнего изменения. Поколение хранится в БД (IndexGeneration)
+и копируется в общий кеш. Изменение справочника после фиксации
+транзакции записывает новое поколение, и процессы перезагружают
+справочник при следующем чтении. Поколение служит и ETag ответов
+справочника.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from typing import Iterable, NamedTuple, Optional, Type
+
+from django.core.cache import caches
+from django.db.models import F, Model, Value
+from django.db.models.functions import Greatest
+
+from foodgram import consts
+from foodgram.models import IndexGeneration, Ingredient, Tag
+
+
+class TagRecord(NamedTuple):
+    id: int
+    name: str
+    slug: str
+
+
+class IngredientRecord(NamedTuple):
+    id: int
+    name: str
+    measurement_unit: str
+
+
+def get_generation_key(model: Type[Model]) -> str:
+    return consts.CATALOG_GENERATION_KEY.format(model._meta.label_lower)
+
+
+def load_generation(model: Type[Model]) -> int:
+    """Читает поколение модели из БД, создавая его при первом обращении."""
+    generation, _ = IndexGeneration.objects.get_or_create(
+        name=get_generation_key(model), defaults={'value': time.time_ns()}
+    )
+    return generation.value
+
+
+def get_generation(model: Type[Model]) -> int:
+    """
+    Возвращает поколение модели: отметку времени изменения в наносекундах.
+
+    Поколение хранится в БД и копируется в общий кеш, поэтому чтение
+    обычно не обращается к БД. Если записи в кеше нет (кеш очищен или
+    запись вытеснена), поколение читается из БД и не меняется: процессам
+    не нужно перезагружать справочник, а ETag остаются прежними.
+    """
+    cache = caches[consts.SHARED_CACHE_ALIAS]
+    key = get_generation_key(model)
+    generation = cache.get(key)
+    if generation is None:
+        generation = load_generation(model)
+        cache.add(key, generation, timeout=None)
+    return generation
+
+
+def bump_generation(model: Type[Model]) -> None:
+    key = get_generation_key(model)
+    # Поколение не уменьшается, даже если часы сервера отстают.
+    generations = IndexGeneration.objects.filter(name=key)
+    if not generations.update(
+        value=Greatest(F('value') + 1, Value(time.time_ns()))
+    ):
+        load_generation(model)
+    caches[consts.SHARED_CACHE_ALIAS].set(
+        key, generations.values_list('value', flat=True).get(), timeout=None
+    )
+
+
+class CatalogState:
+    """Неизменяемый снимок справочника."""
+
+    __slots__ = ('records', 'by_id', 'by_name', 'names', 'generation')
+
+    def __init__(self, records: tuple, generation: Optional[int]):
+        self.records = records
+        self.by_id = {record.id: record for record in records}
+        by_name = defaultdict(list)
+        for record in records:
+            by_name[record.name.lower()].append(record)
+        self.by_name = {name: tuple(found) for name, found in by_name.items()}
+        self.names = tuple(record.name.lower() for record in records)
+        self.generation = generation
+
+    def search(self, name: str) -> list:
+        """
+        Ищет записи, название которых содержит name без учета регистра.
+
+        Сначала идут записи, название которых начинается с name, внутри
+        групп записи упорядочены по названию.
+        """
+        name = name.lower()
+        found = [
+            (not lower_name.startswith(name), record.name, record)
+            for lower_name, record in zip(self.names, self.records)
+            if name in lower_name
+        ]
+        found.sort(key=lambda item: item[:2])
+        return [record for _, _, record in found]
+
+
+class Catalog:
+    """Справочник модели в памяти процесса."""
+
+    def __init__(self, model: Type[Model], record_class: Type[tuple]):
+        self.model = model
+        self.record_class = record_class
+        self.state: Optional[CatalogState] = None
+        self.lock = threading.Lock()
+
+    def __deepcopy__(self, memo):
+        # Справочник - общий объект процесса: поля сериализаторов, которые
+        # DRF копирует для каждого экземпляра, должны ссылаться на него же.
+        return self
+
+    def load(self) -> CatalogState:
+        """Загружает справочник из БД."""
+        # Поколение читается до загрузки данных: изменение, сделанное во
+        # время загрузки, приведет к повторной загрузке.
+        generation = get_generation(self.model)
+        self.state = CatalogState(
+            tuple(
+                map(
+                    self.record_class._make,
+                    self.model.objects.values_list(*self.record_class._fields),
+                )
+            ),
+            generation,
+        )
+        return self.state
+
+    def sync(self) -> CatalogState:
+        """Возвращает актуальный снимок справочника."""
+        state = self.state
+        if state is not None and state.generation == get_generation(
+            self.model
+        ):
+            return state
+        with self.lock:
+            state = self.state
+            if state is not None and state.generation == get_generation(
+                self.model
+            ):
+                return state
+            return self.load()
+
+    def publish(self) -> None:
+        """Сообщает процессам об изменении справочника."""
+        self.state = None
+        bump_generation(self.model)
+
+    def all(self) -> tuple:
+        return self.sync().records
+
+    def get(self, pk) -> Optional[tuple]:
+        return self.sync().by_id.get(pk)
+
+    def get_by_name(self, name: str) -> tuple:
+        return self.sync().by_name.get(name.lower(), ())
+
+    def existing_ids(self, ids: Iterable[int]) -> set:
+        by_id = self.sync().by_id
+        return {pk for pk in ids if pk in by_id}
+
+    def search(self, name: str) -> list:
+        return self.sync().search(name)
+
+
+tag_catalog = Catalog(Tag, TagRecord)
+ingredient_catalog = Catalog(Ingredient, IngredientRecord)
+catalogs = {Tag: tag_catalog, Ingredient: ingredient_catalog}
@@ -8,9 +8,59 @@ HTTP_STARTSWITH = 'http://'
 SHORT_URL_ENDPOINT = 's'
 
 ADMIN_PANEL_MAX_WORDS = 10
+# Размер таблицы, начиная с которого пагинатор админки использует оценку
+# числа строк вместо COUNT(*).
+ADMIN_ESTIMATED_COUNT_MIN = 10_000
 
 MIN_AMOUNT_INGREDIENT = 1
 MAX_AMOUNT_INGREDIENT = 10_000
 
 MIN_COOKING_TIME = 1
 MAX_COOKING_TIME = 5_000
+
+SEARCH_CONFIG = 'russian'
+# Веса полей в bm25 для SQLite FTS5: название, ингредиенты, описание.
+SQLITE_SEARCH_WEIGHTS = (10.0, 5.0, 1.0)
+SQLITE_MIN_STEM_LENGTH = 3
+
+SHARED_CACHE_ALIAS = 'shared'
+CATALOG_GENERATION_KEY = 'catalog:generation:{}'
+JOURNAL_CACHE_ALIAS = 'journal'
+COOKABLE_GENERATION_NAME = 'cookable'
+COOKABLE_CHANGE_KEY = 'cookable:change:{}'
+COOKABLE_CHANGE_TIMEOUT = 24 * 60 * 60
+COOKABLE_REBUILD = '*'
+# Поколение уже записано в БД, а запись журнала появляется чуть позже.
+# Отсутствующая запись считается потерянной, только если ее нет дольше
+# этого времени (в секундах).
+COOKABLE_PENDING_TIMEOUT = 5
+# Отставание журнала или накопленные изменения, после которых индекс
+# дешевле перестроить целиком, чем догонять.
+COOKABLE_MAX_GENERATION_GAP = 1_000
+COOKABLE_MAX_OVERLAY = 10_000
+COOKABLE_FETCH_SIZE = 100_000
+
+SIMILAR_TOP_K = 10
+SIMILAR_MIN_SCORE = 0.1
+SIMILAR_BATCH_SIZE = 2_000
+SIMILAR_RUN_NAME = 'similar'
+# Признаки, встречающиеся в большей доле рецептов (теги, соль, вода),
+# не используются для поиска кандидатов, а учитываются битовой маской.
+SIMILAR_COMMON_FEATURE_RATIO = 0.005
+SIMILAR_MAX_COMMON_FEATURES = 256
+SIMILAR_MIN_COMMON_FEATURE_COUNT = 1_000
+
+# Авторы с большим числом подписчиков переводятся на чтение ленты
+# по запросу, иначе публикация рецепта создавала бы слишком много записей.
+FEED_FANOUT_MAX_FOLLOWERS = 5_000
+FEED_BACKFILL_LIMIT = 100
+FEED_BATCH_SIZE = 1_000
+FEED_FANOUT_CHUNK_SIZE = 1
+
+# Размеры пачек фоновых задач админки.
+RECIPE_DELETE_CHUNK_SIZE = 100
+RECIPE_RETAG_CHUNK_SIZE = 1_000
+MEDIA_DELETE_CHUNK_SIZE = 100
+# Наибольшее число строк, удаляемых одной транзакцией при каскадном
+# удалении пользователей и рецептов.
+DELETE_BATCH_SIZE = 500
@@ -0,0 +1,357 @@
+"""
+Индекс "Что приготовить".
+
+По набору имеющихся ингредиентов находит рецепты с наибольшим покрытием:
+долей ингредиентов рецепта, которые уже есть у пользователя.
+
+Индекс хранится в памяти процесса: для каждого ингредиента - массив id
+рецептов (uint32), для каждого рецепта - количество его ингредиентов.
+Изменения рецептов не перестраивают массивы, а складываются в оверлей,
+значения которого при подсчете заменяют данные массивов.
+
+Процессы синхронизируются через журнал: запись рецепта атомарно
+увеличивает номер поколения в БД (IndexGeneration) и сохраняет под ним
+id измененных рецептов в кеше журнала. Перед поиском процесс догоняет
+журнал с последнего известного ему поколения. Записи применяются подряд
+до первой отсутствующей: поколение записывается в БД раньше, чем запись
+в журнал, поэтому недостающая запись может появиться при следующем
+поиске. Если записи нет дольше COOKABLE_PENDING_TIMEOUT (кеш очищен или
+недоступен) или отставание слишком велико, индекс перестраивается.
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterable, Optional, Type
+
+import numpy as np
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import F, Model
+
+from foodgram import consts
+from foodgram.models import IndexGeneration, RecipeIngredient
+
+logger = logging.getLogger(__name__)
+
+RECIPE_ID_DTYPE = np.uint32
+SIZE_DTYPE = np.uint16
+
+# id рецептов, изменения которых собираются в одну запись журнала.
+collected_changes = ContextVar('cookable_collected_changes', default=None)
+
+
+class IndexState:
+    """Неизменяемый снимок индекса."""
+
+    __slots__ = ('postings', 'sizes', 'overlay', 'generation')
+
+    def __init__(
+        self,
+        postings: dict,
+        sizes: np.ndarray,
+        overlay: dict,
+        generation: Optional[int],
+    ):
+        self.postings = postings
+        self.sizes = sizes
+        self.overlay = overlay
+        self.generation = generation
+
+    @classmethod
+    def from_pairs(
+        cls,
+        recipe_ids: np.ndarray,
+        ingredient_ids: np.ndarray,
+        generation: Optional[int] = None,
+    ) -> 'IndexState':
+        """Строит индекс по парам (рецепт, ингредиент)."""
+        order = np.argsort(ingredient_ids, kind='stable')
+        sorted_ingredients = ingredient_ids[order]
+        sorted_recipes = recipe_ids[order].astype(RECIPE_ID_DTYPE)
+        ingredients, starts = np.unique(sorted_ingredients, return_index=True)
+        postings = dict(
+            zip(ingredients.tolist(), np.split(sorted_recipes, starts[1:]))
+        )
+        sizes = np.bincount(recipe_ids).astype(SIZE_DTYPE)
+        return cls(postings, sizes, {}, generation)
+
+    def apply(self, changes: dict, generation: int) -> 'IndexState':
+        """
+        Возвращает снимок с учетом изменившихся рецептов.
+
+        :param changes: Актуальные множества ингредиентов по id рецептов,
+        удаленным рецептам соответствует пустое множество.
+        """
+        sizes = self.sizes
+        max_id = max(changes, default=0)
+        if max_id >= len(sizes):
+            sizes = np.concatenate(
+                (sizes, np.zeros(max_id + 1 - len(sizes), dtype=SIZE_DTYPE))
+            )
+        else:
+            sizes = sizes.copy()
+        for recipe_id, ingredients in changes.items():
+            sizes[recipe_id] = len(ingredients)
+        return IndexState(
+            self.postings, sizes, {**self.overlay, **changes}, generation
+        )
+
+    def search(self, ingredient_ids: Iterable[int], limit: int) -> list:
+        """
+        Возвращает рецепты, упорядоченные по покрытию.
+
+        :return: Список пар (id рецепта, покрытие) длиной не более limit.
+        При равном покрытии выше рецепты с большим числом совпадений,
+        затем более новые.
+        """
+        available = set(ingredient_ids)
+        arrays = [
+            self.postings[ingredient_id]
+            for ingredient_id in available
+            if ingredient_id in self.postings
+        ]
+        size = len(self.sizes)
+        if arrays:
+            matched = np.bincount(np.concatenate(arrays), minlength=size)
+        else:
+            matched = np.zeros(size, dtype=np.int64)
+        if self.overlay:
+            matched[np.fromiter(self.overlay, dtype=np.int64)] = [
+                len(ingredients & available)
+                for ingredients in self.overlay.values()
+            ]
+
+        candidates = np.flatnonzero(matched)
+        if not len(candidates):
+            return []
+        matched = matched[candidates]
+        coverage = matched / self.sizes[candidates]
+        if len(candidates) > limit:
+            top = np.argpartition(-coverage, limit - 1)[:limit]
+            candidates, matched, coverage = (
+                candidates[top],
+                matched[top],
+                coverage[top],
+            )
+        order = np.lexsort((-candidates, -matched, -coverage))
+        return list(zip(candidates[order].tolist(), coverage[order].tolist()))
+
+
+def load_pairs(
+    model: Type[Model],
+    fields: tuple = ('recipe', 'ingredient'),
+    using: str = DEFAULT_DB_ALIAS,
+) -> tuple:
+    """
+    Загружает порциями значения двух внешних ключей всех строк модели.
+
+    :return: Два массива int64 одинаковой длины.
+    """
+    left, right = (model._meta.get_field(field).column for field in fields)
+    chunks = []
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'SELECT {left}, {right} FROM {model._meta.db_table}')
+        while True:
+            rows = cursor.fetchmany(consts.COOKABLE_FETCH_SIZE)
+            if not rows:
+                break
+            chunks.append(np.array(rows, dtype=np.int64))
+    if not chunks:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    pairs = np.concatenate(chunks)
+    return pairs[:, 0], pairs[:, 1]
+
+
+def load_recipes(recipe_ids: Iterable[int], using: str) -> dict:
+    """Загружает актуальные множества ингредиентов рецептов."""
+    ingredients = defaultdict(set)
+    for recipe_id, ingredient_id in (
+        RecipeIngredient.objects.using(using)
+        .filter(recipe_id__in=recipe_ids)
+        .values_list('recipe_id', 'ingredient_id')
+    ):
+        ingredients[recipe_id].add(ingredient_id)
+    return {
+        recipe_id: frozenset(ingredients.get(recipe_id, ()))
+        for recipe_id in recipe_ids
+    }
+
+
+class CookableIndex:
+    """Индекс процесса, синхронизируемый через журнал изменений."""
+
+    def __init__(
+        self,
+        cache_alias: str = consts.JOURNAL_CACHE_ALIAS,
+        using: str = DEFAULT_DB_ALIAS,
+    ):
+        self.cache_alias = cache_alias
+        self.using = using
+        self.state: Optional[IndexState] = None
+        self.lock = threading.Lock()
+        # Первое поколение без записи в журнале и время, с которого
+        # записи нет.
+        self.pending: Optional[tuple] = None
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    @property
+    def generations(self):
+        return IndexGeneration.objects.using(self.using).filter(
+            name=consts.COOKABLE_GENERATION_NAME
+        )
+
+    def get_generation(self) -> int:
+        return self.generations.values_list('value', flat=True).first() or 0
+
+    def next_generation(self) -> int:
+        """Атомарно увеличивает номер поколения и возвращает новый."""
+        with transaction.atomic(using=self.using):
+            if not self.generations.update(value=F('value') + 1):
+                IndexGeneration.objects.using(self.using).get_or_create(
+                    name=consts.COOKABLE_GENERATION_NAME
+                )
+                self.generations.update(value=F('value') + 1)
+            return self.generations.values_list('value', flat=True).get()
+
+    def build(self) -> IndexState:
+        """Перестраивает индекс по данным БД."""
+        # Поколение читается до загрузки данных: изменения, сделанные
+        # во время загрузки, будут повторно применены при синхронизации.
+        generation = self.get_generation()
+        self.pending = None
+        self.state = IndexState.from_pairs(
+            *load_pairs(RecipeIngredient, using=self.using),
+            generation=generation,
+        )
+        return self.state
+
+    def sync(self) -> IndexState:
+        """Догоняет журнал изменений и возвращает актуальный снимок."""
+        state = self.state
+        if state is not None and self.get_generation() == state.generation:
+            return state
+        with self.lock:
+            state = self.state
+            generation = self.get_generation()
+            if state is None or generation < state.generation:
+                return self.build()
+            if generation == state.generation:
+                return state
+            if (
+                generation - state.generation
+                > consts.COOKABLE_MAX_GENERATION_GAP
+                or len(state.overlay) > consts.COOKABLE_MAX_OVERLAY
+            ):
+                return self.build()
+
+            keys = [
+                consts.COOKABLE_CHANGE_KEY.format(number)
+                for number in range(state.generation + 1, generation + 1)
+            ]
+            changes = self.cache.get_many(keys)
+            applied = []
+            for key in keys:
+                change = changes.get(key)
+                if change is None:
+                    break
+                if change == consts.COOKABLE_REBUILD:
+                    return self.build()
+                applied.append(change)
+            if len(applied) < len(keys) and self.is_lost(
+                state.generation + len(applied) + 1
+            ):
+                return self.build()
+            if not applied:
+                return state
+            self.state = state.apply(
+                load_recipes(set().union(*applied), self.using),
+                state.generation + len(applied),
+            )
+            return self.state
+
+    def is_lost(self, generation: int) -> bool:
+        """
+        Проверяет, потеряна ли отсутствующая запись журнала: ее нет
+        дольше COOKABLE_PENDING_TIMEOUT.
+        """
+        now = time.monotonic()
+        if self.pending is None or self.pending[0] != generation:
+            self.pending = (generation, now)
+            return False
+        return now - self.pending[1] > consts.COOKABLE_PENDING_TIMEOUT
+
+    def search(self, ingredient_ids: Iterable[int], limit: int) -> list:
+        return self.sync().search(ingredient_ids, limit)
+
+    def publish(self, recipe_ids: Optional[Iterable[int]] = None) -> None:
+        """
+        Записывает изменение в журнал.
+
+        :param recipe_ids: id измененных рецептов. Без них процессы
+        перестроят индекс целиком.
+        """
+        change = (
+            consts.COOKABLE_REBUILD if recipe_ids is None else list(recipe_ids)
+        )
+        generation = self.next_generation()
+        try:
+            self.cache.set(
+                consts.COOKABLE_CHANGE_KEY.format(generation),
+                change,
+                timeout=consts.COOKABLE_CHANGE_TIMEOUT,
+            )
+            # Записи старше допустимого отставания не читаются: процессы,
+            # отставшие сильнее, перестраивают индекс.
+            self.cache.delete(
+                consts.COOKABLE_CHANGE_KEY.format(
+                    generation - consts.COOKABLE_MAX_GENERATION_GAP - 1
+                )
+            )
+        except Exception:
+            # Без записи журнала процессы, дошедшие до этого поколения,
+            # перестроят индекс целиком.
+            logger.exception(
+                'Не удалось записать изменение %s индекса "Что приготовить".',
+                generation,
+            )
+
+    def publish_on_commit(self, recipe_ids: Iterable[int]) -> None:
+        """
+        Записывает изменение рецептов в журнал после фиксации транзакции.
+
+        Внутри collect_changes() id добавляются к общей записи блока.
+        """
+        recipe_ids = list(recipe_ids)
+        changes = collected_changes.get()
+        if changes is not None:
+            changes.extend(recipe_ids)
+            return
+        transaction.on_commit(
+            lambda: self.publish(recipe_ids), using=self.using
+        )
+
+    @contextmanager
+    def collect_changes(self):
+        """
+        Объединяет изменения рецептов внутри блока with в одну запись
+        журнала: удаление пачки рецептов вызывает post_delete для каждого.
+        """
+        changes = []
+        token = collected_changes.set(changes)
+        try:
+            yield
+        finally:
+            collected_changes.reset(token)
+        if changes:
+            self.publish_on_commit(changes)
+
+
+cookable_index = CookableIndex()
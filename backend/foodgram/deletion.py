@@ -0,0 +1,86 @@
+"""
+Удаление объектов с каскадом пачками.
+
+Обычный delete() удаляет объект и все зависящие от него строки одной
+транзакцией: удаление автора с тысячами рецептов, избранного и записей
+лент надолго блокирует таблицы. Здесь зависимые строки удаляются
+снизу вверх пачками не больше batch_size строк, каждая пачка - отдельным
+шагом генератора. Вызывающий (фоновая задача) фиксирует транзакцию после
+каждого шага, поэтому блокировки держатся недолго.
+
+Файлы удаляемых объектов не удаляются django_cleanup сразу после
+фиксации: поля файлов очищаются перед удалением, а имена файлов в той же
+транзакции ставятся в очередь задачей media.delete. Изменения рецептов
+пачки записываются в журнал индекса "Что приготовить" одной записью.
+"""
+
+from typing import Iterator, Type
+
+from django.db.models import CASCADE, FileField, Model, QuerySet
+from django.db.models.deletion import get_candidate_relations_to_delete
+
+from foodgram import consts
+from foodgram.cookable import cookable_index
+from jobs.worker import enqueue
+
+
+def delete_batch(model: Type[Model], pks: list) -> dict:
+    """
+    Удаляет объекты model с id из pks.
+
+    :return: Количество удаленных строк по моделям, как у delete().
+    """
+    queryset = model._base_manager.filter(pk__in=pks)
+    file_fields = [
+        field.attname
+        for field in model._meta.concrete_fields
+        if isinstance(field, FileField)
+    ]
+    files = []
+    if file_fields:
+        for names in queryset.values_list(*file_fields):
+            files.extend(name for name in names if name)
+        queryset.update(**{field: '' for field in file_fields})
+    with cookable_index.collect_changes():
+        _, counts = queryset.delete()
+    if files:
+        enqueue('media.delete', files)
+    return counts
+
+
+def delete_dependents(
+    model: Type[Model], pks: list, batch_size: int
+) -> Iterator[dict]:
+    """Удаляет пачками строки, каскадно зависящие от объектов model."""
+    for relation in get_candidate_relations_to_delete(model._meta):
+        if relation.on_delete is not CASCADE:
+            # SET_NULL и подобные выполнит delete() родителя.
+            continue
+        yield from delete_in_batches(
+            relation.related_model._base_manager.filter(
+                **{f'{relation.field.name}__in': pks}
+            ),
+            batch_size,
+        )
+
+
+def delete_in_batches(
+    queryset: QuerySet, batch_size: int = consts.DELETE_BATCH_SIZE
+) -> Iterator[dict]:
+    """
+    Удаляет объекты queryset и каскадно зависящие от них строки.
+
+    Генератор отдает количество удаленных строк по моделям после каждой
+    пачки. Перед удалением пачки объектов удаляются пачками их зависимые
+    строки, поэтому delete() пачки удаляет только строки, появившиеся
+    за это время.
+    """
+    model = queryset.model
+    while True:
+        pks = list(
+            queryset.order_by().values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            return
+        yield from delete_dependents(model, pks, batch_size)
+        yield delete_batch(model, pks)
@@ -0,0 +1,257 @@
+"""
+Генерация большого объема синтетических данных.
+
+Каждый этап делится на диапазоны индексов, которые обрабатываются
+независимыми процессами. Первичные ключи пользователей и рецептов
+вычисляются из индекса, поэтому процессам не нужно читать из БД
+созданные другими процессами объекты.
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import islice
+from random import Random
+from typing import Iterable
+
+from django.db import DatabaseError, connection, transaction
+
+from foodgram.models import Favorite, Purchase, Recipe, RecipeIngredient, User
+from foodgram.utils import auto_now_disabled
+from users.models import Subscription
+
+BASE36_ALPHABET = '0123456789abcdefghijklmnopqrstuvwxyz'
+# Идентификаторы, созданные generate_identifier, состоят из hex-символов,
+# поэтому сгенерированные здесь начинаются с 'z' и не пересекаются с ними.
+SHORT_LINK_ID_PREFIX = 'z'
+SHORT_LINK_ID_BODY_LENGTH = 5
+SECONDS_IN_DAY = 24 * 60 * 60
+
+
+@dataclass
+class GenerationParams:
+    """Параметры генерации, общие для всех процессов."""
+
+    users: int
+    recipes: int
+    users_start: int
+    recipes_start: int
+    ingredient_ids: list
+    tag_ids: list
+    password: str
+    favorites_per_user: int
+    purchases_per_user: int
+    subscriptions_per_user: int
+    ingredients_per_recipe: int
+    skew: float
+    days: int
+    now: float
+    seed: int
+    batch_size: int
+
+
+def skewed_index(rng: Random, count: int, skew: float) -> int:
+    """
+    Возвращает индекс в диапазоне [0, count) со степенным распределением:
+    малые индексы выпадают значительно чаще.
+    """
+    return int(count * rng.random() ** skew)
+
+
+def skewed_count(rng: Random, average: int, limit: int) -> int:
+    """Возвращает количество с распределением Парето и заданным средним."""
+    alpha = 1.5
+    scale = average * (alpha - 1) / alpha
+    return min(int(rng.paretovariate(alpha) * scale), limit)
+
+
+def to_short_link_id(pk: int) -> str:
+    digits = []
+    while pk:
+        pk, remainder = divmod(pk, len(BASE36_ALPHABET))
+        digits.append(BASE36_ALPHABET[remainder])
+    body = ''.join(reversed(digits)).rjust(SHORT_LINK_ID_BODY_LENGTH, '0')
+    return f'{SHORT_LINK_ID_PREFIX}{body}'
+
+
+def bulk_insert(model, objects: Iterable, batch_size: int) -> int:
+    """Вставляет объекты пачками, каждая пачка в отдельной транзакции."""
+    objects = iter(objects)
+    inserted = 0
+    while batch := list(islice(objects, batch_size)):
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+        inserted += len(batch)
+    return inserted
+
+
+@contextmanager
+def fast_inserts():
+    """
+    Настраивает соединение процесса на быструю вставку.
+
+    Все внешние ключи генерируются заведомо корректными, поэтому проверки
+    ограничений и синхронная фиксация отключаются там, где это возможно.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SET synchronous_commit TO OFF')
+            try:
+                cursor.execute('SET session_replication_role TO replica')
+            except DatabaseError:
+                pass
+        elif connection.vendor == 'sqlite':
+            cursor.execute('PRAGMA foreign_keys = OFF')
+            cursor.execute('PRAGMA synchronous = OFF')
+    try:
+        yield
+    finally:
+        connection.close()
+
+
+def random_datetime(rng: Random, params: GenerationParams) -> datetime:
+    return datetime.fromtimestamp(
+        params.now - rng.random() * params.days * SECONDS_IN_DAY,
+        tz=timezone.utc,
+    )
+
+
+def generate_users(params: GenerationParams, start: int, stop: int) -> int:
+    def users():
+        for index in range(start, stop):
+            pk = params.users_start + index
+            yield User(
+                pk=pk,
+                username=f'fake_user_{pk}',
+                email=f'fake_user_{pk}@example.com',
+                first_name='Пользователь',
+                last_name=str(pk),
+                password=params.password,
+            )
+
+    return bulk_insert(User, users(), params.batch_size)
+
+
+def generate_recipes(params: GenerationParams, start: int, stop: int) -> int:
+    rng = Random(params.seed * 1_000_003 + start)
+
+    def recipes():
+        for index in range(start, stop):
+            pk = params.recipes_start + index
+            author = skewed_index(rng, params.users, params.skew)
+            created_at = random_datetime(rng, params)
+            yield Recipe(
+                pk=pk,
+                name=f'Рецепт {pk}',
+                text=f'Описание рецепта {pk}. ' * rng.randint(1, 30),
+                cooking_time=rng.randint(1, 240),
+                author_id=params.users_start + author,
+                image='recipes/ivan777.jpeg',
+                short_link_id=to_short_link_id(pk),
+                created_at=created_at,
+                updated_at=created_at,
+            )
+
+    def recipe_ingredients():
+        ingredients_count = len(params.ingredient_ids)
+        for index in range(start, stop):
+            count = max(
+                skewed_count(
+                    rng, params.ingredients_per_recipe, ingredients_count
+                ),
+                1,
+            )
+            ingredients = {
+                skewed_index(rng, ingredients_count, params.skew)
+                for _ in range(count)
+            }
+            for ingredient in ingredients:
+                yield RecipeIngredient(
+                    recipe_id=params.recipes_start + index,
+                    ingredient_id=params.ingredient_ids[ingredient],
+                    amount=rng.randint(1, 1000),
+                )
+
+    def recipe_tags():
+        for index in range(start, stop):
+            for tag_id in rng.sample(
+                params.tag_ids, rng.randint(1, len(params.tag_ids))
+            ):
+                yield Recipe.tags.through(
+                    recipe_id=params.recipes_start + index, tag_id=tag_id
+                )
+
+    with auto_now_disabled(Recipe):
+        inserted = bulk_insert(Recipe, recipes(), params.batch_size)
+    inserted += bulk_insert(
+        RecipeIngredient, recipe_ingredients(), params.batch_size
+    )
+    inserted += bulk_insert(
+        Recipe.tags.through, recipe_tags(), params.batch_size
+    )
+    return inserted
+
+
+def generate_relations(params: GenerationParams, start: int, stop: int) -> int:
+    rng = Random(params.seed * 2_000_003 + start)
+
+    def user_recipe_relations(model, average):
+        for index in range(start, stop):
+            recipes = {
+                skewed_index(rng, params.recipes, params.skew)
+                for _ in range(skewed_count(rng, average, params.recipes))
+            }
+            for recipe in recipes:
+                yield model(
+                    user_id=params.users_start + index,
+                    recipe_id=params.recipes_start + recipe,
+                    created_at=random_datetime(rng, params),
+                )
+
+    def subscriptions():
+        for index in range(start, stop):
+            authors = {
+                skewed_index(rng, params.users, params.skew)
+                for _ in range(
+                    skewed_count(
+                        rng, params.subscriptions_per_user, params.users
+                    )
+                )
+            }
+            authors.discard(index)
+            for author in authors:
+                yield Subscription(
+                    user_id=params.users_start + index,
+                    following_id=params.users_start + author,
+                    created_at=random_datetime(rng, params),
+                )
+
+    inserted = 0
+    with auto_now_disabled(Favorite, Purchase, Subscription):
+        for model, average in (
+            (Favorite, params.favorites_per_user),
+            (Purchase, params.purchases_per_user),
+        ):
+            inserted += bulk_insert(
+                model,
+                user_recipe_relations(model, average),
+                params.batch_size,
+            )
+        inserted += bulk_insert(
+            Subscription, subscriptions(), params.batch_size
+        )
+    return inserted
+
+
+STAGES = {
+    'users': (generate_users, 'users'),
+    'recipes': (generate_recipes, 'recipes'),
+    'relations': (generate_relations, 'users'),
+}
+
+
+def run_chunk(stage: str, params: GenerationParams, start: int, stop: int):
+    """Точка входа процесса: генерирует диапазон [start, stop) этапа."""
+    generator, _ = STAGES[stage]
+    with fast_inserts():
+        return generator(params, start, stop)
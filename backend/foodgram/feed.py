@@ -0,0 +1,179 @@
+"""
+Ленты рецептов от авторов, на которых подписан пользователь.
+
+Ленты формируются при записи: при публикации рецепта запись о нем
+добавляется в ленту каждого подписчика автора. Для авторов с числом
+подписчиков больше FEED_FANOUT_MAX_FOLLOWERS рассылка не выполняется:
+автор помечается флагом pull_feed, и его рецепты подмешиваются в ленту
+при чтении. Рассылка выполняется фоновой задачей feed.fan_out.
+"""
+
+import heapq
+from itertools import islice
+from typing import Iterable, Optional
+
+from django.db.models import Count, QuerySet
+
+from foodgram import consts
+from foodgram.models import FeedEntry, Recipe, User
+from users.models import Subscription
+
+
+def create_entries(entries: Iterable[FeedEntry]) -> None:
+    iterator = iter(entries)
+    while batch := list(islice(iterator, consts.FEED_BATCH_SIZE)):
+        FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def fan_out(recipe_id: int) -> None:
+    """Добавляет рецепт в ленты подписчиков его автора."""
+    recipe = (
+        Recipe.objects.filter(pk=recipe_id)
+        .values('author_id', 'created_at', 'author__pull_feed')
+        .first()
+    )
+    if recipe is None or recipe['author__pull_feed']:
+        return
+    followers = Subscription.objects.filter(following_id=recipe['author_id'])
+    if followers.count() > consts.FEED_FANOUT_MAX_FOLLOWERS:
+        User.objects.filter(pk=recipe['author_id']).update(pull_feed=True)
+        return
+    create_entries(
+        FeedEntry(
+            user_id=user_id,
+            recipe_id=recipe_id,
+            author_id=recipe['author_id'],
+            created_at=recipe['created_at'],
+        )
+        for user_id in followers.values_list('user_id', flat=True).iterator()
+    )
+
+
+def backfill(user_id: int, author_id: int) -> None:
+    """Добавляет в ленту последние рецепты автора после подписки на него."""
+    if User.objects.filter(pk=author_id, pull_feed=True).exists():
+        return
+    create_entries(
+        FeedEntry(
+            user_id=user_id,
+            recipe_id=recipe_id,
+            author_id=author_id,
+            created_at=created_at,
+        )
+        for recipe_id, created_at in Recipe.objects.filter(author_id=author_id)
+        .order_by('-created_at')
+        .values_list('id', 'created_at')[: consts.FEED_BACKFILL_LIMIT]
+    )
+
+
+def remove(user_id: int, author_id: int) -> None:
+    """Удаляет из ленты рецепты автора после отписки от него."""
+    FeedEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def rebuild_feeds(user_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Заполняет ленты пользователей по их подпискам: добавляет последние
+    рецепты каждого автора, как при подписке.
+
+    Нужна после загрузки подписок и рецептов в обход сигналов. Авторы
+    с числом подписчиков больше FEED_FANOUT_MAX_FOLLOWERS переводятся
+    на чтение по запросу, как при рассылке.
+
+    :param user_ids: Пользователи, ленты которых заполняются.
+    По умолчанию - все.
+    :return: Количество авторов, рецепты которых добавлены в ленты.
+    """
+    popular = (
+        Subscription.objects.order_by()
+        .values('following_id')
+        .annotate(followers=Count('*'))
+        .filter(followers__gt=consts.FEED_FANOUT_MAX_FOLLOWERS)
+        .values('following_id')
+    )
+    User.objects.filter(pk__in=popular, pull_feed=False).update(pull_feed=True)
+    subscriptions = Subscription.objects.all()
+    if user_ids is not None:
+        subscriptions = subscriptions.filter(user_id__in=list(user_ids))
+    author_ids = list(
+        subscriptions.filter(following__pull_feed=False)
+        .order_by()
+        .values_list('following_id', flat=True)
+        .distinct()
+    )
+    authors = 0
+    for author_id in author_ids:
+        recipes = list(
+            Recipe.objects.filter(author_id=author_id)
+            .order_by('-created_at')
+            .values_list('id', 'created_at')[: consts.FEED_BACKFILL_LIMIT]
+        )
+        if not recipes:
+            continue
+        authors += 1
+        create_entries(
+            FeedEntry(
+                user_id=user_id,
+                recipe_id=recipe_id,
+                author_id=author_id,
+                created_at=created_at,
+            )
+            for user_id in subscriptions.filter(following_id=author_id)
+            .values_list('user_id', flat=True)
+            .iterator()
+            for recipe_id, created_at in recipes
+        )
+    return authors
+
+
+class Timeline:
+    """
+    Лента пользователя в виде последовательности id рецептов.
+
+    Поддерживает count и срезы, поэтому передается в пагинатор вместо
+    queryset. Записи ленты и рецепты авторов с pull_feed сливаются по дате.
+    """
+
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.pull_authors = list(
+            Subscription.objects.filter(
+                user_id=user_id, following__pull_feed=True
+            ).values_list('following_id', flat=True)
+        )
+
+    def get_entries(self) -> QuerySet:
+        entries = FeedEntry.objects.filter(user_id=self.user_id)
+        if self.pull_authors:
+            # Записи, разосланные до перевода автора на чтение по запросу.
+            entries = entries.exclude(author_id__in=self.pull_authors)
+        return entries.order_by('-created_at', '-recipe_id')
+
+    def get_pulled(self) -> QuerySet:
+        return Recipe.objects.filter(author_id__in=self.pull_authors).order_by(
+            '-created_at', '-id'
+        )
+
+    def count(self) -> int:
+        count = self.get_entries().count()
+        if self.pull_authors:
+            count += self.get_pulled().count()
+        return count
+
+    def __getitem__(self, key: slice) -> list:
+        if not self.pull_authors:
+            return list(
+                self.get_entries().values_list('recipe_id', flat=True)[key]
+            )
+        # Слияние двух упорядоченных источников: из каждого берется не
+        # больше stop элементов.
+        merged = heapq.merge(
+            self.get_entries().values_list('created_at', 'recipe_id')[
+                : key.stop
+            ],
+            self.get_pulled().values_list('created_at', 'id')[: key.stop],
+            reverse=True,
+        )
+        return [
+            recipe_id for _, recipe_id in islice(merged, key.start, key.stop)
+        ]
@@ -0,0 +1,203 @@
+"""
+Быстрая загрузка фикстур.
+
+В отличие от loaddata, объекты не сохраняются по одному: JSON читается
+потоково, объекты группируются по моделям и вставляются через bulk_create
+в порядке зависимостей, связи многие-ко-многим вставляются пачками
+в промежуточные таблицы, а медиафайлы копируются параллельно.
+"""
+
+import json
+import logging
+import shutil
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, Iterator, Tuple
+
+from django.core.management.color import no_style
+from django.core.serializers.python import Deserializer
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from foodgram.signals import bulk_changed
+from foodgram.utils import auto_now_disabled
+
+READ_CHUNK_SIZE = 64 * 1024
+BATCH_SIZE = 2_000
+
+logger = logging.getLogger(__name__)
+
+
+def stream_json_array(file: IO, chunk_size: int = READ_CHUNK_SIZE) -> Iterator:
+    """
+    Последовательно возвращает элементы JSON-массива, не загружая файл
+    в память целиком.
+    """
+    decoder = json.JSONDecoder()
+    buffer = file.read(chunk_size).lstrip()
+    if not buffer.startswith('['):
+        raise ValueError('Фикстура должна содержать JSON-массив.')
+    buffer = buffer[1:]
+    eof = False
+
+    while True:
+        buffer = buffer.lstrip()
+        if buffer.startswith(','):
+            buffer = buffer[1:].lstrip()
+        if buffer.startswith(']'):
+            return
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+        yield item
+        buffer = buffer[end:]
+
+
+def copy_media(source: Path, destination: Path, workers: int) -> int:
+    """
+    Параллельно копирует медиафайлы фикстур, пропуская уже скопированные.
+
+    :return: Количество скопированных файлов.
+    """
+
+    def copy(path: Path) -> bool:
+        target = destination / path.relative_to(source)
+        if target.exists() and target.stat().st_size == path.stat().st_size:
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(path, target)
+        return True
+
+    files = [path for path in source.rglob('*') if path.is_file()]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return sum(executor.map(copy, files))
+
+
+def group_objects(paths: list, using: str) -> tuple:
+    """
+    Десериализует объекты фикстур и группирует их по моделям.
+
+    :return: Объекты по моделям и строки промежуточных таблиц по моделям.
+    """
+    objects = defaultdict(list)
+    through_rows = defaultdict(list)
+    for path in paths:
+        with open(path, encoding='utf-8') as file:
+            for deserialized in Deserializer(
+                stream_json_array(file), using=using
+            ):
+                instance = deserialized.object
+                objects[type(instance)].append(instance)
+                for field_name, values in deserialized.m2m_data.items():
+                    field = instance._meta.get_field(field_name)
+                    through = field.remote_field.through
+                    source = field.m2m_field_name()
+                    target = field.m2m_reverse_field_name()
+                    through_rows[through].extend(
+                        through(
+                            **{f'{source}_id': instance.pk},
+                            **{f'{target}_id': value},
+                        )
+                        for value in values
+                    )
+    return objects, through_rows
+
+
+def sort_models(models: list) -> list:
+    """
+    Сортирует модели так, чтобы модели, на которые ссылаются внешние ключи,
+    шли раньше зависимых.
+    """
+    pending = {
+        model: {
+            field.related_model
+            for field in model._meta.concrete_fields
+            if field.is_relation
+            and field.related_model in models
+            and field.related_model is not model
+        }
+        for model in models
+    }
+    ordered = []
+    while pending:
+        ready = [model for model, deps in pending.items() if not deps]
+        if not ready:
+            # Циклические зависимости: проверка ограничений отложена.
+            ready = list(pending)
+        for model in ready:
+            del pending[model]
+            ordered.append(model)
+        for deps in pending.values():
+            deps.difference_update(ready)
+    return ordered
+
+
+def bulk_load(model, rows: list, using: str) -> int:
+    """
+    Вставляет строки, пропуская конфликтующие с существующими.
+
+    :return: Количество вставленных строк: разница числа строк таблицы до
+    и после вставки (bulk_create с ignore_conflicts его не возвращает).
+    """
+    manager = model._base_manager.using(using)
+    before = manager.count()
+    manager.bulk_create(rows, batch_size=BATCH_SIZE, ignore_conflicts=True)
+    return manager.count() - before
+
+
+def load_fixtures(
+    paths: list, using: str = DEFAULT_DB_ALIAS
+) -> Tuple[dict, dict]:
+    """
+    Загружает фикстуры в БД.
+
+    Объекты, конфликтующие с существующими (по первичному ключу или другому
+    уникальному ограничению), пропускаются, поэтому повторная загрузка
+    безопасна. О пропущенных объектах выводится предупреждение.
+
+    :param paths: Пути к JSON-фикстурам.
+    :param using: Псевдоним БД.
+    :return: Количество загруженных и пропущенных объектов по меткам
+    моделей.
+    """
+    objects, through_rows = group_objects(paths, using)
+    models = sort_models(list(objects))
+    connection = connections[using]
+    loaded, skipped = {}, {}
+
+    with transaction.atomic(using=using), auto_now_disabled(*models):
+        with connection.constraint_checks_disabled():
+            batches = [(model, objects[model]) for model in models]
+            batches += list(through_rows.items())
+            for model, rows in batches:
+                label = model._meta.label
+                loaded[label] = bulk_load(model, rows, using)
+                skipped[label] = len(rows) - loaded[label]
+                if skipped[label]:
+                    logger.warning(
+                        '%s: пропущено объектов, конфликтующих '
+                        'с существующими: %s.',
+                        label,
+                        skipped[label],
+                    )
+
+        tables = [model._meta.db_table for model in models]
+        tables += [through._meta.db_table for through in through_rows]
+        connection.check_constraints(table_names=tables)
+
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), models + list(through_rows)
+        )
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+    for model in models + list(through_rows):
+        bulk_changed.send(sender=model)
+    return loaded, skipped
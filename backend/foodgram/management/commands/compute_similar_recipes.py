@@ -0,0 +1,53 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from foodgram import consts
+from foodgram.similar import refresh_similar_recipes
+
+
+class Command(BaseCommand):
+    """Команда для расчета похожих рецептов."""
+
+    help = (
+        'Рассчитывает списки похожих рецептов по ингредиентам и тегам '
+        '(коэффициент Жаккара) и сохраняет их в БД. По умолчанию '
+        'пересчитываются только рецепты, измененные с прошлого запуска. '
+        'Команду следует запускать периодически, например из cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Пересчитать списки всех рецептов.',
+        )
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=consts.SIMILAR_TOP_K,
+            help='Количество похожих рецептов для каждого рецепта.',
+        )
+        parser.add_argument(
+            '--min-score',
+            type=float,
+            default=consts.SIMILAR_MIN_SCORE,
+            help='Минимальное сходство похожего рецепта.',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        result = refresh_similar_recipes(
+            full=options['full'],
+            top_k=options['top_k'],
+            min_score=options['min_score'],
+        )
+        mode = 'Полный' if result['mode'] == 'full' else 'Инкрементальный'
+        sys.stdout.write(
+            self.style.SUCCESS(
+                f'{mode} расчет: обновлено рецептов {result["recipes"]}, '
+                f'записано строк {result["rows"]} за '
+                f'{time.perf_counter() - started:.1f} с.\n'
+            )
+        )
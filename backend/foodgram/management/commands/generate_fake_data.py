@@ -0,0 +1,183 @@
+import multiprocessing
+import os
+import sys
+import time
+from functools import partial
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections
+from django.db.models import Max
+
+from foodgram.fake_data import STAGES, GenerationParams, run_chunk
+from foodgram.feed import rebuild_feeds
+from foodgram.models import (
+    Favorite,
+    Ingredient,
+    Purchase,
+    Recipe,
+    RecipeIngredient,
+    Tag,
+    User,
+)
+from foodgram.search import rebuild_search_index
+from foodgram.signals import bulk_changed
+from users.models import Subscription
+
+FAKE_USER_PASSWORD = 'fake-password'
+
+
+def run_stage_chunk(stage, params, bounds):
+    return run_chunk(stage, params, *bounds)
+
+
+class Command(BaseCommand):
+    """Команда для генерации синтетических данных большого объема."""
+
+    help = (
+        'Создает пользователей, рецепты, ингредиенты рецептов, избранное, '
+        'покупки и подписки со степенным распределением популярности. '
+        'Данные вставляются пачками через bulk_create параллельно в '
+        'нескольких процессах. Ингредиенты и теги должны быть загружены '
+        'заранее. Пароль всех пользователей - "fake-password".'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--recipes', type=int, default=100_000)
+        parser.add_argument('--favorites-per-user', type=int, default=20)
+        parser.add_argument('--purchases-per-user', type=int, default=5)
+        parser.add_argument('--subscriptions-per-user', type=int, default=10)
+        parser.add_argument('--ingredients-per-recipe', type=int, default=8)
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=2.0,
+            help='Степень неравномерности популярности (1 - равномерно).',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='Период, за который распределяются даты создания.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Количество процессов. Для SQLite всегда 1.',
+        )
+        parser.add_argument('--batch-size', type=int, default=5_000)
+        parser.add_argument('--chunk-size', type=int, default=20_000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        ingredient_ids = list(Ingredient.objects.values_list('id', flat=True))
+        tag_ids = list(Tag.objects.values_list('id', flat=True))
+        if not ingredient_ids or not tag_ids:
+            raise CommandError(
+                'Сначала загрузите ингредиенты и теги, например: '
+                'manage.py loaddata fixtures/ingredients_tags.json'
+            )
+
+        params = GenerationParams(
+            users=options['users'],
+            recipes=options['recipes'],
+            users_start=self.next_pk(User),
+            recipes_start=self.next_pk(Recipe),
+            ingredient_ids=ingredient_ids,
+            tag_ids=tag_ids,
+            password=make_password(FAKE_USER_PASSWORD),
+            favorites_per_user=options['favorites_per_user'],
+            purchases_per_user=options['purchases_per_user'],
+            subscriptions_per_user=options['subscriptions_per_user'],
+            ingredients_per_recipe=options['ingredients_per_recipe'],
+            skew=options['skew'],
+            days=options['days'],
+            now=time.time(),
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+        )
+        workers = options['workers']
+        if connection.vendor == 'sqlite':
+            workers = 1
+
+        started = time.perf_counter()
+        total = 0
+        for stage, (_, count_attribute) in STAGES.items():
+            count = getattr(params, count_attribute)
+            chunks = [
+                (start, min(start + options['chunk_size'], count))
+                for start in range(0, count, options['chunk_size'])
+            ]
+            total += self.run_stage(stage, params, chunks, workers)
+
+        self.reset_sequences()
+        if connection.vendor == 'postgresql':
+            # Вставки шли с session_replication_role = replica, поэтому
+            # триггеры поискового индекса не срабатывали.
+            sys.stdout.write('Пересчет поискового индекса...\n')
+            rebuild_search_index()
+        for model in (
+            User,
+            Recipe,
+            RecipeIngredient,
+            Recipe.tags.through,
+            Favorite,
+            Purchase,
+            Subscription,
+        ):
+            bulk_changed.send(sender=model)
+        sys.stdout.write('Заполнение лент...\n')
+        rebuild_feeds()
+        elapsed = time.perf_counter() - started
+        sys.stdout.write(
+            self.style.SUCCESS(
+                f'Создано {total} строк за {elapsed:.1f} с '
+                f'({total / elapsed:.0f} строк/с).\n'
+            )
+        )
+
+    @staticmethod
+    def next_pk(model) -> int:
+        return (model.objects.aggregate(max_pk=Max('pk'))['max_pk'] or 0) + 1
+
+    def run_stage(self, stage, params, chunks, workers) -> int:
+        started = time.perf_counter()
+        inserted = 0
+        task = partial(run_stage_chunk, stage, params)
+        if workers > 1:
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            with context.Pool(workers) as pool:
+                for done, rows in enumerate(
+                    pool.imap_unordered(task, chunks), start=1
+                ):
+                    inserted += rows
+                    self.write_progress(stage, done, len(chunks), inserted)
+        else:
+            for done, bounds in enumerate(chunks, start=1):
+                inserted += task(bounds)
+                self.write_progress(stage, done, len(chunks), inserted)
+
+        elapsed = time.perf_counter() - started
+        sys.stdout.write(
+            f'\r{stage}: {inserted} строк за {elapsed:.1f} с' f'{" " * 20}\n'
+        )
+        return inserted
+
+    @staticmethod
+    def write_progress(stage, done, total, inserted):
+        sys.stdout.write(f'\r{stage}: {done}/{total} частей, {inserted} строк')
+        sys.stdout.flush()
+
+    @staticmethod
+    def reset_sequences():
+        """Сдвигает последовательности после вставки с явными ключами."""
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [User, Recipe]
+        )
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
@@ -6,6 +6,7 @@ from pathlib import Path
 from django.core.management.base import BaseCommand, CommandError
 
 from foodgram.models import Ingredient
+from foodgram.signals import bulk_changed
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
 
@@ -27,6 +28,7 @@ def load_data(file_path):
                 ingredients.append(Ingredient(**data))
 
         Ingredient.objects.bulk_create(ingredients)
+        bulk_changed.send(sender=Ingredient)
 
 
 class Command(BaseCommand):
@@ -0,0 +1,27 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from foodgram.feed import rebuild_feeds
+
+
+class Command(BaseCommand):
+    """Команда для заполнения лент по существующим подпискам."""
+
+    help = (
+        'Добавляет в ленты пользователей последние рецепты авторов, на '
+        'которых они подписаны. Нужна после загрузки подписок и рецептов '
+        'в обход API, например после обновления на версию с лентами. '
+        'Существующие записи лент не дублируются.'
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        authors = rebuild_feeds()
+        sys.stdout.write(
+            self.style.SUCCESS(
+                f'Ленты заполнены (авторов: {authors}) за '
+                f'{time.perf_counter() - started:.1f} с.\n'
+            )
+        )
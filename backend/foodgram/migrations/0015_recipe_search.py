@@ -0,0 +1,256 @@
+from django.db import migrations
+
+POSTGRESQL_FORWARD = (
+    'ALTER TABLE foodgram_recipe ADD COLUMN search_vector tsvector',
+    """
+    CREATE FUNCTION foodgram_recipe_document(
+        recipe_name text, recipe_text text, recipe_pk bigint
+    ) RETURNS tsvector AS $$
+        SELECT
+            setweight(to_tsvector('russian', coalesce(recipe_name, '')), 'A')
+            || setweight(to_tsvector('russian', coalesce((
+                SELECT string_agg(i.name, ' ')
+                FROM foodgram_recipeingredient ri
+                JOIN foodgram_ingredient i ON i.id = ri.ingredient_id
+                WHERE ri.recipe_id = recipe_pk
+            ), '')), 'B')
+            || setweight(to_tsvector('russian', coalesce(recipe_text, '')), 'C')
+    $$ LANGUAGE sql STABLE
+    """,
+    """
+    CREATE FUNCTION foodgram_recipe_search_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := foodgram_recipe_document(
+            NEW.name, NEW.text, NEW.id
+        );
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER foodgram_recipe_search
+    BEFORE INSERT OR UPDATE OF name, text ON foodgram_recipe
+    FOR EACH ROW EXECUTE FUNCTION foodgram_recipe_search_update()
+    """,
+    # Триггер уровня оператора: массовое изменение ингредиентов рецепта
+    # пересчитывает вектор каждого затронутого рецепта один раз.
+    """
+    CREATE FUNCTION foodgram_recipeingredient_search_update()
+    RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE foodgram_recipe r
+            SET search_vector = foodgram_recipe_document(r.name, r.text, r.id)
+            WHERE r.id IN (SELECT recipe_id FROM new_rows);
+        ELSIF TG_OP = 'DELETE' THEN
+            UPDATE foodgram_recipe r
+            SET search_vector = foodgram_recipe_document(r.name, r.text, r.id)
+            WHERE r.id IN (SELECT recipe_id FROM old_rows);
+        ELSE
+            UPDATE foodgram_recipe r
+            SET search_vector = foodgram_recipe_document(r.name, r.text, r.id)
+            WHERE r.id IN (
+                SELECT recipe_id FROM new_rows
+                UNION SELECT recipe_id FROM old_rows
+            );
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER foodgram_recipeingredient_search_insert
+    AFTER INSERT ON foodgram_recipeingredient
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION foodgram_recipeingredient_search_update()
+    """,
+    """
+    CREATE TRIGGER foodgram_recipeingredient_search_delete
+    AFTER DELETE ON foodgram_recipeingredient
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION foodgram_recipeingredient_search_update()
+    """,
+    """
+    CREATE TRIGGER foodgram_recipeingredient_search_change
+    AFTER UPDATE ON foodgram_recipeingredient
+    REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION foodgram_recipeingredient_search_update()
+    """,
+    """
+    CREATE FUNCTION foodgram_ingredient_search_update() RETURNS trigger AS $$
+    BEGIN
+        UPDATE foodgram_recipe r
+        SET search_vector = foodgram_recipe_document(r.name, r.text, r.id)
+        WHERE r.id IN (
+            SELECT recipe_id FROM foodgram_recipeingredient
+            WHERE ingredient_id = NEW.id
+        );
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER foodgram_ingredient_search
+    AFTER UPDATE OF name ON foodgram_ingredient
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION foodgram_ingredient_search_update()
+    """,
+    """
+    UPDATE foodgram_recipe
+    SET search_vector = foodgram_recipe_document(name, text, id)
+    """,
+    """
+    CREATE INDEX foodgram_recipe_search_vector_idx
+    ON foodgram_recipe USING GIN (search_vector)
+    """,
+)
+
+POSTGRESQL_BACKWARD = (
+    'DROP TRIGGER foodgram_ingredient_search ON foodgram_ingredient',
+    'DROP FUNCTION foodgram_ingredient_search_update()',
+    'DROP TRIGGER foodgram_recipeingredient_search_insert '
+    'ON foodgram_recipeingredient',
+    'DROP TRIGGER foodgram_recipeingredient_search_delete '
+    'ON foodgram_recipeingredient',
+    'DROP TRIGGER foodgram_recipeingredient_search_change '
+    'ON foodgram_recipeingredient',
+    'DROP FUNCTION foodgram_recipeingredient_search_update()',
+    'DROP TRIGGER foodgram_recipe_search ON foodgram_recipe',
+    'DROP FUNCTION foodgram_recipe_search_update()',
+    'DROP FUNCTION foodgram_recipe_document(text, text, bigint)',
+    'ALTER TABLE foodgram_recipe DROP COLUMN search_vector',
+)
+
+# В SQLite нет русского стемминга, поэтому используется токенизатор
+# unicode61, а запросы строятся по префиксам слов.
+SQLITE_INGREDIENTS = """
+    (SELECT coalesce(group_concat(i.name, ' '), '')
+     FROM foodgram_recipeingredient ri
+     JOIN foodgram_ingredient i ON i.id = ri.ingredient_id
+     WHERE ri.recipe_id = {recipe_id})
+"""
+
+SQLITE_FORWARD = (
+    """
+    CREATE VIRTUAL TABLE foodgram_recipe_fts USING fts5(
+        name, ingredients, text, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER foodgram_recipe_fts_insert
+    AFTER INSERT ON foodgram_recipe BEGIN
+        INSERT INTO foodgram_recipe_fts (rowid, name, ingredients, text)
+        VALUES (
+            NEW.id, NEW.name,
+            {SQLITE_INGREDIENTS.format(recipe_id='NEW.id')},
+            NEW.text
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER foodgram_recipe_fts_update
+    AFTER UPDATE OF name, text ON foodgram_recipe BEGIN
+        UPDATE foodgram_recipe_fts SET name = NEW.name, text = NEW.text
+        WHERE rowid = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER foodgram_recipe_fts_delete
+    AFTER DELETE ON foodgram_recipe BEGIN
+        DELETE FROM foodgram_recipe_fts WHERE rowid = OLD.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER foodgram_recipeingredient_fts_insert
+    AFTER INSERT ON foodgram_recipeingredient BEGIN
+        UPDATE foodgram_recipe_fts
+        SET ingredients = {SQLITE_INGREDIENTS.format(recipe_id='NEW.recipe_id')}
+        WHERE rowid = NEW.recipe_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER foodgram_recipeingredient_fts_delete
+    AFTER DELETE ON foodgram_recipeingredient BEGIN
+        UPDATE foodgram_recipe_fts
+        SET ingredients = {SQLITE_INGREDIENTS.format(recipe_id='OLD.recipe_id')}
+        WHERE rowid = OLD.recipe_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER foodgram_recipeingredient_fts_update
+    AFTER UPDATE ON foodgram_recipeingredient BEGIN
+        UPDATE foodgram_recipe_fts
+        SET ingredients = {SQLITE_INGREDIENTS.format(recipe_id='OLD.recipe_id')}
+        WHERE rowid = OLD.recipe_id;
+        UPDATE foodgram_recipe_fts
+        SET ingredients = {SQLITE_INGREDIENTS.format(recipe_id='NEW.recipe_id')}
+        WHERE rowid = NEW.recipe_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER foodgram_ingredient_fts_update
+    AFTER UPDATE OF name ON foodgram_ingredient BEGIN
+        UPDATE foodgram_recipe_fts
+        SET ingredients = {SQLITE_INGREDIENTS.format(recipe_id='foodgram_recipe_fts.rowid')}
+        WHERE rowid IN (
+            SELECT recipe_id FROM foodgram_recipeingredient
+            WHERE ingredient_id = NEW.id
+        );
+    END
+    """,
+    f"""
+    INSERT INTO foodgram_recipe_fts (rowid, name, ingredients, text)
+    SELECT
+        r.id, r.name,
+        {SQLITE_INGREDIENTS.format(recipe_id='r.id')},
+        r.text
+    FROM foodgram_recipe r
+    """,
+)
+
+SQLITE_BACKWARD = (
+    'DROP TRIGGER IF EXISTS foodgram_ingredient_fts_update',
+    'DROP TRIGGER IF EXISTS foodgram_recipeingredient_fts_update',
+    'DROP TRIGGER IF EXISTS foodgram_recipeingredient_fts_delete',
+    'DROP TRIGGER IF EXISTS foodgram_recipeingredient_fts_insert',
+    'DROP TRIGGER IF EXISTS foodgram_recipe_fts_delete',
+    'DROP TRIGGER IF EXISTS foodgram_recipe_fts_update',
+    'DROP TRIGGER IF EXISTS foodgram_recipe_fts_insert',
+    'DROP TABLE foodgram_recipe_fts',
+)
+
+
+def run_statements(statements):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for statement in statements.get(vendor, ()):
+            schema_editor.execute(statement, params=None)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodgram', '0014_delete_subscription'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_statements(
+                {
+                    'postgresql': POSTGRESQL_FORWARD,
+                    'sqlite': SQLITE_FORWARD,
+                }
+            ),
+            run_statements(
+                {
+                    'postgresql': POSTGRESQL_BACKWARD,
+                    'sqlite': SQLITE_BACKWARD,
+                }
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 3.2.16 on 2026-10-19 11:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodgram', '0017_feedentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexGeneration',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='индекс')),
+                ('value', models.BigIntegerField(default=0, verbose_name='поколение')),
+            ],
+            options={
+                'verbose_name': 'поколение индекса',
+                'verbose_name_plural': 'Поколения индексов',
+            },
+        ),
+    ]
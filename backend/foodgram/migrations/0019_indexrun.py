@@ -0,0 +1,24 @@
+# Generated by Django 3.2.16 on 2026-10-19 11:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodgram', '0018_indexgeneration'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexRun',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='индекс')),
+                ('started_at', models.DateTimeField(verbose_name='начало расчета')),
+            ],
+            options={
+                'verbose_name': 'расчет индекса',
+                'verbose_name_plural': 'Расчеты индексов',
+            },
+        ),
+    ]
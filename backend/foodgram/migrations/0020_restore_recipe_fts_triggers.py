@@ -0,0 +1,68 @@
+from django.db import migrations
+
+# SQLite выполняет AddField и AlterField рецепта пересозданием таблицы
+# foodgram_recipe, при этом удаляются ее триггеры. Миграция 0016
+# удалила триггеры поискового индекса из 0015, поэтому они создаются
+# заново, а индекс рецептов, созданных без них, пересчитывается.
+# Любая следующая миграция, пересоздающая таблицу рецептов в SQLite,
+# должна делать то же самое.
+SQLITE_INGREDIENTS = """
+    (SELECT coalesce(group_concat(i.name, ' '), '')
+     FROM foodgram_recipeingredient ri
+     JOIN foodgram_ingredient i ON i.id = ri.ingredient_id
+     WHERE ri.recipe_id = {recipe_id})
+"""
+
+SQLITE_FORWARD = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS foodgram_recipe_fts_insert
+    AFTER INSERT ON foodgram_recipe BEGIN
+        INSERT INTO foodgram_recipe_fts (rowid, name, ingredients, text)
+        VALUES (
+            NEW.id, NEW.name,
+            {SQLITE_INGREDIENTS.format(recipe_id='NEW.id')},
+            NEW.text
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS foodgram_recipe_fts_update
+    AFTER UPDATE OF name, text ON foodgram_recipe BEGIN
+        UPDATE foodgram_recipe_fts SET name = NEW.name, text = NEW.text
+        WHERE rowid = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS foodgram_recipe_fts_delete
+    AFTER DELETE ON foodgram_recipe BEGIN
+        DELETE FROM foodgram_recipe_fts WHERE rowid = OLD.id;
+    END
+    """,
+    'DELETE FROM foodgram_recipe_fts',
+    f"""
+    INSERT INTO foodgram_recipe_fts (rowid, name, ingredients, text)
+    SELECT
+        r.id, r.name,
+        {SQLITE_INGREDIENTS.format(recipe_id='r.id')},
+        r.text
+    FROM foodgram_recipe r
+    """,
+)
+
+
+def restore_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in SQLITE_FORWARD:
+        schema_editor.execute(statement, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodgram', '0019_indexrun'),
+    ]
+
+    operations = [
+        migrations.RunPython(restore_triggers, migrations.RunPython.noop),
+    ]
@@ -143,6 +143,9 @@ class Recipe(BaseCreatedAt, BaseName):
         verbose_name='id короткой ссылки',
         help_text='генерируется автоматически',
     )
+    updated_at = models.DateTimeField(
+        auto_now=True, db_index=True, verbose_name='Дата изменения'
+    )
 
     class Meta(BaseCreatedAt.Meta):
         default_related_name = 'recipes'
@@ -150,7 +153,8 @@ class Recipe(BaseCreatedAt, BaseName):
         verbose_name_plural = 'Рецепты'
 
     def save(self, *args, **kwargs):
-        self.short_link_id = get_short_link_id(Recipe)
+        if not self.short_link_id:
+            self.short_link_id = get_short_link_id(Recipe)
         super().save(*args, **kwargs)
 
     @property
@@ -220,3 +224,142 @@ class Purchase(BaseCreatedAt):
 
     def __str__(self):
         return self.recipe.name
+
+
+class SimilarRecipe(models.Model):
+    """
+    Модель описывающая похожие рецепты.
+
+    Списки похожих рецептов заранее рассчитываются командой
+    compute_similar_recipes по пересечению ингредиентов и тегов.
+    """
+
+    recipe = models.ForeignKey(
+        Recipe,
+        related_name='similar_recipes',
+        on_delete=models.CASCADE,
+        verbose_name='рецепт',
+    )
+    similar = models.ForeignKey(
+        Recipe,
+        related_name='+',
+        on_delete=models.CASCADE,
+        verbose_name='похожий рецепт',
+    )
+    rank = models.PositiveSmallIntegerField(verbose_name='Место')
+    score = models.FloatField(verbose_name='Сходство')
+    computed_at = models.DateTimeField(
+        db_index=True, verbose_name='Дата расчета'
+    )
+
+    class Meta:
+        ordering = ('recipe', 'rank')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recipe', 'rank'], name='unique_similar_recipe_rank'
+            ),
+        ]
+        verbose_name = 'похожий рецепт'
+        verbose_name_plural = 'Похожие рецепты'
+
+    def __str__(self):
+        return f'{self.recipe_id} -> {self.similar_id}'
+
+
+class FeedEntry(models.Model):
+    """
+    Модель описывающая ленту пользователя.
+
+    Запись создается для каждого подписчика автора при публикации рецепта,
+    поэтому чтение ленты - срез по индексу без обхода подписок.
+    """
+
+    user = models.ForeignKey(
+        User,
+        related_name='feed_entries',
+        on_delete=models.CASCADE,
+        verbose_name='владелец ленты',
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        related_name='feed_entries',
+        on_delete=models.CASCADE,
+        verbose_name='рецепт',
+    )
+    author = models.ForeignKey(
+        User,
+        related_name='+',
+        on_delete=models.CASCADE,
+        verbose_name='автор рецепта',
+    )
+    created_at = models.DateTimeField(verbose_name='Дата публикации рецепта')
+
+    class Meta:
+        ordering = ('-created_at', '-recipe')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'recipe'], name='unique_user_feed_recipe'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-created_at', '-recipe'],
+                name='feed_user_created_idx',
+            ),
+            models.Index(
+                fields=['user', 'author'], name='feed_user_author_idx'
+            ),
+        ]
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'Ленты'
+
+    def __str__(self):
+        return f'{self.user_id} <- {self.recipe_id}'
+
+
+class IndexGeneration(models.Model):
+    """
+    Поколение данных, которые процессы хранят в памяти: номер журнала
+    изменений индекса "Что приготовить" или отметка времени изменения
+    справочника.
+
+    Поколение хранится в БД и увеличивается атомарно, поэтому не
+    сбрасывается при очистке или вытеснении записей кеша.
+    """
+
+    name = models.CharField(
+        max_length=consts.MAX_SLUG_LENGTH,
+        primary_key=True,
+        verbose_name='индекс',
+    )
+    value = models.BigIntegerField(default=0, verbose_name='поколение')
+
+    class Meta:
+        verbose_name = 'поколение индекса'
+        verbose_name_plural = 'Поколения индексов'
+
+    def __str__(self):
+        return f'{self.name}: {self.value}'
+
+
+class IndexRun(models.Model):
+    """
+    Время начала последнего успешного расчета индекса.
+
+    Инкрементальный расчет обрабатывает объекты, измененные с этого
+    момента, даже если прошлый расчет не записал ни одной строки.
+    """
+
+    name = models.CharField(
+        max_length=consts.MAX_SLUG_LENGTH,
+        primary_key=True,
+        verbose_name='индекс',
+    )
+    started_at = models.DateTimeField(verbose_name='начало расчета')
+
+    class Meta:
+        verbose_name = 'расчет индекса'
+        verbose_name_plural = 'Расчеты индексов'
+
+    def __str__(self):
+        return f'{self.name}: {self.started_at}'
@@ -0,0 +1,124 @@
+"""
+Полнотекстовый поиск рецептов.
+
+В PostgreSQL поиск идет по столбцу search_vector (tsvector с русским
+стеммингом), который поддерживается триггерами и индексирован GIN.
+В SQLite используется таблица FTS5 foodgram_recipe_fts. Столбец и таблица
+создаются миграцией 0015_recipe_search и не описаны в моделях.
+"""
+
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import BooleanField, FloatField, Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+from foodgram import consts
+
+WORD_PATTERN = re.compile(r'\w+')
+# Окончания отбрасываются, чтобы префиксный запрос FTS5 находил другие
+# формы слова: "картошки" -> "картошк*".
+RUSSIAN_ENDING_PATTERN = re.compile(r'[аеёийоуыьэюя]+$')
+
+POSTGRESQL_QUERY = f"websearch_to_tsquery('{consts.SEARCH_CONFIG}', %s)"
+POSTGRESQL_MATCH = f'foodgram_recipe.search_vector @@ {POSTGRESQL_QUERY}'
+POSTGRESQL_RANK = (
+    f'ts_rank_cd(foodgram_recipe.search_vector, {POSTGRESQL_QUERY})'
+)
+
+SQLITE_MATCH = (
+    'SELECT rowid FROM foodgram_recipe_fts WHERE foodgram_recipe_fts MATCH %s'
+)
+SQLITE_RANK = (
+    'SELECT -bm25(foodgram_recipe_fts, {}, {}, {}) FROM foodgram_recipe_fts '
+    'WHERE foodgram_recipe_fts MATCH %s AND rowid = foodgram_recipe.id'
+).format(*consts.SQLITE_SEARCH_WEIGHTS)
+
+POSTGRESQL_REBUILD = (
+    'UPDATE foodgram_recipe '
+    'SET search_vector = foodgram_recipe_document(name, text, id)',
+)
+SQLITE_REBUILD = (
+    'DELETE FROM foodgram_recipe_fts',
+    """
+    INSERT INTO foodgram_recipe_fts (rowid, name, ingredients, text)
+    SELECT
+        r.id, r.name,
+        (SELECT coalesce(group_concat(i.name, ' '), '')
+         FROM foodgram_recipeingredient ri
+         JOIN foodgram_ingredient i ON i.id = ri.ingredient_id
+         WHERE ri.recipe_id = r.id),
+        r.text
+    FROM foodgram_recipe r
+    """,
+)
+
+
+def to_fts5_query(text: str) -> str:
+    """
+    Преобразует пользовательский запрос в запрос FTS5.
+
+    Каждое слово ищется по префиксу без окончания, все слова обязательны.
+    """
+    terms = []
+    for word in WORD_PATTERN.findall(text.lower()):
+        stem = RUSSIAN_ENDING_PATTERN.sub('', word)
+        if len(stem) < consts.SQLITE_MIN_STEM_LENGTH:
+            stem = word
+        terms.append(f'"{stem}"*')
+    return ' '.join(terms)
+
+
+def search_recipes(queryset: QuerySet, text: str) -> QuerySet:
+    """
+    Фильтрует рецепты по поисковому запросу.
+
+    Найденные рецепты аннотируются полем search_rank и сортируются по нему:
+    совпадения в названии весят больше, чем в ингредиентах и описании.
+
+    :param queryset: Queryset рецептов.
+    :param text: Поисковый запрос.
+    :return: Отфильтрованный и отсортированный queryset.
+    """
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        queryset = queryset.filter(
+            RawSQL(POSTGRESQL_MATCH, (text,), output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(
+                POSTGRESQL_RANK, (text,), output_field=FloatField()
+            )
+        )
+    elif vendor == 'sqlite':
+        query = to_fts5_query(text)
+        if not query:
+            return queryset.none()
+        queryset = queryset.filter(
+            id__in=RawSQL(SQLITE_MATCH, (query,))
+        ).annotate(
+            search_rank=RawSQL(
+                SQLITE_RANK, (query,), output_field=FloatField()
+            )
+        )
+    else:
+        return queryset.filter(
+            Q(name__icontains=text) | Q(text__icontains=text)
+        )
+    return queryset.order_by('-search_rank', '-created_at')
+
+
+def rebuild_search_index(using: str = DEFAULT_DB_ALIAS) -> None:
+    """
+    Пересчитывает поисковый индекс всех рецептов.
+
+    Нужен после вставок в обход триггеров, например при
+    session_replication_role = replica.
+    """
+    connection = connections[using]
+    statements = {
+        'postgresql': POSTGRESQL_REBUILD,
+        'sqlite': SQLITE_REBUILD,
+    }.get(connection.vendor, ())
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Отправляется после массовых операций (bulk_create, update, загрузка
+# фикстур), которые не вызывают post_save/post_delete. sender - модель.
+bulk_changed = Signal()
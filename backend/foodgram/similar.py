@@ -0,0 +1,344 @@
+"""
+Расчет похожих рецептов.
+
+Сходство рецептов - коэффициент Жаккара их множеств признаков: ингредиентов
+и тегов. Для каждого признака хранится массив рецептов (posting list),
+кандидаты в похожие для рецепта - рецепты, разделяющие с ним хотя бы один
+редкий признак. Пересечение по редким признакам считается подсчетом
+повторов в объединении массивов, по частым - битовыми масками, поэтому
+рецепт не сравнивается со всеми остальными.
+
+Результат сохраняется в SimilarRecipe, время начала расчета - в IndexRun.
+Повторный запуск пересчитывает только списки рецептов, измененных
+с прошлого запуска, списки тех рецептов, в которые измененные рецепты
+входили или теперь должны войти, и неполные списки (из них могли быть
+удалены рецепты). Списки пересчитываются заново, поэтому результат
+совпадает с полным расчетом.
+"""
+
+from collections import defaultdict
+from itertools import islice
+from typing import Iterable, Optional
+
+import numpy as np
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from foodgram import consts
+from foodgram.cookable import load_pairs
+from foodgram.models import IndexRun, Recipe, RecipeIngredient, SimilarRecipe
+
+MASK_WORD_BITS = 64
+
+
+def batched(items: Iterable, size: int = consts.SIMILAR_BATCH_SIZE):
+    """Разбивает последовательность на списки не длиннее size."""
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class SimilarityData:
+    """Признаки всех рецептов в виде массивов."""
+
+    def __init__(self, recipe_ids: np.ndarray, pairs: tuple):
+        self.recipe_ids = recipe_ids
+        rows = np.searchsorted(recipe_ids, pairs[0])
+        features = pairs[1]
+        order = np.argsort(rows, kind='stable')
+        rows, features = rows[order], features[order]
+        count = len(recipe_ids)
+        self.sizes = np.bincount(rows, minlength=count)
+        self.indptr = np.concatenate(([0], np.cumsum(self.sizes)))
+        self.features = features
+
+        frequency = np.bincount(features) if len(features) else np.zeros(0)
+        threshold = max(
+            consts.SIMILAR_COMMON_FEATURE_RATIO * count,
+            consts.SIMILAR_MIN_COMMON_FEATURE_COUNT,
+        )
+        common = np.flatnonzero(frequency > threshold)
+        common = common[np.argsort(-frequency[common], kind='stable')][
+            : consts.SIMILAR_MAX_COMMON_FEATURES
+        ]
+        self.common_bits = np.full(len(frequency), -1, dtype=np.int64)
+        self.common_bits[common] = np.arange(len(common))
+
+        words = max(-(-len(common) // MASK_WORD_BITS), 1)
+        self.masks = np.zeros((count, words), dtype=np.uint64)
+        bits = self.common_bits[features] if len(features) else features
+        is_common = bits >= 0
+        np.bitwise_or.at(
+            self.masks,
+            (rows[is_common], bits[is_common] // MASK_WORD_BITS),
+            np.left_shift(
+                np.uint64(1),
+                (bits[is_common] % MASK_WORD_BITS).astype(np.uint64),
+            ),
+        )
+        self.bits = bits
+        self.is_common = is_common
+
+        posting_order = np.argsort(features, kind='stable')
+        sorted_features = features[posting_order]
+        unique, starts = np.unique(sorted_features, return_index=True)
+        self.postings = dict(
+            zip(
+                unique.tolist(),
+                np.split(rows[posting_order], starts[1:]),
+            )
+        )
+
+    @classmethod
+    def load(cls, using: str = DEFAULT_DB_ALIAS) -> 'SimilarityData':
+        """Загружает ингредиенты и теги всех рецептов."""
+        recipe_ids = np.array(
+            sorted(Recipe.objects.using(using).values_list('id', flat=True)),
+            dtype=np.int64,
+        )
+        ingredient_pairs = load_pairs(
+            RecipeIngredient, ('recipe', 'ingredient'), using
+        )
+        tag_pairs = load_pairs(Recipe.tags.through, ('recipe', 'tag'), using)
+        # Теги получают номера признаков после всех ингредиентов.
+        tag_offset = (
+            int(ingredient_pairs[1].max()) + 1
+            if len(ingredient_pairs[1])
+            else 0
+        )
+        return cls(
+            recipe_ids,
+            (
+                np.concatenate((ingredient_pairs[0], tag_pairs[0])),
+                np.concatenate(
+                    (ingredient_pairs[1], tag_pairs[1] + tag_offset)
+                ),
+            ),
+        )
+
+    def row(self, recipe_id: int) -> Optional[int]:
+        row = int(np.searchsorted(self.recipe_ids, recipe_id))
+        if row < len(self.recipe_ids) and self.recipe_ids[row] == recipe_id:
+            return row
+        return None
+
+    def candidates(self, row: int) -> tuple:
+        """
+        Возвращает рецепты, разделяющие признаки с рецептом, и их сходство.
+
+        :return: Массивы номеров строк и коэффициентов Жаккара.
+        """
+        start, stop = self.indptr[row], self.indptr[row + 1]
+        features = self.features[start:stop]
+        rare = features[~self.is_common[start:stop]]
+        use_masks = len(rare) > 0
+        if not use_masks:
+            # У рецепта только частые признаки: кандидаты ищутся по ним.
+            rare = features
+        if not len(rare):
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+        rows, intersection = np.unique(
+            np.concatenate([self.postings[feature] for feature in rare]),
+            return_counts=True,
+        )
+        other = rows != row
+        rows, intersection = rows[other], intersection[other]
+        if use_masks:
+            # Частые признаки рецепта: для каждого проверяется его бит
+            # в масках кандидатов.
+            for bit in self.bits[start:stop][self.is_common[start:stop]]:
+                intersection = intersection + (
+                    (
+                        self.masks[rows, bit // MASK_WORD_BITS]
+                        >> np.uint64(bit % MASK_WORD_BITS)
+                    )
+                    & np.uint64(1)
+                ).astype(np.int64)
+        union = self.sizes[row] + self.sizes[rows] - intersection
+        return rows, intersection / union
+
+    def neighbours(self, row: int, top_k: int, min_score: float) -> list:
+        """Возвращает top_k похожих рецептов в виде пар (id, сходство)."""
+        rows, scores = self.candidates(row)
+        passed = scores >= min_score
+        rows, scores = rows[passed], scores[passed]
+        if len(rows) > top_k:
+            # Отбираются все кандидаты со сходством не ниже k-го, чтобы
+            # при равенстве порядок определялся так же, как в select_top.
+            threshold = -np.partition(-scores, top_k - 1)[top_k - 1]
+            top = np.flatnonzero(scores >= threshold)
+            rows, scores = rows[top], scores[top]
+        return select_top(
+            self.recipe_ids[rows].tolist(), scores.tolist(), top_k, min_score
+        )
+
+
+def select_top(
+    recipe_ids: list, scores: list, top_k: int, min_score: float
+) -> list:
+    """
+    Отбирает top_k пар (id, сходство) по убыванию сходства, при равном
+    сходстве выше более новые рецепты.
+    """
+    pairs = [
+        (recipe_id, score)
+        for recipe_id, score in zip(recipe_ids, scores)
+        if score >= min_score
+    ]
+    pairs.sort(key=lambda pair: (-pair[1], -pair[0]))
+    return pairs[:top_k]
+
+
+def save_neighbours(
+    neighbours: dict, computed_at, using: str = DEFAULT_DB_ALIAS
+) -> int:
+    """
+    Заменяет сохраненные списки похожих рецептов.
+
+    :param neighbours: Списки пар (id, сходство) по id рецептов.
+    :return: Количество записанных строк.
+    """
+    written = 0
+    for batch in batched(list(neighbours)):
+        rows = [
+            SimilarRecipe(
+                recipe_id=recipe_id,
+                similar_id=similar_id,
+                rank=rank,
+                score=score,
+                computed_at=computed_at,
+            )
+            for recipe_id in batch
+            for rank, (similar_id, score) in enumerate(
+                neighbours[recipe_id], start=1
+            )
+        ]
+        with transaction.atomic(using=using):
+            SimilarRecipe.objects.using(using).filter(
+                recipe_id__in=batch
+            ).delete()
+            SimilarRecipe.objects.using(using).bulk_create(rows)
+        written += len(rows)
+    return written
+
+
+def load_neighbours(recipe_ids: Iterable[int], using: str) -> dict:
+    """Загружает сохраненные списки похожих рецептов."""
+    neighbours = defaultdict(list)
+    for batch in batched(recipe_ids):
+        for recipe_id, similar_id, score in (
+            SimilarRecipe.objects.using(using)
+            .filter(recipe_id__in=batch)
+            .values_list('recipe_id', 'similar_id', 'score')
+        ):
+            neighbours[recipe_id].append((similar_id, score))
+    return neighbours
+
+
+def save_run(started_at, using: str = DEFAULT_DB_ALIAS) -> None:
+    """
+    Запоминает начало успешного расчета: следующий инкрементальный
+    расчет обработает рецепты, измененные с этого момента.
+    """
+    IndexRun.objects.using(using).update_or_create(
+        name=consts.SIMILAR_RUN_NAME, defaults={'started_at': started_at}
+    )
+
+
+def refresh_similar_recipes(
+    full: bool = False,
+    top_k: int = consts.SIMILAR_TOP_K,
+    min_score: float = consts.SIMILAR_MIN_SCORE,
+    using: str = DEFAULT_DB_ALIAS,
+) -> dict:
+    """
+    Пересчитывает похожие рецепты.
+
+    Без full пересчитываются только списки, которые могли измениться
+    с момента прошлого расчета; записываются изменившиеся списки. Если
+    расчетов еще не было, выполняется полный расчет.
+
+    :return: Статистика: режим, количество пересчитанных рецептов
+    и записанных строк.
+    """
+    computed_at = timezone.now()
+    last_run = (
+        IndexRun.objects.using(using)
+        .filter(name=consts.SIMILAR_RUN_NAME)
+        .values_list('started_at', flat=True)
+        .first()
+    )
+    data = SimilarityData.load(using)
+
+    if full or last_run is None:
+        written = 0
+        recipe_ids = data.recipe_ids.tolist()
+        for start in range(0, len(recipe_ids), consts.SIMILAR_BATCH_SIZE):
+            stop = min(start + consts.SIMILAR_BATCH_SIZE, len(recipe_ids))
+            written += save_neighbours(
+                {
+                    recipe_ids[row]: data.neighbours(row, top_k, min_score)
+                    for row in range(start, stop)
+                },
+                computed_at,
+                using,
+            )
+        save_run(computed_at, using)
+        return {'mode': 'full', 'recipes': len(recipe_ids), 'rows': written}
+
+    edited = set(
+        Recipe.objects.using(using)
+        .filter(updated_at__gte=last_run)
+        .values_list('id', flat=True)
+    )
+    # Списки, которые могли измениться: измененных рецептов, рецептов,
+    # в списки которых они входили или могут войти теперь, и неполные
+    # списки. Из полного списка удаление рецепта каскадом убирает строку,
+    # и место в нем должен занять следующий по сходству рецепт.
+    affected = set(edited)
+    for recipe_id in edited:
+        row = data.row(recipe_id)
+        if row is None:
+            continue
+        rows, scores = data.candidates(row)
+        affected.update(data.recipe_ids[rows[scores >= min_score]].tolist())
+    for batch in batched(edited):
+        affected.update(
+            SimilarRecipe.objects.using(using)
+            .filter(similar_id__in=batch)
+            .values_list('recipe_id', flat=True)
+        )
+    full_lists = set(
+        SimilarRecipe.objects.using(using)
+        .order_by()
+        .values('recipe_id')
+        .annotate(rows=Count('*'))
+        .filter(rows__gte=top_k)
+        .values_list('recipe_id', flat=True)
+    )
+    affected.update(
+        recipe_id
+        for recipe_id in data.recipe_ids.tolist()
+        if recipe_id not in full_lists
+    )
+
+    # Списки пересчитываются целиком по загруженным признакам.
+    stored = load_neighbours(affected - edited, using)
+    neighbours = {}
+    for recipe_id in affected:
+        row = data.row(recipe_id)
+        if row is None:
+            continue
+        updated = data.neighbours(row, top_k, min_score)
+        if recipe_id in edited or updated != stored.get(recipe_id, []):
+            neighbours[recipe_id] = updated
+
+    written = save_neighbours(neighbours, computed_at, using)
+    save_run(computed_at, using)
+    return {
+        'mode': 'incremental',
+        'recipes': len(neighbours),
+        'rows': written,
+    }
@@ -0,0 +1,75 @@
+from typing import Iterator
+
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from foodgram import consts, feed
+from foodgram.deletion import delete_in_batches
+from foodgram.models import Recipe, Tag
+from jobs.registry import task
+
+RecipeTag = Recipe.tags.through
+
+
+def touch_recipes(ids: list) -> None:
+    # updated_at входит в ETag рецепта и отмечает рецепты для пересчета
+    # похожих.
+    Recipe.objects.filter(pk__in=ids).update(updated_at=timezone.now())
+
+
+@task(
+    'recipes.delete',
+    'Удаление рецептов',
+    chunk_size=consts.RECIPE_DELETE_CHUNK_SIZE,
+)
+def delete_recipes(ids: list, params: dict) -> Iterator[dict]:
+    yield from delete_in_batches(Recipe.objects.filter(pk__in=ids))
+
+
+@task(
+    'media.delete',
+    'Удаление медиафайлов',
+    chunk_size=consts.MEDIA_DELETE_CHUNK_SIZE,
+)
+def delete_media(names: list, params: dict) -> None:
+    for name in names:
+        default_storage.delete(name)
+
+
+@task(
+    'recipes.add_tag',
+    'Добавление тега рецептам',
+    chunk_size=consts.RECIPE_RETAG_CHUNK_SIZE,
+)
+def add_tag(ids: list, params: dict) -> None:
+    tag = Tag.objects.get(pk=params['tag'])
+    RecipeTag.objects.bulk_create(
+        (
+            RecipeTag(recipe_id=recipe_id, tag=tag)
+            for recipe_id in Recipe.objects.filter(pk__in=ids).values_list(
+                'pk', flat=True
+            )
+        ),
+        ignore_conflicts=True,
+    )
+    touch_recipes(ids)
+
+
+@task(
+    'recipes.remove_tag',
+    'Удаление тега у рецептов',
+    chunk_size=consts.RECIPE_RETAG_CHUNK_SIZE,
+)
+def remove_tag(ids: list, params: dict) -> None:
+    RecipeTag.objects.filter(recipe_id__in=ids, tag_id=params['tag']).delete()
+    touch_recipes(ids)
+
+
+@task(
+    'feed.fan_out',
+    'Рассылка рецептов в ленты',
+    chunk_size=consts.FEED_FANOUT_CHUNK_SIZE,
+)
+def fan_out_recipes(ids: list, params: dict) -> None:
+    for recipe_id in ids:
+        feed.fan_out(recipe_id)
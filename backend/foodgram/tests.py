@@ -0,0 +1,285 @@
+import random
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from foodgram import consts
+from foodgram.catalog import bump_generation, get_generation, tag_catalog
+from foodgram.cookable import CookableIndex, cookable_index
+from foodgram.deletion import delete_in_batches
+from foodgram.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    SimilarRecipe,
+    Tag,
+    User,
+)
+from foodgram.similar import refresh_similar_recipes
+from jobs.models import Job
+from jobs.worker import claim_job, enqueue, run_job
+
+
+class SimilarRecipesTest(TestCase):
+    """Инкрементальный расчет похожих рецептов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.rng = random.Random(0)
+        author = User.objects.create_user(
+            username='author', email='author@example.com', password='pass'
+        )
+        cls.ingredient_ids = [
+            Ingredient.objects.create(
+                name=f'ингредиент {number}', measurement_unit='г'
+            ).pk
+            for number in range(40)
+        ]
+        cls.recipe_ids = []
+        for number in range(120):
+            recipe = Recipe.objects.create(
+                author=author,
+                name=f'Рецепт {number}',
+                image='recipes/test.png',
+                text='Описание',
+                cooking_time=10,
+            )
+            cls.recipe_ids.append(recipe.pk)
+            cls.set_ingredients(recipe.pk)
+
+    @classmethod
+    def set_ingredients(cls, recipe_id):
+        RecipeIngredient.objects.filter(recipe_id=recipe_id).delete()
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe_id=recipe_id, ingredient_id=ingredient_id, amount=1
+            )
+            for ingredient_id in cls.rng.sample(
+                cls.ingredient_ids, cls.rng.randint(2, 6)
+            )
+        )
+
+    def get_lists(self):
+        return list(
+            SimilarRecipe.objects.order_by('recipe_id', 'rank').values_list(
+                'recipe_id', 'rank', 'similar_id', 'score'
+            )
+        )
+
+    def test_incremental_matches_full_after_edits_and_deletes(self):
+        self.assertEqual(refresh_similar_recipes()['mode'], 'full')
+        edited = self.rng.sample(self.recipe_ids, 10)
+        for recipe_id in edited:
+            self.set_ingredients(recipe_id)
+        Recipe.objects.filter(pk__in=edited).update(updated_at=timezone.now())
+        Recipe.objects.filter(
+            pk__in=self.rng.sample(
+                [pk for pk in self.recipe_ids if pk not in edited], 10
+            )
+        ).delete()
+
+        self.assertEqual(refresh_similar_recipes()['mode'], 'incremental')
+        incremental = self.get_lists()
+        refresh_similar_recipes(full=True)
+        self.assertEqual(incremental, self.get_lists())
+
+    def test_incremental_without_changes_writes_nothing(self):
+        refresh_similar_recipes()
+        self.assertEqual(
+            refresh_similar_recipes(),
+            {'mode': 'incremental', 'recipes': 0, 'rows': 0},
+        )
+
+
+@override_settings(
+    CACHES={
+        **settings.CACHES,
+        consts.JOURNAL_CACHE_ALIAS: {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+)
+class CookableIndexSyncTest(TestCase):
+    """Синхронизация индекса "Что приготовить" по журналу."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username='author', email='author@example.com', password='pass'
+        )
+        cls.ingredient = Ingredient.objects.create(
+            name='мука', measurement_unit='г'
+        )
+        cls.create_recipe()
+
+    @classmethod
+    def create_recipe(cls):
+        recipe = Recipe.objects.create(
+            author=cls.author,
+            name='Рецепт',
+            image='recipes/test.png',
+            text='Описание',
+            cooking_time=10,
+        )
+        RecipeIngredient.objects.create(
+            recipe=recipe, ingredient=cls.ingredient, amount=1
+        )
+        return recipe
+
+    def setUp(self):
+        self.index = CookableIndex()
+        self.index.build()
+
+    def found(self):
+        return [
+            recipe_id
+            for recipe_id, _ in self.index.search([self.ingredient.pk], 10)
+        ]
+
+    def test_pending_entry_is_applied_without_rebuild(self):
+        recipe = self.create_recipe()
+        # Поколение уже записано в БД, запись журнала еще нет.
+        generation = self.index.next_generation()
+        with mock.patch.object(
+            self.index, 'build', wraps=self.index.build
+        ) as build:
+            self.assertNotIn(recipe.pk, self.found())
+            self.index.cache.set(
+                consts.COOKABLE_CHANGE_KEY.format(generation), [recipe.pk]
+            )
+            self.assertIn(recipe.pk, self.found())
+        build.assert_not_called()
+        self.assertEqual(self.index.state.generation, generation)
+
+    def test_lost_entry_rebuilds_index(self):
+        recipe = self.create_recipe()
+        self.index.next_generation()
+        with mock.patch('foodgram.cookable.time.monotonic') as monotonic:
+            monotonic.return_value = 0
+            self.assertNotIn(recipe.pk, self.found())
+            monotonic.return_value = consts.COOKABLE_PENDING_TIMEOUT + 1
+            self.assertIn(recipe.pk, self.found())
+
+
+@override_settings(
+    CACHES={
+        **settings.CACHES,
+        consts.SHARED_CACHE_ALIAS: {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+)
+class CatalogGenerationTest(TestCase):
+    """Поколение справочника при потере записи в общем кеше."""
+
+    def setUp(self):
+        # Кеш не откатывается вместе с транзакцией теста.
+        cache = caches[consts.SHARED_CACHE_ALIAS]
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.addCleanup(setattr, tag_catalog, 'state', None)
+
+    def test_generation_survives_cache_clear(self):
+        generation = get_generation(Tag)
+        state = tag_catalog.load()
+        caches[consts.SHARED_CACHE_ALIAS].clear()
+        self.assertEqual(get_generation(Tag), generation)
+        self.assertIs(tag_catalog.sync(), state)
+
+    def test_bump_increases_generation(self):
+        generation = get_generation(Tag)
+        bump_generation(Tag)
+        caches[consts.SHARED_CACHE_ALIAS].clear()
+        self.assertGreater(get_generation(Tag), generation)
+
+
+class DeletionTest(TestCase):
+    """Удаление пачками и задачи удаления."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username='author', email='author@example.com', password='pass'
+        )
+        cls.reader = User.objects.create_user(
+            username='reader', email='reader@example.com', password='pass'
+        )
+        ingredient = Ingredient.objects.create(
+            name='мука', measurement_unit='г'
+        )
+        cls.recipe_ids = []
+        for number in range(5):
+            recipe = Recipe.objects.create(
+                author=cls.author,
+                name=f'Рецепт {number}',
+                image='recipes/test.png',
+                text='Описание',
+                cooking_time=10,
+            )
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=ingredient, amount=1
+            )
+            Favorite.objects.create(user=cls.reader, recipe=recipe)
+            cls.recipe_ids.append(recipe.pk)
+
+    def test_delete_in_batches_removes_dependents(self):
+        steps = list(
+            delete_in_batches(
+                User.objects.filter(pk=self.author.pk), batch_size=2
+            )
+        )
+        for counts in steps:
+            self.assertLessEqual(max(counts.values(), default=0), 2)
+        totals = {}
+        for counts in steps:
+            for label, count in counts.items():
+                totals[label] = totals.get(label, 0) + count
+        self.assertEqual(totals[Recipe._meta.label], 5)
+        self.assertEqual(totals[RecipeIngredient._meta.label], 5)
+        self.assertEqual(totals[Favorite._meta.label], 5)
+        self.assertEqual(totals[User._meta.label], 1)
+        self.assertFalse(Recipe.objects.exists())
+        self.assertTrue(User.objects.filter(pk=self.reader.pk).exists())
+
+    def test_batch_publishes_one_change(self):
+        with mock.patch.object(cookable_index, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                list(
+                    delete_in_batches(
+                        Recipe.objects.filter(pk__in=self.recipe_ids),
+                        batch_size=2,
+                    )
+                )
+        self.assertEqual(publish.call_count, 3)
+        self.assertCountEqual(
+            [
+                recipe_id
+                for (recipe_ids,), _ in publish.call_args_list
+                for recipe_id in recipe_ids
+            ],
+            self.recipe_ids,
+        )
+
+    def test_delete_jobs(self):
+        # Рассылки новых рецептов из setUpTestData не нужны.
+        Job.objects.all().delete()
+        jobs = [
+            enqueue('recipes.delete', self.recipe_ids[:2]),
+            enqueue('users.delete', [self.author.pk]),
+        ]
+        for expected in jobs:
+            job = claim_job('test')
+            self.assertEqual(job.pk, expected.pk)
+            self.assertEqual(run_job(job, 'test'), Job.Status.DONE)
+        recipes_job, users_job = Job.objects.filter(
+            pk__in=[job.pk for job in jobs]
+        ).order_by('pk')
+        self.assertEqual(recipes_job.stats[Recipe._meta.label], 2)
+        self.assertEqual(users_job.stats[Recipe._meta.label], 3)
+        self.assertEqual(users_job.stats[User._meta.label], 1)
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+        self.assertEqual(Favorite.objects.count(), 0)
@@ -1,3 +1,4 @@
+from contextlib import contextmanager
 from typing import Optional
 from uuid import uuid4
 
@@ -28,12 +29,11 @@ def get_short_link_id(model: Model, field_name: str = 'short_link_id') -> str:
     По умолчанию - 'short_link_id'.
     :return: Уникальный идентификатор для короткой ссылки
     """
-    short_identifiers = model.objects.values_list(field_name, flat=True)
     new_identifier = generate_identifier(
         max_length=consts.MAX_SHORT_LINK_ID_LENGTH
     )
 
-    while new_identifier in short_identifiers:
+    while model.objects.filter(**{field_name: new_identifier}).exists():
         new_identifier = generate_identifier(
             max_length=consts.MAX_SHORT_LINK_ID_LENGTH
         )
@@ -53,3 +53,40 @@ def get_link(*args, https: bool = True) -> str:
 
     startswith = consts.HTTPS_STARTSWITH if https else consts.HTTP_STARTSWITH
     return f'{startswith}{"/".join(args)}/'
+
+
+@contextmanager
+def auto_now_disabled(*models: Model):
+    """
+    Отключает auto_now и auto_now_add у полей дат переданных моделей.
+
+    bulk_create всегда перезаписывает такие поля текущим временем,
+    внутри блока with сохраняются значения, заданные объектам явно.
+    Незаданные поля по-прежнему заполняются текущим временем.
+    """
+    fields = [
+        field
+        for model in models
+        for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+
+    def keep_value(field):
+        pre_save = field.pre_save
+
+        def wrapper(model_instance, add):
+            value = getattr(model_instance, field.attname)
+            if value is None:
+                return pre_save(model_instance, add)
+            return value
+
+        return wrapper
+
+    for field in fields:
+        field.pre_save = keep_value(field)
+    try:
+        yield
+    finally:
+        for field in fields:
+            del field.pre_save
@@ -0,0 +1,102 @@
+"""
+Конфигурация gunicorn.
+
+Количество воркеров и потоков подбирается по числу CPU и доступной памяти,
+приложение загружается в мастер-процессе до форка (preload_app), чтобы
+модули Django, URLconf и сериализаторы импортировались один раз и
+разделялись воркерами через copy-on-write.
+"""
+import multiprocessing
+import os
+import shutil
+from pathlib import Path
+
+from environs import Env
+
+env = Env()
+env.read_env()
+
+MEGABYTE = 1024 * 1024
+CGROUP_MEMORY_LIMITS = (
+    Path('/sys/fs/cgroup/memory.max'),
+    Path('/sys/fs/cgroup/memory/memory.limit_in_bytes'),
+)
+MEMINFO = Path('/proc/meminfo')
+
+
+def get_memory_limit() -> int:
+    """Возвращает доступный контейнеру объем памяти в байтах."""
+    limits = []
+    for path in CGROUP_MEMORY_LIMITS:
+        try:
+            value = path.read_text().strip()
+        except OSError:
+            continue
+        if value.isdigit():
+            limits.append(int(value))
+
+    try:
+        for line in MEMINFO.read_text().splitlines():
+            if line.startswith('MemTotal:'):
+                limits.append(int(line.split()[1]) * 1024)
+                break
+    except OSError:
+        pass
+
+    return min(limits) if limits else 0
+
+
+def get_workers_count(cpu_count: int, worker_memory: int) -> int:
+    """
+    Считает количество воркеров.
+
+    :param cpu_count: Количество доступных CPU.
+    :param worker_memory: Ожидаемый расход памяти одним воркером в байтах.
+    :return: Количество воркеров, не превышающее лимит памяти.
+    """
+    workers = cpu_count * 2 + 1
+    memory_limit = get_memory_limit()
+    if memory_limit:
+        workers = min(workers, memory_limit // worker_memory)
+    return max(workers, 1)
+
+
+cpu_count = len(os.sched_getaffinity(0)) or multiprocessing.cpu_count()
+
+bind = env.str('GUNICORN_BIND', '0.0.0.0:7000')
+wsgi_app = 'api_foodgram.wsgi'
+workers = env.int(
+    'GUNICORN_WORKERS',
+    get_workers_count(
+        cpu_count, env.int('GUNICORN_WORKER_MEMORY_MB', 150) * MEGABYTE
+    ),
+)
+worker_class = 'gthread'
+threads = env.int('GUNICORN_THREADS', min(cpu_count * 2, 4))
+preload_app = True
+max_requests = env.int('GUNICORN_MAX_REQUESTS', 2000)
+max_requests_jitter = env.int('GUNICORN_MAX_REQUESTS_JITTER', 200)
+timeout = env.int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = env.int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = env.int('GUNICORN_KEEPALIVE', 5)
+
+
+def on_starting(server):
+    """Удаляет снимки метрик, оставшиеся от предыдущего запуска."""
+    metrics_dir = env.str('METRICS_DIR', '')
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+def when_ready(server):
+    """Прогревает кеши в мастер-процессе до запуска воркеров."""
+    from api.warmup import warm_up
+
+    warm_up()
+
+
+def post_fork(server, worker):
+    """Не даёт воркеру использовать соединения с БД мастер-процесса."""
+    from django.db import connections
+
+    connections.close_all()
@@ -0,0 +1,147 @@
+from django.contrib import admin, messages
+from django.db.models import CASCADE, QuerySet
+from django.db.models.deletion import get_candidate_relations_to_delete
+from django.http import HttpResponseRedirect
+from django.urls import reverse
+from django.utils.html import format_html
+
+from jobs import consts
+from jobs.models import Job
+from jobs.registry import tasks
+from jobs.worker import enqueue
+
+
+def enqueue_action(
+    modeladmin: admin.ModelAdmin,
+    request,
+    queryset: QuerySet,
+    task_name: str,
+    **params,
+) -> Job:
+    """
+    Ставит в очередь задачу над объектами, выбранными в админке,
+    и сообщает пользователю ссылку на нее.
+    """
+    job = enqueue(
+        task_name,
+        queryset.order_by('pk').values_list('pk', flat=True),
+        created_by=request.user,
+        **params,
+    )
+    modeladmin.message_user(
+        request,
+        format_html(
+            consts.ENQUEUED_MESSAGE,
+            reverse('admin:jobs_job_change', args=(job.pk,)),
+            tasks[task_name].verbose_name,
+            job.total,
+        ),
+    )
+    return job
+
+
+class BackgroundDeleteMixin:
+    """
+    Удаляет объекты в админке фоновой задачей delete_task: действием
+    над выбранными объектами и со страницы объекта.
+    """
+
+    delete_task: str
+    actions = ('delete_in_background',)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def get_delete_queryset(self, request, queryset: QuerySet) -> QuerySet:
+        return queryset
+
+    @admin.action(
+        description='Удалить выбранные %(verbose_name_plural)s',
+        permissions=('delete',),
+    )
+    def delete_in_background(self, request, queryset):
+        queryset = self.get_delete_queryset(request, queryset)
+        perms_needed = self.get_perms_needed(request, queryset)
+        if perms_needed:
+            self.message_user(
+                request,
+                consts.PERMS_NEEDED_MESSAGE.format(
+                    ', '.join(sorted(perms_needed))
+                ),
+                messages.ERROR,
+            )
+            return
+        enqueue_action(self, request, queryset, self.delete_task)
+
+    def get_perms_needed(self, request, queryset: QuerySet) -> set:
+        """
+        Названия моделей с зависимыми объектами, которые пользователь
+        не может удалить.
+
+        Как и в стандартной странице подтверждения, учитываются модели,
+        зарегистрированные в админке. Вместо сбора объектов для каждой
+        модели без права удаления проверяется, есть ли в ней строки,
+        каскадно зависящие от удаляемых объектов.
+        """
+        perms_needed = set()
+        pending = [(self.model, 'pk__in', (self.model,))]
+        while pending:
+            model, lookup, path = pending.pop()
+            for relation in get_candidate_relations_to_delete(model._meta):
+                related_model = relation.related_model
+                if relation.on_delete is not CASCADE or related_model in path:
+                    continue
+                related_lookup = f'{relation.field.name}__{lookup}'
+                pending.append(
+                    (related_model, related_lookup, path + (related_model,))
+                )
+                verbose_name = related_model._meta.verbose_name
+                model_admin = self.admin_site._registry.get(related_model)
+                if (
+                    model_admin is not None
+                    and verbose_name not in perms_needed
+                    and not model_admin.has_delete_permission(request)
+                    and related_model._base_manager.filter(
+                        **{related_lookup: queryset.values('pk')}
+                    ).exists()
+                ):
+                    perms_needed.add(verbose_name)
+        return perms_needed
+
+    def get_deleted_objects(self, objs, request):
+        # Зависимые объекты не собираются: у автора их могут быть десятки
+        # тысяч, и страница подтверждения не уложилась бы в таймаут.
+        objs = list(objs)
+        return (
+            [str(obj) for obj in objs],
+            {self.opts.verbose_name_plural: len(objs)},
+            self.get_perms_needed(
+                request,
+                self.model._base_manager.filter(
+                    pk__in=[obj.pk for obj in objs]
+                ),
+            ),
+            [],
+        )
+
+    def delete_model(self, request, obj):
+        enqueue_action(
+            self,
+            request,
+            self.get_delete_queryset(
+                request, self.model._base_manager.filter(pk=obj.pk)
+            ),
+            self.delete_task,
+        )
+
+    def response_delete(self, request, obj_display, obj_id):
+        # Сообщение о постановке задачи выведено в delete_model.
+        return HttpResponseRedirect(
+            reverse(
+                f'admin:{self.opts.app_label}_{self.opts.model_name}'
+                '_changelist',
+                current_app=self.admin_site.name,
+            )
+        )
@@ -0,0 +1,79 @@
+from django.contrib import admin
+
+from jobs.models import Job
+from jobs.registry import tasks
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Модель фоновых задач в админке."""
+
+    list_display = (
+        'id',
+        'task_name',
+        'status',
+        'progress',
+        'created_by',
+        'created_at',
+        'finished_at',
+    )
+    list_filter = ('status', 'task')
+    list_select_related = ('created_by',)
+    fields = (
+        'task_name',
+        'status',
+        'progress',
+        'stats',
+        'params',
+        'error',
+        'attempts',
+        'worker',
+        'created_by',
+        'created_at',
+        'started_at',
+        'heartbeat_at',
+        'finished_at',
+    )
+    readonly_fields = fields
+    actions = ('cancel_jobs', 'retry_jobs')
+
+    def get_queryset(self, request):
+        # Список id объектов может быть большим и в админке не выводится.
+        return super().get_queryset(request).defer('object_ids')
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.display(description='задача', ordering='task')
+    def task_name(self, obj):
+        task = tasks.get(obj.task)
+        return task.verbose_name if task else obj.task
+
+    @admin.display(description='прогресс')
+    def progress(self, obj):
+        percent = obj.processed * 100 // obj.total if obj.total else 100
+        return f'{obj.processed} из {obj.total} ({percent}%)'
+
+    @admin.action(
+        description='Отменить выбранные задачи', permissions=('change',)
+    )
+    def cancel_jobs(self, request, queryset):
+        cancelled = queryset.filter(
+            status__in=(Job.Status.PENDING, Job.Status.RUNNING)
+        ).update(status=Job.Status.CANCELLED)
+        self.message_user(request, f'Отменено задач: {cancelled}.')
+
+    @admin.action(
+        description='Продолжить выбранные задачи', permissions=('change',)
+    )
+    def retry_jobs(self, request, queryset):
+        # Задача продолжается с первой необработанной пачки.
+        retried = queryset.filter(
+            status__in=(Job.Status.FAILED, Job.Status.CANCELLED)
+        ).update(
+            status=Job.Status.PENDING,
+            worker='',
+            heartbeat_at=None,
+            finished_at=None,
+        )
+        self.message_user(request, f'Возвращено в очередь задач: {retried}.')
@@ -0,0 +1,16 @@
+MAX_TASK_NAME_LENGTH = 64
+MAX_STATUS_LENGTH = 16
+MAX_WORKER_LENGTH = 128
+
+# Пауза между проверками очереди, если задач нет, в секундах.
+POLL_INTERVAL = 5
+# Задача в статусе "выполняется" без отметки обработчика дольше этого
+# времени (в секундах) считается брошенной и продолжается другим
+# обработчиком.
+STALE_TIMEOUT = 10 * 60
+
+UNKNOWN_TASK = 'Неизвестная задача: {}.'
+ENQUEUED_MESSAGE = 'Задача <a href="{}">{}</a> поставлена в очередь: {} шт.'
+PERMS_NEEDED_MESSAGE = (
+    'Нет прав на удаление связанных объектов: {}. Объекты не удалены.'
+)
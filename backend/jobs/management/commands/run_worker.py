@@ -0,0 +1,67 @@
+import os
+import signal
+import socket
+import sys
+import threading
+
+from django.core.management.base import BaseCommand
+
+from jobs import consts
+from jobs.models import Job
+from jobs.worker import work
+
+
+class Command(BaseCommand):
+    """Команда обработчика фоновых задач."""
+
+    help = (
+        'Выполняет фоновые задачи из очереди в БД. Можно запустить '
+        'несколько обработчиков. SIGTERM и SIGINT завершают обработчик '
+        'после текущей пачки, задача возвращается в очередь.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Завершиться, когда очередь опустеет.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=consts.POLL_INTERVAL,
+            help='Пауза между проверками пустой очереди, в секундах.',
+        )
+        parser.add_argument(
+            '--worker-id',
+            default=f'{socket.gethostname()}:{os.getpid()}',
+            help='Имя обработчика в задачах. По умолчанию - хост и PID.',
+        )
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: stop.set())
+
+        worker = options['worker_id']
+        sys.stdout.write(f'Обработчик {worker} запущен.\n')
+        for job, status in work(
+            worker,
+            should_stop=stop.is_set,
+            wait=stop.wait,
+            once=options['once'],
+            poll_interval=options['poll_interval'],
+        ):
+            label = Job.Status(status).label if status else 'прервана'
+            style = (
+                self.style.ERROR
+                if status == Job.Status.FAILED
+                else self.style.SUCCESS
+            )
+            sys.stdout.write(
+                style(
+                    f'{job}: {label}, обработано {job.processed} '
+                    f'из {job.total}.\n'
+                )
+            )
+        sys.stdout.write(f'Обработчик {worker} остановлен.\n')
@@ -0,0 +1,46 @@
+# Generated by Django 3.2.16 on 2026-10-19 11:18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.CharField(max_length=64, verbose_name='задача')),
+                ('params', models.JSONField(blank=True, default=dict, verbose_name='параметры')),
+                ('object_ids', models.JSONField(default=list, verbose_name='объекты')),
+                ('status', models.CharField(choices=[('pending', 'в очереди'), ('running', 'выполняется'), ('done', 'выполнена'), ('failed', 'ошибка'), ('cancelled', 'отменена')], default='pending', max_length=16, verbose_name='статус')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='всего объектов')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='обработано объектов')),
+                ('error', models.TextField(blank=True, verbose_name='ошибка')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='запусков')),
+                ('worker', models.CharField(blank=True, max_length=128, verbose_name='обработчик')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='создана')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='запущена')),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True, verbose_name='последняя отметка обработчика')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='завершена')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='автор')),
+            ],
+            options={
+                'verbose_name': 'фоновая задача',
+                'verbose_name_plural': 'Фоновые задачи',
+                'ordering': ('-created_at',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'created_at'], name='job_status_created_idx'),
+        ),
+    ]
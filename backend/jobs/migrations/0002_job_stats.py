@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-19 11:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='stats',
+            field=models.JSONField(blank=True, default=dict, verbose_name='счетчики'),
+        ),
+    ]
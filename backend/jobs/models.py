@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.db import models
+
+from jobs import consts
+
+
+class Job(models.Model):
+    """
+    Фоновая задача над списком объектов.
+
+    Объекты обрабатываются пачками, после каждой пачки в той же транзакции
+    сохраняется число обработанных объектов. Прерванная задача
+    продолжается с первой необработанной пачки.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'в очереди'
+        RUNNING = 'running', 'выполняется'
+        DONE = 'done', 'выполнена'
+        FAILED = 'failed', 'ошибка'
+        CANCELLED = 'cancelled', 'отменена'
+
+    task = models.CharField(
+        max_length=consts.MAX_TASK_NAME_LENGTH, verbose_name='задача'
+    )
+    params = models.JSONField(
+        default=dict, blank=True, verbose_name='параметры'
+    )
+    object_ids = models.JSONField(default=list, verbose_name='объекты')
+    status = models.CharField(
+        max_length=consts.MAX_STATUS_LENGTH,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='статус',
+    )
+    total = models.PositiveIntegerField(
+        default=0, verbose_name='всего объектов'
+    )
+    processed = models.PositiveIntegerField(
+        default=0, verbose_name='обработано объектов'
+    )
+    stats = models.JSONField(default=dict, blank=True, verbose_name='счетчики')
+    error = models.TextField(blank=True, verbose_name='ошибка')
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='запусков'
+    )
+    worker = models.CharField(
+        max_length=consts.MAX_WORKER_LENGTH,
+        blank=True,
+        verbose_name='обработчик',
+    )
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name='автор',
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name='создана'
+    )
+    started_at = models.DateTimeField(
+        null=True, blank=True, verbose_name='запущена'
+    )
+    heartbeat_at = models.DateTimeField(
+        null=True, blank=True, verbose_name='последняя отметка обработчика'
+    )
+    finished_at = models.DateTimeField(
+        null=True, blank=True, verbose_name='завершена'
+    )
+
+    class Meta:
+        ordering = ('-created_at',)
+        indexes = [
+            models.Index(
+                fields=('status', 'created_at'),
+                name='job_status_created_idx',
+            ),
+        ]
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+
+    def __str__(self):
+        return f'{self.task} #{self.pk}'
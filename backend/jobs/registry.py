@@ -0,0 +1,40 @@
+"""
+Реестр фоновых задач.
+
+Задача - функция, обрабатывающая одну пачку объектов: она получает
+список id пачки и параметры задачи. Функция вызывается в транзакции,
+поэтому пачка применяется целиком или не применяется вовсе.
+
+Долгую пачку задача может разбить на шаги, став генератором: после
+каждого шага она отдает словарь счетчиков (например, удаленных строк по
+моделям), и обработчик фиксирует транзакцию шага. Задачи объявляются
+декоратором task в модулях tasks приложений.
+"""
+
+from typing import Callable, Dict, Iterator, NamedTuple, Optional
+
+
+class Task(NamedTuple):
+    name: str
+    verbose_name: str
+    func: Callable[[list, dict], Optional[Iterator[dict]]]
+    chunk_size: int
+
+
+tasks: Dict[str, Task] = {}
+
+
+def task(name: str, verbose_name: str, chunk_size: int):
+    """
+    Регистрирует функцию как фоновую задачу.
+
+    :param name: Имя задачи, под которым она сохраняется в Job.
+    :param verbose_name: Название задачи в админке.
+    :param chunk_size: Количество объектов в пачке.
+    """
+
+    def decorator(func):
+        tasks[name] = Task(name, verbose_name, func, chunk_size)
+        return func
+
+    return decorator
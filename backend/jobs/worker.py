@@ -0,0 +1,224 @@
+"""
+Очередь фоновых задач в БД.
+
+Обработчик (команда run_worker) забирает задачу из очереди через
+SELECT ... FOR UPDATE SKIP LOCKED, поэтому несколько обработчиков
+не ждут друг друга и не берут одну задачу. Захват подтверждается
+условным UPDATE: в SQLite блокировки строк нет, и из двух обработчиков
+задачу получает тот, чей UPDATE выполнится первым.
+
+Каждая пачка объектов обрабатывается в отдельной транзакции вместе
+с обновлением прогресса задачи. Обновление проверяет, что задача все еще
+выполняется этим обработчиком: если ее отменили в админке или передали
+другому обработчику, транзакция пачки откатывается.
+"""
+
+import inspect
+import logging
+import traceback
+from contextlib import closing
+from datetime import timedelta
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from jobs import consts
+from jobs.models import Job
+from jobs.registry import Task, tasks
+
+logger = logging.getLogger(__name__)
+
+
+class JobInterrupted(Exception):
+    """Задача отменена или выполняется другим обработчиком."""
+
+
+def enqueue(
+    task_name: str, object_ids: Iterable, created_by=None, **params
+) -> Job:
+    """
+    Ставит задачу в очередь.
+
+    :param task_name: Имя задачи из реестра.
+    :param object_ids: Обрабатываемые объекты: id или другие значения,
+    сериализуемые в JSON.
+    :param created_by: Пользователь, поставивший задачу.
+    :param params: Параметры задачи (должны сериализоваться в JSON).
+    :return: Созданная задача.
+    """
+    if task_name not in tasks:
+        raise ValueError(consts.UNKNOWN_TASK.format(task_name))
+    object_ids = list(object_ids)
+    return Job.objects.create(
+        task=task_name,
+        params=params,
+        object_ids=object_ids,
+        total=len(object_ids),
+        created_by=created_by,
+    )
+
+
+def claim_job(worker: str) -> Optional[Job]:
+    """
+    Забирает из очереди самую старую задачу: ожидающую или брошенную
+    обработчиком, который не отмечался дольше STALE_TIMEOUT.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=consts.STALE_TIMEOUT)
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=Job.Status.PENDING)
+                | Q(status=Job.Status.RUNNING, heartbeat_at__lt=stale)
+            )
+            .defer('object_ids')
+            .order_by('created_at')
+            .first()
+        )
+        if job is None:
+            return None
+        claimed = Job.objects.filter(
+            pk=job.pk, status=job.status, heartbeat_at=job.heartbeat_at
+        ).update(
+            status=Job.Status.RUNNING,
+            worker=worker,
+            attempts=F('attempts') + 1,
+            started_at=job.started_at or now,
+            heartbeat_at=now,
+            error='',
+        )
+    if not claimed:
+        return None
+    if job.status == Job.Status.RUNNING:
+        logger.warning(
+            'Задача %s брошена обработчиком %s и продолжена с %s из %s.',
+            job,
+            job.worker,
+            job.processed,
+            job.total,
+        )
+    return Job.objects.get(pk=job.pk)
+
+
+def finish_job(
+    job: Job, worker: str, status: str, error: str = ''
+) -> Optional[str]:
+    """Завершает задачу, если она все еще выполняется обработчиком."""
+    finished = Job.objects.filter(
+        pk=job.pk, status=Job.Status.RUNNING, worker=worker
+    ).update(status=status, error=error, finished_at=timezone.now())
+    if not finished:
+        return None
+    job.status = status
+    return status
+
+
+def release_job(job: Job, worker: str) -> None:
+    """Возвращает задачу в очередь, чтобы ее сразу продолжил другой."""
+    Job.objects.filter(
+        pk=job.pk, status=Job.Status.RUNNING, worker=worker
+    ).update(status=Job.Status.PENDING, worker='', heartbeat_at=None)
+
+
+def iter_steps(task: Task, chunk: list, params: dict) -> Iterator[dict]:
+    """
+    Шаги обработки пачки. Обычная задача выполняется за один шаг,
+    задача-генератор - за столько шагов, сколько раз она отдаст счетчики.
+    """
+    result = task.func(chunk, params)
+    if inspect.isgenerator(result):
+        yield from result
+
+
+def save_progress(job: Job, worker: str, **fields) -> None:
+    updated = Job.objects.filter(
+        pk=job.pk, status=Job.Status.RUNNING, worker=worker
+    ).update(heartbeat_at=timezone.now(), **fields)
+    if not updated:
+        raise JobInterrupted
+
+
+def run_job(
+    job: Job, worker: str, should_stop: Callable[[], bool] = lambda: False
+) -> Optional[str]:
+    """
+    Выполняет задачу пачками, начиная с первой необработанной.
+
+    Каждый шаг пачки выполняется в отдельной транзакции вместе
+    с сохранением счетчиков шага в job.stats, последний шаг - вместе
+    с сохранением числа обработанных объектов. Прерванная пачка
+    выполняется заново, поэтому шаги задачи должны быть идемпотентны.
+
+    :param should_stop: Вызывается перед каждым шагом. Если возвращает
+    True, задача возвращается в очередь.
+    :return: Итоговый статус задачи или None, если задача отменена,
+    возвращена в очередь или выполняется другим обработчиком.
+    """
+    task = tasks.get(job.task)
+    if task is None:
+        return finish_job(
+            job,
+            worker,
+            Job.Status.FAILED,
+            consts.UNKNOWN_TASK.format(job.task),
+        )
+    try:
+        while job.processed < job.total:
+            start = job.processed
+            processed = min(start + task.chunk_size, job.total)
+            steps = iter_steps(
+                task, job.object_ids[start:processed], job.params
+            )
+            with closing(steps):
+                while True:
+                    if should_stop():
+                        release_job(job, worker)
+                        return None
+                    with transaction.atomic():
+                        counts = next(steps, None)
+                        if counts is None:
+                            save_progress(job, worker, processed=processed)
+                            break
+                        for label, count in counts.items():
+                            if count:
+                                job.stats[label] = (
+                                    job.stats.get(label, 0) + count
+                                )
+                        save_progress(job, worker, stats=job.stats)
+            job.processed = processed
+    except JobInterrupted:
+        return None
+    except Exception:
+        logger.exception('Задача %s завершилась ошибкой.', job)
+        return finish_job(
+            job, worker, Job.Status.FAILED, traceback.format_exc()
+        )
+    return finish_job(job, worker, Job.Status.DONE)
+
+
+def work(
+    worker: str,
+    should_stop: Callable[[], bool],
+    wait: Callable[[float], object],
+    once: bool = False,
+    poll_interval: float = consts.POLL_INTERVAL,
+) -> Iterator[Tuple[Job, Optional[str]]]:
+    """
+    Выполняет задачи из очереди, пока should_stop не вернет True.
+
+    :param wait: Ожидание между проверками пустой очереди.
+    :param once: Завершиться, когда очередь опустеет.
+    :return: Пары (задача, итоговый статус) по мере выполнения задач.
+    """
+    while not should_stop():
+        close_old_connections()
+        job = claim_job(worker)
+        if job is None:
+            if once:
+                return
+            wait(poll_interval)
+            continue
+        yield job, run_job(job, worker, should_stop)
@@ -1,62 +1,14 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.utils.html import format_html_join
 
+from foodgram.admin_utils import LargeTableAdminMixin, changelist_link
 from foodgram.models import Favorite, Purchase, Recipe
+from jobs.actions import BackgroundDeleteMixin
 from users.models import CustomUser, Subscription
 
 
-class FavoriteInline(admin.TabularInline):
-    model = Favorite
-    extra = 0
-
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related('recipe')
-
-
-class PurchaseInline(admin.TabularInline):
-    model = Purchase
-    extra = 0
-    verbose_name_plural = 'Корзина покупок'
-
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related('recipe')
-
-
-class RecipeInline(admin.TabularInline):
-    model = Recipe
-    extra = 0
-    fields = ('name', 'cooking_time')
-
-
-class SubscriptionInline(admin.TabularInline):
-    model = Subscription
-    fk_name = 'user'
-    extra = 0
-
-    verbose_name = 'подписка'
-    verbose_name_plural = 'Подписки'
-
-    def get_queryset(self, request):
-        return (
-            super().get_queryset(request).select_related('user', 'following')
-        )
-
-
-class SubscriberInline(admin.TabularInline):
-    model = Subscription
-    fk_name = 'following'
-    extra = 0
-
-    verbose_name = 'подписчик'
-    verbose_name_plural = 'Подписчики'
-
-    def get_queryset(self, request):
-        return (
-            super().get_queryset(request).select_related('following', 'user')
-        )
-
-
-class CustomAdmin(UserAdmin):
+class CustomAdmin(BackgroundDeleteMixin, LargeTableAdminMixin, UserAdmin):
     """Модель пользователя в админке."""
 
     list_display = (
@@ -69,36 +21,62 @@ class CustomAdmin(UserAdmin):
     )
     list_editable = ('is_staff', 'is_active')
     search_fields = ('email', 'first_name')
-    inlines = (
-        RecipeInline,
-        FavoriteInline,
-        PurchaseInline,
-        SubscriptionInline,
-        SubscriberInline,
-    )
+    readonly_fields = ('related_objects',)
+    delete_task = 'users.delete'
+
+    def get_delete_queryset(self, request, queryset):
+        return queryset.exclude(pk=request.user.pk)
 
     @admin.display(description='юзернейм', ordering='username')
     def user_username(self, obj):
         return obj.username
 
+    @admin.display(description='связанные объекты')
+    def related_objects(self, obj):
+        """
+        Ссылки на списки рецептов, избранного, корзины и подписок
+        пользователя с числом объектов в каждом.
+        """
+        links = (
+            (Recipe, 'Рецепты', obj.recipes, 'author'),
+            (Favorite, 'Избранное', obj.favorites, 'user'),
+            (Purchase, 'Корзина покупок', obj.purchase_list, 'user'),
+            (Subscription, 'Подписки', obj.subscriptions, 'user'),
+            (Subscription, 'Подписчики', obj.subscribers, 'following'),
+        )
+        return format_html_join(
+            '<br>',
+            '{}',
+            (
+                (
+                    changelist_link(
+                        model,
+                        f'{text}: {manager.count()}',
+                        **{f'{field}__id__exact': obj.pk},
+                    ),
+                )
+                for model, text, manager, field in links
+            ),
+        )
+
 
 @admin.register(Subscription)
-class SubscriptionAdmin(admin.ModelAdmin):
+class SubscriptionAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """Модель подписок в админке."""
 
     list_display = ('description', 'user', 'following')
-    search_fields = ('user__username', 'following__username')
+    search_fields = ('user__username__exact', 'following__username__exact')
+    list_select_related = ('user', 'following')
+    raw_id_fields = ('user', 'following')
 
     @admin.display(description='описание')
     def description(self, obj):
         return str(obj)
 
-    def get_queryset(self, request):
-        return (
-            super().get_queryset(request).select_related('user', 'following')
-        )
-
 
-CustomAdmin.fieldsets += (('Extra Fields', {'fields': ('avatar',)}),)
+CustomAdmin.fieldsets += (
+    ('Extra Fields', {'fields': ('avatar',)}),
+    ('Связанные объекты', {'fields': ('related_objects',)}),
+)
 
 admin.site.register(CustomUser, CustomAdmin)
@@ -2,3 +2,7 @@ MAX_LENGTH_NAME = 150
 SUBSCRIPTION_STR = (
     lambda subscriber, subscription: f'Подписка {subscriber} на {subscription}'
 )
+
+# Удаление пользователя затрагивает его рецепты, избранное, покупки
+# и подписки, поэтому пачка небольшая.
+USER_DELETE_CHUNK_SIZE = 10
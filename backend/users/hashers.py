@@ -0,0 +1,166 @@
+"""
+Хеширование паролей.
+
+ScryptPasswordHasher повторяет хешер scrypt из Django 4.0 (формат
+'scrypt$n$salt$r$p$hash'), поэтому хеши останутся действительными после
+обновления Django.
+
+Хеширование и проверка пароля выполняются в пуле из
+PASSWORD_HASHING_THREADS потоков: одновременно процесс вычисляет не больше
+этого числа хешей, а асинхронный код не блокирует цикл событий.
+"""
+
+import asyncio
+import base64
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import gettext_noop as _
+
+
+@lru_cache(maxsize=1)
+def get_executor(pid: int) -> ThreadPoolExecutor:
+    """
+    Возвращает пул потоков процесса.
+
+    Пул создается заново после fork: потоки родительского процесса
+    в дочернем не существуют.
+    """
+    return ThreadPoolExecutor(
+        max_workers=settings.PASSWORD_HASHING_THREADS,
+        thread_name_prefix='password-hashing',
+    )
+
+
+def submit(function, *args):
+    return get_executor(os.getpid()).submit(function, *args)
+
+
+class ScryptPasswordHasher(hashers.BasePasswordHasher):
+    """Хеширование паролей функцией scrypt из hashlib."""
+
+    algorithm = 'scrypt'
+    block_size = 8
+    maxmem = 0
+    parallelism = 1
+    work_factor = 2**14
+
+    def encode(self, password, salt, n=None, r=None, p=None):
+        assert password is not None
+        assert salt and '$' not in salt
+        n = n or self.work_factor
+        r = r or self.block_size
+        p = p or self.parallelism
+        hash_ = hashlib.scrypt(
+            password.encode(),
+            salt=salt.encode(),
+            n=n,
+            r=r,
+            p=p,
+            maxmem=self.maxmem,
+            dklen=64,
+        )
+        hash_ = base64.b64encode(hash_).decode('ascii').strip()
+        return '%s$%d$%s$%d$%d$%s' % (self.algorithm, n, salt, r, p, hash_)
+
+    def decode(self, encoded):
+        algorithm, work_factor, salt, block_size, parallelism, hash_ = (
+            encoded.split('$', 6)
+        )
+        assert algorithm == self.algorithm
+        return {
+            'algorithm': algorithm,
+            'work_factor': int(work_factor),
+            'salt': salt,
+            'block_size': int(block_size),
+            'parallelism': int(parallelism),
+            'hash': hash_,
+        }
+
+    def verify(self, password, encoded):
+        decoded = self.decode(encoded)
+        encoded_2 = self.encode(
+            password,
+            decoded['salt'],
+            decoded['work_factor'],
+            decoded['block_size'],
+            decoded['parallelism'],
+        )
+        return constant_time_compare(encoded, encoded_2)
+
+    def safe_summary(self, encoded):
+        decoded = self.decode(encoded)
+        return {
+            _('algorithm'): decoded['algorithm'],
+            _('work factor'): decoded['work_factor'],
+            _('block size'): decoded['block_size'],
+            _('parallelism'): decoded['parallelism'],
+            _('salt'): hashers.mask_hash(decoded['salt']),
+            _('hash'): hashers.mask_hash(decoded['hash']),
+        }
+
+    def must_update(self, encoded):
+        decoded = self.decode(encoded)
+        return (
+            decoded['work_factor'] != self.work_factor
+            or decoded['block_size'] != self.block_size
+            or decoded['parallelism'] != self.parallelism
+            or hashers.must_update_salt(decoded['salt'], self.salt_entropy)
+        )
+
+    def harden_runtime(self, password, encoded):
+        # Параметры scrypt нельзя увеличить частично, как итерации PBKDF2.
+        pass
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """
+    Argon2id с параметрами из рекомендаций OWASP: 19 МиБ памяти,
+    2 прохода, 1 поток. Параметры Django (100 МиБ, 8 потоков) занимают
+    процессор воркера в несколько раз дольше.
+    """
+
+    memory_cost = 19 * 1024
+    parallelism = 1
+    time_cost = 2
+
+
+def make_password(password: Optional[str]) -> str:
+    """Хеширует пароль в пуле потоков хеширования."""
+    return submit(hashers.make_password, password).result()
+
+
+def check_password(
+    password: Optional[str],
+    encoded: str,
+    setter: Optional[Callable[[str], None]] = None,
+) -> bool:
+    """
+    Проверяет пароль в пуле потоков хеширования.
+
+    setter вызывается в текущем потоке, если пароль верен, но хеш нужно
+    пересчитать: он получен устаревшим хешером или с другими параметрами.
+    """
+    must_update = []
+    is_correct = submit(
+        hashers.check_password, password, encoded, must_update.append
+    ).result()
+    if must_update and setter:
+        setter(password)
+    return is_correct
+
+
+async def amake_password(password: Optional[str]) -> str:
+    return await asyncio.wrap_future(submit(hashers.make_password, password))
+
+
+async def acheck_password(password: Optional[str], encoded: str) -> bool:
+    return await asyncio.wrap_future(
+        submit(hashers.check_password, password, encoded)
+    )
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-19 10:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_alter_customuser_avatar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='pull_feed',
+            field=models.BooleanField(default=False, help_text='Рецепты автора с большим числом подписчиков не рассылаются в ленты, а подмешиваются при чтении ленты.', verbose_name='лента подписчиков по запросу'),
+        ),
+    ]
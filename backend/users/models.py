@@ -2,6 +2,7 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 
 from users import consts
+from users.hashers import check_password, make_password
 
 
 class CustomUser(AbstractUser):
@@ -21,6 +22,14 @@ class CustomUser(AbstractUser):
         blank=True,
         verbose_name='аватар',
     )
+    pull_feed = models.BooleanField(
+        default=False,
+        verbose_name='лента подписчиков по запросу',
+        help_text=(
+            'Рецепты автора с большим числом подписчиков не рассылаются '
+            'в ленты, а подмешиваются при чтении ленты.'
+        ),
+    )
     REQUIRED_FIELDS = [
         'email',
         'first_name',
@@ -32,6 +41,23 @@ class CustomUser(AbstractUser):
         verbose_name = 'пользователь'
         verbose_name_plural = 'Пользователи'
 
+    def set_password(self, raw_password):
+        self.password = make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """
+        Проверяет пароль и пересчитывает хеш, если он получен не основным
+        хешером из PASSWORD_HASHERS или с устаревшими параметрами.
+        """
+
+        def setter(raw_password):
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=['password'])
+
+        return check_password(raw_password, self.password, setter)
+
 
 class Subscription(models.Model):
     """Модель описывающая связь пользователя с его подписчиками."""
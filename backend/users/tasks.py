@@ -0,0 +1,15 @@
+from typing import Iterator
+
+from foodgram.deletion import delete_in_batches
+from jobs.registry import task
+from users import consts
+from users.models import CustomUser
+
+
+@task(
+    'users.delete',
+    'Удаление пользователей',
+    chunk_size=consts.USER_DELETE_CHUNK_SIZE,
+)
+def delete_users(ids: list, params: dict) -> Iterator[dict]:
+    yield from delete_in_batches(CustomUser.objects.filter(pk__in=ids))